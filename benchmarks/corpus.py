@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试语料
+按模板和填充词为 NLPProcessor.INTENT_RULES 中的每个意图生成中文语句，
+固定随机种子，每次生成的语料完全相同，保证测试结果可以比较
+"""
+
+import os
+import sys
+import random
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SIZE = 3000
+DEFAULT_SEED = 20240601
+
+# 模板中的填充词
+FILLERS = {
+    "city": ["北京", "上海", "广州", "深圳", "杭州", "成都", "西安", "武汉", "南京", "重庆",
+             "天津", "苏州", "青岛", "厦门", "昆明", "拉萨", "南宁", "哈尔滨", "佛山", "长沙"],
+    "time": ["今天", "明天", "后天", "周一", "周五", "周末", "早上", "下午", "晚上", "下周"],
+    "app": ["微信", "QQ", "浏览器", "记事本", "计算器", "网易云音乐", "钉钉", "飞书", "VSCode", "腾讯会议"],
+    "folder": ["桌面", "文档", "下载", "图片", "音乐", "视频"],
+    "song": ["晴天", "稻香", "七里香", "平凡之路", "夜曲", "告白气球", "光年之外", "演员"],
+    "singer": ["周杰伦", "陈奕迅", "林俊杰", "邓紫棋", "薛之谦", "朴树"],
+    "query": ["量子计算", "人工智能", "光合作用", "区块链", "黑洞", "相对论", "新能源汽车", "深度学习"],
+    "place": ["天安门", "西湖", "火车站", "机场", "人民公园", "最近的医院", "外滩", "故宫"],
+    "number": ["3", "12", "25", "48", "100", "256", "7", "64"],
+    "op": ["+", "-", "*", "/"],
+    "word": ["苹果", "谢谢", "早上好", "电脑", "朋友", "学习", "天空", "音乐"],
+    "language": ["英语", "日语", "韩语", "法语", "德语"],
+    "minutes": ["5", "10", "15", "20", "30", "45"],
+    "hour": ["6", "7", "8", "9", "10"],
+    "stock": ["茅台", "腾讯", "阿里巴巴", "比亚迪", "宁德时代"],
+    "team": ["中国队", "湖人", "皇马", "巴萨", "国安"],
+    "movie": ["流浪地球", "长津湖", "哪吒", "满江红", "热辣滚烫"],
+    "device": ["空调", "电视", "窗帘", "扫地机器人"],
+    "sign": ["白羊座", "金牛座", "双子座", "狮子座", "天蝎座", "水瓶座"],
+    "dish": ["红烧肉", "宫保鸡丁", "麻婆豆腐", "西红柿炒鸡蛋"]
+}
+
+# 意图 -> 语句模板
+TEMPLATES = {
+    "open_application": ["打开{app}", "启动{app}", "帮我打开{app}", "请打开{app}吧", "开启{app}"],
+    "open_folder": ["打开{folder}文件夹", "打开桌面", "打开下载", "查看{folder}目录", "打开我的{folder}文件夹"],
+    "weather": ["{city}天气怎么样", "{city}{time}天气", "{time}{city}会下雨吗", "{city}今天气温多少",
+                "{city}{time}的温度", "{time}要带伞吗", "{city}空气质量怎么样"],
+    "time": ["现在几点了", "几点钟了", "现在时间是多少", "帮我报时", "现在几点"],
+    "date": ["今天几号", "今天星期几", "今天什么日期", "农历今天是几号", "国庆节放假吗"],
+    "alarm": ["明天早上{hour}点叫我", "设置一个{hour}点的闹钟", "{minutes}分钟后提醒我开会", "提醒我{time}交报告",
+              "定时{minutes}分钟", "开始倒计时{minutes}分钟"],
+    "calculator": ["计算{number}{op}{number}", "{number}{op}{number}等于多少", "算一下{number}的平方",
+                   "{number}开方是多少", "帮我计算{number}乘以{number}", "一百美元换算成人民币"],
+    "translation": ["翻译{word}", "{word}用{language}怎么说", "{word}的{language}是什么意思", "把{word}翻译成{language}"],
+    "news": ["今天有什么新闻", "看看最新资讯", "今日头条", "最近有什么热点", "播报一下时事新闻", "微博热搜"],
+    "stock": ["{stock}股票怎么样", "{stock}股价多少", "今天大盘涨跌", "{stock}基金收益", "最近理财推荐"],
+    "sports": ["{team}比赛比分", "今晚有什么球赛", "{team}最近的赛程", "足球比赛结果", "篮球比分"],
+    "movie": ["最近有什么电影", "{movie}上映了吗", "{movie}票房多少", "{movie}评分怎么样", "推荐一部好看的影片"],
+    "music": ["播放{singer}的歌", "我想听{song}这首歌", "来首歌吧", "放首歌", "播放音乐", "来一首{song}"],
+    "video": ["播放{movie}的视频", "看一下{query}的视频", "放个搞笑视频"],
+    "search": ["搜索{query}", "帮我查一下{query}", "百度一下{query}", "{query}是什么", "了解一下{query}", "搜一下{query}"],
+    "map": ["{place}怎么走", "导航到{place}", "{place}在哪里", "去{place}的路线", "{place}离这里多远", "附近有什么餐厅"],
+    "volume": ["把音量调大", "声音小一点", "静音", "调高音量", "调低音量", "大声一点"],
+    "brightness": ["把亮度调高", "屏幕亮一点", "调暗屏幕", "调亮一点"],
+    "wifi": ["连接wifi", "无线网断了", "检查网络连接", "是不是断网了"],
+    "bluetooth": ["打开蓝牙设置", "蓝牙耳机配对", "连接设备", "蓝牙连不上"],
+    "screenshot": ["截图", "帮我截屏", "屏幕截图", "截个图"],
+    "system_info": ["查看系统信息", "电脑信息", "内存还剩多少", "CPU占用率", "硬盘空间", "电量还有多少"],
+    "list_files": ["列出文件", "显示{folder}的文件列表", "{folder}里有什么文件", "显示文件"],
+    "create_file": ["创建文件", "新建文件 笔记.txt", "写入文件内容"],
+    "delete_file": ["删除文件 test.txt", "移除文件", "帮我删除文件"],
+    "joke": ["讲个笑话", "说个笑话吧", "逗我笑一下", "来个笑话", "开心一下"],
+    "story": ["讲故事", "给我说故事", "我想听故事"],
+    "riddle": ["猜谜语", "出个谜语", "来个脑筋急转弯"],
+    "poetry": ["念首诗", "背一首古诗", "来一首唐诗", "推荐几句诗词"],
+    "greeting": ["你好", "您好", "嗨", "哈喽", "早上好", "下午好", "中午好"],
+    "farewell": ["再见", "拜拜", "回见", "下次见"],
+    "thanks": ["谢谢", "感谢你", "多谢", "辛苦了"],
+    "praise": ["你真厉害", "真棒", "说得不错", "太强了"],
+    "name": ["你叫什么", "你是谁", "你的名字是什么", "介绍一下你自己"],
+    "age": ["你多大了", "你几岁", "你的年龄是多少"],
+    "ability": ["你能做什么", "你会什么", "有什么功能", "帮助"],
+    "mood": ["你开心吗", "你心情怎么样", "你怎么样"],
+    "creator": ["谁创造了你", "谁开发的你", "你是谁做的", "作者是谁"],
+    "smart_home": ["开灯", "关灯", "打开{device}", "把{device}关掉", "启动扫地机器人", "智能家居状态"],
+    "weather_dress": ["今天怎么穿", "穿衣建议", "{city}{time}怎么穿"],
+    "food": ["中午吃什么", "附近美食", "{dish}的做法", "推荐一家餐厅", "点个外卖", "{dish}菜谱"],
+    "health": ["怎么保持健康", "养生小知识", "每天运动多久", "怎么减肥", "改善睡眠的方法"],
+    "horoscope": ["{sign}今日运势", "{sign}星座运势", "今天的星座运势", "{sign}的性格"],
+    "exit": ["退出", "关闭助手", "结束对话", "停止"]
+}
+
+
+def _fill(template, rng):
+    """用随机填充词替换模板中的占位符（同一占位符多次出现时分别取值）"""
+    parts = template.split("{")
+    result = [parts[0]]
+    for part in parts[1:]:
+        name, _, rest = part.partition("}")
+        result.append(rng.choice(FILLERS[name]))
+        result.append(rest)
+    return "".join(result)
+
+
+def build_corpus(size=DEFAULT_SIZE, seed=DEFAULT_SEED):
+    """生成语料
+    Returns:
+        [(语句, 模板对应的意图), ...]，各意图轮流出现
+    """
+    rng = random.Random(seed)
+    intents = list(TEMPLATES)
+    corpus = []
+    for index in range(size):
+        intent = intents[index % len(intents)]
+        corpus.append((_fill(rng.choice(TEMPLATES[intent]), rng), intent))
+    return corpus
+
+
+def missing_intents(intent_rules):
+    """返回 INTENT_RULES 中没有模板的意图"""
+    return [intent for intent in intent_rules if intent not in TEMPLATES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试语料（TSV：语句\\t意图）")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default="-", help="输出文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    lines = [f"{text}\t{intent}" for text, intent in build_corpus(args.size, args.seed)]
+    if args.output == "-":
+        print("\n".join(lines))
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端基准测试
+用固定回复的 StubAPIIntegrator 替代网络和本地操作，测量 generate_response 一整轮的耗时
+（NLP、上下文推断、槽位提取、处理函数、上下文持久化、对话历史写入）
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import measure
+
+
+class StubAPIIntegrator:
+    """不访问网络、不执行本地操作的API集成器，可选模拟网络延迟"""
+
+    def __init__(self, latency=0.0):
+        """初始化
+        Args:
+            latency: 每次网络查询模拟的延迟（秒），默认不等待，只测量本地处理耗时
+        """
+        self.latency = latency
+        self.calls = 0
+
+    def _network(self, result):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return result
+
+    def get_weather(self, city, time=None):
+        return self._network(f"{city}{time or '今日'}天气：晴，温度：18℃/26℃，风力：3级")
+
+    def get_news(self, category="top", count=5):
+        return self._network("\n".join(f"{i + 1}. 新闻标题{i + 1}" for i in range(count)))
+
+    def search_internet(self, query, fuzzy=True, top_k=3):
+        return self._network("\n\n".join(f"{i + 1}. {query}相关结果{i + 1}\n摘要" for i in range(top_k)))
+
+    def search_map(self, location):
+        return self._network(f"已为您搜索{location}的地图信息")
+
+    def play_music(self, song_name):
+        return self._network(f"正在为您播放{song_name}")
+
+    def open_folder(self, path):
+        self.calls += 1
+        return f"已打开文件夹：{path}"
+
+    def open_application(self, app_name):
+        self.calls += 1
+        return f"已打开应用程序：{app_name}"
+
+    def list_files(self, directory):
+        self.calls += 1
+        return f"{directory}中的文件：a.txt, b.txt"
+
+    def is_cached(self, method, *args):
+        # 基准测试中不触发预取
+        return True
+
+
+def run(corpus, dialogue_manager, size=1000, latency=0.0, rounds=3):
+    """运行端到端基准
+    Args:
+        corpus: [(语句, 意图), ...]
+        dialogue_manager: DialogueManager 实例
+        size: 处理的语句数量
+        latency: 模拟的网络延迟（秒）
+        rounds: 运行的轮数
+    Returns:
+        {基准名称: 统计结果}
+    """
+    api_integrator = StubAPIIntegrator(latency=latency)
+    texts = [text for text, _ in corpus[:size]]
+    return {
+        "e2e.generate_response": measure(
+            lambda text: dialogue_manager.generate_response(text, api_integrator),
+            texts, warmup=20, rounds=rounds
+        )
+    }
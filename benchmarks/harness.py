@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试工具
+逐次计时、汇总统计、保存JSON结果，并与保存的基线比较
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(func, inputs, warmup=100, rounds=3):
+    """逐次调用 func(input) 计时
+    整个输入列表运行 rounds 轮，取中位数最小的一轮作为结果，减少后台负载和频率波动的影响
+    Args:
+        func: 被测函数，接收一个输入
+        inputs: 输入列表，按顺序调用
+        warmup: 正式计时前的预热调用次数
+        rounds: 运行的轮数
+    Returns:
+        统计结果字典（单位：微秒）
+    """
+    for item in inputs[:warmup]:
+        func(item)
+
+    best = None
+    perf_counter = time.perf_counter
+    for _ in range(rounds):
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        timings = []
+        try:
+            for item in inputs:
+                start = perf_counter()
+                func(item)
+                timings.append(perf_counter() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        stats = summarize(timings)
+        if best is None or stats["median_us"] < best["median_us"]:
+            best = stats
+    best["rounds"] = rounds
+    return best
+
+
+def summarize(timings):
+    """汇总计时结果（秒 -> 微秒）"""
+    ordered = sorted(timings)
+    count = len(ordered)
+    total = sum(ordered)
+
+    def percentile(q):
+        return ordered[min(count - 1, int(q * count))] * 1e6
+
+    return {
+        "calls": count,
+        "mean_us": total / count * 1e6,
+        "median_us": statistics.median(ordered) * 1e6,
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "min_us": ordered[0] * 1e6,
+        "stdev_us": statistics.pstdev(ordered) * 1e6,
+        "ops_per_sec": count / total if total else 0.0
+    }
+
+
+def environment():
+    """记录运行环境，比较结果时用于判断是否可比"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
+
+
+def save_results(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.10, metric="median_us"):
+    """与基线比较
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+        threshold: 允许的相对变慢比例，超过即视为性能回退
+        metric: 比较的统计量
+    Returns:
+        [(名称, 基线值, 本次值, 相对变化, 是否回退), ...]
+    """
+    rows = []
+    base_benchmarks = baseline.get("benchmarks", {})
+    for name, stats in results.get("benchmarks", {}).items():
+        base = base_benchmarks.get(name)
+        if not base or not base.get(metric):
+            continue
+        change = stats[metric] / base[metric] - 1
+        rows.append((name, base[metric], stats[metric], change, change > threshold))
+    return rows
+
+
+def format_table(results):
+    """格式化本次结果"""
+    lines = [f"{'基准':<36}{'调用次数':>10}{'中位数(us)':>14}{'P95(us)':>12}{'每秒次数':>14}"]
+    for name, stats in results.get("benchmarks", {}).items():
+        lines.append(
+            f"{name:<36}{stats['calls']:>10}{stats['median_us']:>14.2f}{stats['p95_us']:>12.2f}{stats['ops_per_sec']:>14.0f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows, metric="median_us"):
+    """格式化与基线的比较结果"""
+    lines = [f"{'基准':<36}{'基线':>14}{'本次':>14}{'变化':>10}  ({metric})"]
+    for name, base, current, change, regressed in rows:
+        flag = "  <-- 回退" if regressed else ""
+        lines.append(f"{name:<36}{base:>14.2f}{current:>14.2f}{change:>+10.1%}{flag}")
+    return "\n".join(lines)
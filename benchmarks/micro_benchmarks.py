@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微基准测试
+NLP（意图识别、实体提取、情感分析、编辑距离）、加密和对话历史写入的单次调用耗时
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import measure
+
+
+def run(corpus, nlp_processor, dialogue_manager, db_size=500, rounds=3):
+    """运行所有微基准
+    Args:
+        corpus: [(语句, 意图), ...]
+        nlp_processor: NLPProcessor 实例
+        dialogue_manager: DialogueManager 实例（对话历史写入临时数据库）
+        db_size: 对话历史写入的调用次数（磁盘写入较慢，只取部分语料）
+        rounds: 每个基准运行的轮数
+    Returns:
+        ({基准名称: 统计结果}, {质量指标: 值})
+    """
+    from src.security.security_manager import get_security_manager
+
+    texts = [text for text, _ in corpus]
+    processed = [nlp_processor._preprocess_text(text) for text in texts]
+    pairs = list(zip(texts, texts[1:] + texts[:1]))
+    security_manager = get_security_manager()
+
+    results = {
+        "nlp.process_text": measure(nlp_processor.process_text, texts, rounds=rounds),
+        "nlp.recognize_intent": measure(nlp_processor.recognize_intent, processed, rounds=rounds),
+        "nlp.extract_entities": measure(nlp_processor.extract_entities, processed, rounds=rounds),
+        "nlp.sentiment_analysis": measure(nlp_processor.sentiment_analysis, texts, rounds=rounds),
+        "nlp.levenshtein_distance": measure(
+            lambda pair: nlp_processor.levenshtein_distance(*pair), pairs, rounds=rounds
+        ),
+        "security.encrypt": measure(security_manager.encrypt, texts, rounds=rounds),
+        "dialogue.save_dialogue_history": measure(
+            lambda item: dialogue_manager._save_dialogue_history(item[0], item[1], "[]", f"已处理：{item[0]}"),
+            corpus[:db_size], warmup=10, rounds=rounds
+        )
+    }
+
+    # 意图识别与语料标注的一致率，用于发现优化时意外改变了识别结果
+    matched = sum(1 for text, (_, intent) in zip(processed, corpus) if nlp_processor.recognize_intent(text) == intent)
+    quality = {"intent_accuracy": matched / len(corpus)}
+    return results, quality
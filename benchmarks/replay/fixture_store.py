@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP回放数据存储
+每个录制的响应保存为一个JSON文件（URL、状态码、内容类型、正文），
+文件名为规范化URL的哈希，录制时的URL和回放服务器收到的（百分号编码的）URL对应同一个文件
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api_integration.web_crawler import normalize_url
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+class FixtureStore:
+    """回放数据目录"""
+
+    def __init__(self, directory=DEFAULT_FIXTURE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, url):
+        return os.path.join(self.directory, self.key(url) + ".json")
+
+    def save(self, url, body, status=200, content_type="text/html; charset=utf-8"):
+        """保存一个响应（同一URL再次录制时覆盖）"""
+        record = {"url": normalize_url(url), "status": status, "content_type": content_type, "body": body}
+        path = self._path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+
+    def load(self, url):
+        """读取URL对应的响应，没有录制时返回None"""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def urls(self):
+        """所有已录制的（规范化）URL"""
+        result = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    result.append(json.load(f)["url"])
+        return result
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
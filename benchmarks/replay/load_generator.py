@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API集成器压测
+以固定速率（开环，不因响应变慢而降低发送速率）向 APIIntegrator 发送天气、新闻、搜索查询，
+爬虫请求转发到本地回放服务器，统计吞吐量和 P50/P95/P99 延迟。
+延迟从计划发送时刻开始计算，包含排队等待的时间
+    python benchmarks/replay/recorder.py --synthesize
+    python benchmarks/replay/load_generator.py --rps 50 --duration 10 --latency 80 --jitter 20
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import APIConfig
+from benchmarks.harness import summarize, environment, save_results
+from benchmarks.replay.fixture_store import FixtureStore, DEFAULT_FIXTURE_DIR
+from benchmarks.replay.stub_server import StubServer
+from benchmarks.replay.scenarios import LookupSampler
+
+logger = logging.getLogger(__name__)
+
+
+class LoadGenerator:
+    """开环压测：按固定速率发送查询"""
+
+    def __init__(self, api_integrator, rps, duration, concurrency=16, sampler=None):
+        """初始化压测
+        Args:
+            api_integrator: 被测的 APIIntegrator
+            rps: 每秒发送的请求数
+            duration: 压测时长（秒）
+            concurrency: 工作线程数（同时进行的请求上限）
+            sampler: 查询抽样器，默认按 DEFAULT_MIX 比例抽样
+        """
+        self.api_integrator = api_integrator
+        self.rps = rps
+        self.duration = duration
+        self.concurrency = concurrency
+        self.sampler = sampler or LookupSampler()
+
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._service_times = []
+        self._errors = 0
+
+    def _execute(self, scheduled, method, args):
+        started = time.perf_counter()
+        try:
+            result = getattr(self.api_integrator, method)(*args)
+            failed = not result or result.startswith("抱歉")
+        except Exception as e:
+            logger.error(f"请求失败 - {method}{args}: {e}")
+            failed = True
+        finished = time.perf_counter()
+        with self._lock:
+            self._latencies.append(finished - scheduled)
+            self._service_times.append(finished - started)
+            if failed:
+                self._errors += 1
+
+    def run(self):
+        """执行压测
+        Returns:
+            结果字典
+        """
+        total = int(self.rps * self.duration)
+        interval = 1.0 / self.rps
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load") as executor:
+            start = time.perf_counter()
+            for index in range(total):
+                scheduled = start + index * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                method, args = self.sampler.sample()
+                executor.submit(self._execute, scheduled, method, args)
+        elapsed = time.perf_counter() - start
+        return self._report(total, elapsed)
+
+    def _report(self, total, elapsed):
+        latency = summarize(self._latencies) if self._latencies else {}
+        service = summarize(self._service_times) if self._service_times else {}
+
+        def ms(stats, key):
+            return stats.get(key, 0.0) / 1000
+
+        return {
+            "requests": total,
+            "completed": len(self._latencies),
+            "errors": self._errors,
+            "elapsed_s": elapsed,
+            "target_rps": self.rps,
+            "throughput_rps": len(self._latencies) / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "mean": ms(latency, "mean_us"), "p50": ms(latency, "median_us"),
+                "p95": ms(latency, "p95_us"), "p99": ms(latency, "p99_us")
+            },
+            "service_time_ms": {
+                "mean": ms(service, "mean_us"), "p50": ms(service, "median_us"),
+                "p95": ms(service, "p95_us"), "p99": ms(service, "p99_us")
+            }
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="API集成器压测（回放录制的网页）")
+    parser.add_argument("--rps", type=float, default=20, help="每秒请求数")
+    parser.add_argument("--duration", type=float, default=10, help="压测时长（秒）")
+    parser.add_argument("--concurrency", type=int, default=16, help="工作线程数")
+    parser.add_argument("--latency", type=float, default=50, help="回放服务器平均延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=10, help="回放服务器延迟标准差（毫秒）")
+    parser.add_argument("--pool-size", type=int, default=APIConfig.HTTP_POOL_SIZE, help="爬虫每个主机的连接池大小")
+    parser.add_argument("--no-cache", action="store_true", help="关闭API集成器的查询结果缓存")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="回放数据目录")
+    parser.add_argument("--seed", type=int, default=0, help="查询抽样和延迟抖动的随机种子")
+    parser.add_argument("--output", help="结果JSON文件路径")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    store = FixtureStore(args.fixtures)
+    if not len(store):
+        print(f"{args.fixtures} 中没有录制数据，请先运行 benchmarks/replay/recorder.py")
+        return 1
+
+    APIConfig.HTTP_POOL_SIZE = args.pool_size
+    from src.api_integration.api_integrator import APIIntegrator
+
+    with StubServer(store, latency=args.latency / 1000, jitter=args.jitter / 1000, seed=args.seed) as server:
+        api_integrator = APIIntegrator()
+        api_integrator.crawler.url_rewriter = server.url_rewriter()
+        if args.no_cache:
+            api_integrator.response_cache = None
+
+        generator = LoadGenerator(api_integrator, args.rps, args.duration, args.concurrency,
+                                  LookupSampler(seed=args.seed))
+        report = generator.run()
+        report["upstream_requests"] = server.requests
+        report["upstream_misses"] = server.misses
+
+    report["parameters"] = vars(args)
+    report["environment"] = environment()
+    if api_integrator.response_cache is not None:
+        report["cache"] = api_integrator.get_cache_stats()
+
+    latency, service = report["latency_ms"], report["service_time_ms"]
+    print(f"请求: {report['completed']}/{report['requests']}，失败: {report['errors']}，"
+          f"上游请求: {report['upstream_requests']}（未录制: {report['upstream_misses']}）")
+    print(f"吞吐量: {report['throughput_rps']:.1f} 次/秒（目标 {args.rps:g}）")
+    print(f"延迟(ms)     P50 {latency['p50']:8.1f}  P95 {latency['p95']:8.1f}  P99 {latency['p99']:8.1f}")
+    print(f"处理时间(ms) P50 {service['p50']:8.1f}  P95 {service['p95']:8.1f}  P99 {service['p99']:8.1f}")
+
+    if args.output:
+        save_results(report, args.output)
+        print(f"结果已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP响应录制
+把 WebCrawler 请求到的网页保存到回放数据目录：
+    python benchmarks/replay/recorder.py               访问真实网站录制所有场景
+    python benchmarks/replay/recorder.py --synthesize  不访问网络，生成结构相同的模拟网页
+模拟网页与中国天气网、新浪新闻、必应搜索的页面结构一致，足够驱动爬虫的解析逻辑
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api_integration.web_crawler import normalize_url
+from benchmarks.replay.fixture_store import FixtureStore, DEFAULT_FIXTURE_DIR
+from benchmarks.replay.scenarios import all_lookups
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureRecorder:
+    """包装 WebCrawler._fetch，把每个响应写入回放数据目录"""
+
+    def __init__(self, store):
+        self.store = store
+        self.recorded = 0
+
+    def install(self, crawler, fetch=None):
+        """安装到爬虫上
+        Args:
+            crawler: WebCrawler 实例
+            fetch: 可选的替代请求函数（如生成模拟网页），默认使用爬虫原有的请求函数
+        """
+        original_fetch = fetch or crawler._fetch
+
+        def recording_fetch(url):
+            body = original_fetch(url)
+            self.store.save(url, body)
+            self.recorded += 1
+            return body
+
+        crawler._fetch = recording_fetch
+        return crawler
+
+
+def synthetic_page(url):
+    """生成与真实网站结构一致的模拟网页"""
+    normalized = normalize_url(url)
+    seed = sum(normalized.encode("utf-8"))
+    if normalized.startswith("www.weather.com.cn"):
+        weathers = ["晴", "多云", "阴", "小雨", "雷阵雨", "晴转多云", "阵雨"]
+        days = []
+        for day in range(7):
+            high = 18 + (seed + day * 3) % 12
+            weather = weathers[(seed + day) % len(weathers)]
+            days.append(
+                f'<li class="sky"><h1>{19 + day}日（{"今天" if day == 0 else f"{day}天后"}）</h1>'
+                f'<p class="wea">{weather}</p><p class="wea">{weather}</p>'
+                f'<p class="tem"><span>{high}</span>/<i>{high - 8}℃</i></p>'
+                f'<p class="win"><i>{1 + (seed + day) % 4}级</i></p></li>'
+            )
+        filler = "<div class=\"filler\">" + "天气预报" * 2000 + "</div>"
+        return f'<html><body>{filler}<div class="c7d"><ul>{"".join(days)}</ul></div></body></html>'
+    if normalized.startswith("news.sina.com.cn"):
+        items = "".join(f'<li><a href="https://news.sina.com.cn/{i}.html">今日要闻第{i + 1}条</a></li>' for i in range(20))
+        return f'<html><body><div class="news-item"><ul>{items}</ul></div></body></html>'
+    if normalized.startswith("cn.bing.com"):
+        query = normalized.partition("q=")[2]
+        results = "".join(
+            f'<li class="b_algo"><h2><a href="https://example.com/{i}">{query} 相关结果{i + 1}</a></h2>'
+            f'<div class="b_caption"><p>关于{query}的介绍和资料，第{i + 1}条摘要。</p></div></li>'
+            for i in range(10)
+        )
+        return f'<html><body><ol id="b_results">{results}</ol></body></html>'
+    return "<html><body></body></html>"
+
+
+def record(store, synthesize=False):
+    """执行所有场景的查询并录制响应
+    Returns:
+        录制的响应数量
+    """
+    from src.api_integration.api_integrator import APIIntegrator
+
+    api_integrator = APIIntegrator()
+    api_integrator.response_cache = None
+    recorder = FixtureRecorder(store)
+    recorder.install(api_integrator.crawler, fetch=synthetic_page if synthesize else None)
+
+    for method, args in all_lookups():
+        result = getattr(api_integrator, method)(*args)
+        logger.info(f"{method}{args}: {result[:40]!r}")
+    return recorder.recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制爬虫请求的网页")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="回放数据目录")
+    parser.add_argument("--synthesize", action="store_true", help="不访问网络，生成模拟网页")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    count = record(FixtureStore(args.fixtures), synthesize=args.synthesize)
+    print(f"已录制 {count} 个响应到 {args.fixtures}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回放场景
+录制和压测使用同一组查询，保证压测时每个请求都有对应的录制数据
+"""
+
+import os
+import sys
+import random
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+CITIES = ["北京", "上海", "广州", "深圳", "杭州", "成都", "西安", "武汉", "南京", "重庆"]
+TIMES = [None, "明天", "后天"]
+QUERIES = ["量子计算", "人工智能", "光合作用", "区块链", "黑洞", "相对论", "新能源汽车", "深度学习"]
+
+# 查询类型的比例（天气查询最多）
+DEFAULT_MIX = {"weather": 0.6, "news": 0.2, "search": 0.2}
+
+
+def all_lookups():
+    """所有可能的查询（录制时逐个执行一次）
+    Returns:
+        [(APIIntegrator方法名, 参数元组), ...]
+    """
+    lookups = [("get_weather", (city, time)) for city in CITIES for time in TIMES]
+    lookups.append(("get_news", ()))
+    lookups.extend(("search_internet", (query,)) for query in QUERIES)
+    return lookups
+
+
+class LookupSampler:
+    """按比例随机抽取查询（固定随机种子，压测可重复）"""
+
+    def __init__(self, mix=None, seed=0):
+        self.mix = mix or DEFAULT_MIX
+        self._rng = random.Random(seed)
+        self._kinds = list(self.mix)
+        self._weights = [self.mix[kind] for kind in self._kinds]
+
+    def sample(self):
+        kind = self._rng.choices(self._kinds, self._weights)[0]
+        if kind == "weather":
+            return "get_weather", (self._rng.choice(CITIES), self._rng.choice(TIMES))
+        if kind == "news":
+            return "get_news", ()
+        return "search_internet", (self._rng.choice(QUERIES),)
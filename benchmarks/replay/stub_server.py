@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地回放服务器
+按请求路径返回录制的响应，并模拟上游的网络延迟和抖动。
+爬虫通过 URL 改写把 http://www.weather.com.cn/weather/xxx.shtml
+请求到 http://127.0.0.1:<端口>/www.weather.com.cn/weather/xxx.shtml
+    python benchmarks/replay/stub_server.py --port 8765 --latency 80 --jitter 20
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.replay.fixture_store import FixtureStore, DEFAULT_FIXTURE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class StubServer:
+    """回放录制响应的HTTP服务器"""
+
+    def __init__(self, store, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, seed=0):
+        """初始化服务器
+        Args:
+            store: FixtureStore 回放数据
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            latency: 每个响应的平均延迟（秒）
+            jitter: 延迟的标准差（秒），按正态分布抖动，不小于0
+            seed: 抖动的随机种子
+        """
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.misses = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_rewriter(self):
+        """返回供 WebCrawler 使用的URL改写函数"""
+        base_url = self.base_url
+
+        def rewrite(url):
+            return f"{base_url}/{url.split('://', 1)[-1]}"
+        return rewrite
+
+    def _delay(self):
+        if not self.latency and not self.jitter:
+            return 0.0
+        with self._lock:
+            return max(0.0, self._rng.gauss(self.latency, self.jitter))
+
+    def _handle(self, handler):
+        record = self.store.load("http://" + unquote(handler.path.lstrip("/")))
+        with self._lock:
+            self.requests += 1
+            if record is None:
+                self.misses += 1
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+        if record is None:
+            body, status, content_type = "no fixture".encode("utf-8"), 404, "text/plain; charset=utf-8"
+        else:
+            body, status, content_type = record["body"].encode("utf-8"), record["status"], record["content_type"]
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录制响应的本地HTTP服务器")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="回放数据目录")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="平均延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟标准差（毫秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StubServer(FixtureStore(args.fixtures), args.host, args.port, args.latency / 1000, args.jitter / 1000)
+    print(f"回放服务器已启动: {server.base_url}（{len(server.store)} 个录制响应）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试入口
+    python benchmarks/run_benchmarks.py                  运行全部基准，与基线比较
+    python benchmarks/run_benchmarks.py --save-baseline  运行并把结果保存为新的基线
+    python benchmarks/run_benchmarks.py --only micro     只运行微基准
+
+结果保存为JSON（默认 benchmarks/results/<时间>.json）。与基线相比中位数变慢超过阈值，
+或意图识别一致率下降时，以非零状态码退出，可直接用于CI检查性能回退。
+对话历史和上下文写入临时目录，不影响 data/ 下的数据
+"""
+
+import os
+import sys
+import shutil
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DialogueManagerConfig
+from benchmarks import corpus as corpus_module
+from benchmarks.harness import (environment, save_results, load_results, compare,
+                                format_table, format_comparison)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# 意图识别一致率允许的下降幅度
+ACCURACY_TOLERANCE = 0.005
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="文本处理流程基准测试")
+    parser.add_argument("--size", type=int, default=corpus_module.DEFAULT_SIZE, help="语料数量")
+    parser.add_argument("--seed", type=int, default=corpus_module.DEFAULT_SEED, help="语料随机种子")
+    parser.add_argument("--db-size", type=int, default=500, help="对话历史写入基准的调用次数")
+    parser.add_argument("--e2e-size", type=int, default=1000, help="端到端基准处理的语句数量")
+    parser.add_argument("--latency", type=float, default=0.0, help="端到端基准模拟的网络延迟（秒）")
+    parser.add_argument("--rounds", type=int, default=3, help="每个基准运行的轮数（取最快的一轮）")
+    parser.add_argument("--only", choices=["micro", "e2e"], help="只运行指定部分")
+    parser.add_argument("--output", help="结果文件路径，默认 benchmarks/results/<时间>.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.10, help="允许的相对变慢比例")
+    parser.add_argument("--log-level", default="WARNING", help="运行期间的日志级别")
+    return parser.parse_args()
+
+
+def isolate_data(workdir):
+    """把对话历史和上下文存储指向临时目录，并关闭后台预取"""
+    DialogueManagerConfig.HISTORY_PATH = os.path.join(workdir, "dialogue_history.db")
+    DialogueManagerConfig.CONTEXT_STORE_PATH = os.path.join(workdir, "dialogue_context.db")
+    DialogueManagerConfig.PREFETCH_ENABLED = False
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+
+    workdir = tempfile.mkdtemp(prefix="voice-assistant-bench-")
+    try:
+        isolate_data(workdir)
+
+        from src.nlp.nlp_processor import NLPProcessor
+        from src.dialogue_manager.dialogue_manager import DialogueManager
+
+        nlp_processor = NLPProcessor()
+        missing = corpus_module.missing_intents(nlp_processor.INTENT_RULES)
+        if missing:
+            print(f"警告：以下意图没有语料模板：{', '.join(missing)}")
+
+        corpus = corpus_module.build_corpus(args.size, args.seed)
+        results = {
+            "environment": environment(),
+            "parameters": {
+                "size": args.size, "seed": args.seed, "db_size": args.db_size,
+                "e2e_size": args.e2e_size, "latency": args.latency, "rounds": args.rounds
+            },
+            "benchmarks": {},
+            "quality": {}
+        }
+
+        if args.only in (None, "micro"):
+            from benchmarks import micro_benchmarks
+            dialogue_manager = DialogueManager(nlp_processor=nlp_processor)
+            benchmarks, quality = micro_benchmarks.run(
+                corpus, nlp_processor, dialogue_manager, args.db_size, args.rounds
+            )
+            results["benchmarks"].update(benchmarks)
+            results["quality"].update(quality)
+
+        if args.only in (None, "e2e"):
+            from benchmarks import e2e_benchmark
+            dialogue_manager = DialogueManager(nlp_processor=nlp_processor)
+            results["benchmarks"].update(e2e_benchmark.run(
+                corpus, dialogue_manager, args.e2e_size, args.latency, args.rounds
+            ))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_table(results))
+    for name, value in results["quality"].items():
+        print(f"{name}: {value:.4f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    save_results(results, output)
+    print(f"\n结果已保存: {output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"已保存为基线: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("没有基线，跳过比较（使用 --save-baseline 保存基线）")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline.get("parameters") != results["parameters"]:
+        print("警告：基线与本次的参数不同，比较结果可能没有意义")
+    if baseline.get("environment", {}).get("platform") != results["environment"]["platform"]:
+        print("警告：基线与本次的运行环境不同，比较结果可能没有意义")
+
+    rows = compare(results, baseline, args.threshold)
+    print("\n与基线比较:")
+    print(format_comparison(rows))
+
+    regressed = [name for name, _, _, _, is_regressed in rows if is_regressed]
+    for name, value in results["quality"].items():
+        base_value = baseline.get("quality", {}).get(name)
+        if base_value is not None and value < base_value - ACCURACY_TOLERANCE:
+            print(f"{name} 从 {base_value:.4f} 下降到 {value:.4f}")
+            regressed.append(name)
+
+    if regressed:
+        print(f"\n性能回退: {', '.join(regressed)}")
+        return 1
+    print("\n没有发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,17 @@ class SpeechRecognitionConfig:
     BAIDU_API_KEY = "your_baidu_api_key"
     BAIDU_SECRET_KEY = "your_baidu_secret_key"
     BAIDU_APP_ID = "your_baidu_app_id"
+    BAIDU_DEV_PID = 1537  # 识别模型：1537为普通话
+    BAIDU_TOKEN_URL = "https://aip.baidubce.com/oauth/2.0/token"
+    BAIDU_ASR_URL = "https://vop.baidu.com/server_api"
+    
+    # 识别调度配置：主引擎超过对冲延迟未返回时同时启动备用引擎
+    RECOGNITION_HEDGE_DELAY = 1.0  # 秒，设为0表示所有引擎同时识别
+    RECOGNITION_TIMEOUT = 10  # 单次识别总超时（秒）
+    
+    # 持续监听配置
+    CONTINUOUS_QUEUE_SIZE = 4  # 待识别语音片段队列容量
+    CONTINUOUS_RECOGNITION_WORKERS = 2  # 识别线程数量
     
     # 语音识别语言
     LANGUAGE = "zh-CN"
@@ -19,6 +30,13 @@ class SpeechRecognitionConfig:
     
     # 唤醒词
     WAKE_UP_WORDS = ["小爱同学", "小助手", "语音助手"]
+    
+    # 本地唤醒词检测配置（模板为16kHz单声道16位WAV录音）
+    WAKE_WORD_TEMPLATE_DIR = "data/wake_word_templates"
+    WAKE_WORD_DTW_THRESHOLD = 0.35  # DTW距离阈值，越小越严格
+    WAKE_WORD_WINDOW_SECONDS = 2.5  # 每次本地检测的最大音频长度
+    WAKE_WORD_DTW_BAND = 0.2  # DTW的Sakoe-Chiba带宽（模板长度的比例）
+    WAKE_WORD_MIN_COMMAND_SECONDS = 0.3  # 唤醒词之后的语音超过该长度时视为同一句话中的命令
 
 # 自然语言处理配置
 class NLPConfig:
@@ -33,6 +51,13 @@ class NLPConfig:
     
     # 实体识别模型路径
     ENTITY_MODEL_PATH = "models/entity_model.pkl"
+    
+    # 意图规则、实体词典、同义词、城市代码和应用路径所在目录（相对路径按项目根目录解析）
+    RULES_DIR = "data/rules"
+    
+    # 规则文件修改后自动重新加载，以及检查文件变化的间隔（秒）
+    RULES_RELOAD_ENABLED = True
+    RULES_RELOAD_INTERVAL = 2.0
 
 # 语音合成配置
 class TTSConfig:
@@ -47,6 +72,23 @@ class TTSConfig:
     VOICE_RATE = 150  # 语速
     VOICE_VOLUME = 1.0  # 音量 (0.0-1.0)
     VOICE_ID = 0  # 语音ID（不同引擎有不同的语音选择）
+    
+    # 用户开始说话时打断正在进行的播报（barge-in）
+    # 外放时麦克风会录入助手自己的声音，建议在使用耳机或具备回声消除时开启
+    BARGE_IN_ENABLED = False
+    
+    # 流式合成参数（百度引擎）：逐句合成，首句就绪即开始播放
+    STREAMING_MAX_PARALLEL = 3  # 同时进行的合成请求数量
+    STREAMING_MAX_SEGMENT_CHARS = 50  # 单个片段最大字数
+    
+    # 合成语音缓存（按文本和语音参数缓存，固定回复只合成一次）
+    AUDIO_CACHE_ENABLED = True
+    AUDIO_CACHE_DIR = "data/tts_cache"  # 只保存预热的固定文本，动态回复只进入内存缓存
+    AUDIO_CACHE_MEMORY_MB = 16  # 内存缓存上限
+    
+    # 音频输出："auto"（优先PyAudio，其次pygame）、"pyaudio"、"pygame"、"wav"（写入文件）或 "null"（不发声）
+    AUDIO_BACKEND = "auto"
+    AUDIO_SINK_PATH = "data/tts_output.wav"  # "wav"输出时的文件路径
 
 # 对话管理配置
 class DialogueManagerConfig:
@@ -62,6 +104,28 @@ class DialogueManagerConfig:
         "能请您再说一遍吗？",
         "我还在学习中，这个问题有点难倒我了。"
     ]
+    
+    # 对话上下文持久化（重启后恢复用户偏好和会话）
+    CONTEXT_STORE_ENABLED = True
+    CONTEXT_STORE_PATH = "data/dialogue_context.db"
+    CONTEXT_RETENTION = 30 * 24 * 3600  # 持久化会话超过该时间（秒）未更新时删除
+    CONTEXT_PURGE_INTERVAL = 3600       # 清理过期持久化会话的最短间隔（秒）
+    
+    # 复合语句多意图处理：独立的查询并发执行
+    MULTI_INTENT_ENABLED = True
+    MULTI_INTENT_WORKERS = 4
+    
+    # 多会话服务：最多保留的会话数量和会话空闲过期时间（秒）
+    MAX_SESSIONS = 1000
+    SESSION_TTL = 1800
+    
+    # 追问预取：按意图转移统计在后台预先查询最可能的下一轮（天气“明天呢”、搜索“更多”等）
+    PREFETCH_ENABLED = True
+    PREFETCH_WORKERS = 2
+    PREFETCH_MIN_PROBABILITY = 0.3  # 下一轮意图的概率低于该值时不预取
+    PREFETCH_MAX_LOOKUPS = 3        # 每轮最多预取的查询数量
+    PREFETCH_RATE = 10              # 预取带宽预算：每分钟最多发出的请求数
+    PREFETCH_BURST = 4              # 预取带宽预算：允许的突发请求数
 
 # API集成配置
 class APIConfig:
@@ -84,6 +148,46 @@ class APIConfig:
     
     # 请求配置
     REQUEST_TIMEOUT = 10
+    HTTP_POOL_CONNECTIONS = 4  # 连接池缓存的主机数量
+    HTTP_POOL_SIZE = 10        # 每个主机最多保持的连接数
+    MAX_REQUESTS_PER_HOST = 4  # 同一主机同时进行的请求上限（批量查询、预取共用）
+    BATCH_WORKERS = 8          # 批量查询（如多个城市的天气）的线程数
+    
+    # 查询结果缓存（天气、新闻、搜索），预取的结果也写入这里
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_SIZE = 256
+    RESPONSE_CACHE_TTL = {
+        "weather": 600,
+        "news": 300,
+        "search": 600
+    }
+    
+    # 解析后的多日天气预报缓存（按城市），同一城市不同日期的查询共用一次网页请求
+    FORECAST_CACHE_SIZE = 128
+    FORECAST_CACHE_TTL = 1800
+
+# 对话服务配置
+class DialogueServerConfig:
+    HOST = "127.0.0.1"
+    PORT = 5000
+    
+    # 过期会话的清理间隔（秒）
+    SESSION_SWEEP_INTERVAL = 60
+
+# 性能监控配置
+class MonitoringConfig:
+    # 各阶段耗时追踪（ASR、NLP、处理函数、网络请求、数据库写入、TTS等）
+    # 关闭时被追踪的函数保持原样，不引入任何开销；需在程序启动前设置
+    TRACING_ENABLED = False
+    
+    # 耗时直方图的桶边界（秒）
+    TRACE_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+    
+    # 保留最近多少轮完整的调用树
+    TRACE_RECENT_TRACES = 20
+    
+    # 程序退出时导出统计结果的路径（JSON）
+    TRACE_EXPORT_PATH = "data/trace_metrics.json"
 
 # 安全配置
 class SecurityConfig:
@@ -109,6 +213,21 @@ class GlobalConfig:
     # 日志配置
     LOG_LEVEL = "INFO"
     LOG_FILE = "data/assistant.log"
+    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    
+    # 日志文件轮转：单个文件的最大字节数和保留的旧文件数量
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+    
+    # 按模块设置日志级别（模块名前缀 -> 级别），例如 {"src.nlp": "DEBUG"}
+    LOG_MODULE_LEVELS = {
+        "jieba": "WARNING",
+        "urllib3": "WARNING"
+    }
+    
+    # 热路径DEBUG日志的采样比例（0~1）和每条日志模板每秒最多输出的次数
+    LOG_DEBUG_SAMPLE_RATE = 1.0
+    LOG_DEBUG_RATE_LIMIT = 20
     
     # 调试模式
     DEBUG = True
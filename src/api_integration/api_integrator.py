@@ -8,7 +8,9 @@ import os
 import sys
 import logging
 import random
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -18,10 +20,19 @@ logger = logging.getLogger(__name__)
 from config.config import APIConfig, SecurityConfig
 from src.api_integration.web_crawler import WebCrawler
 from src.api_integration.local_operations import LocalOperations
+from src.api_integration.response_cache import ResponseCache
+from src.api_integration.single_flight import SingleFlight
 from src.security.security_manager import get_security_manager
 
 logger = logging.getLogger(__name__)
 
+# 可缓存的查询：方法名 -> 缓存键生成函数（键的第一个元素为缓存类别）
+CACHE_KEYS = {
+    "get_weather": lambda city, time=None: ("weather", city, time or None),
+    "get_news": lambda category="top", count=5: ("news", category, count),
+    "search_internet": lambda query, fuzzy=True, top_k=3: ("search", query, fuzzy, top_k)
+}
+
 class APIIntegrator:
     """API集成器类，负责与第三方服务交互和执行本地操作"""
     
@@ -47,14 +58,63 @@ class APIIntegrator:
         # 初始化网络爬虫和本地操作器
         self.crawler = WebCrawler()
         self.local_ops = LocalOperations()
+        
+        # 查询结果缓存：追问和后台预取的结果直接命中
+        self.response_cache = None
+        if APIConfig.RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(APIConfig.RESPONSE_CACHE_SIZE, APIConfig.RESPONSE_CACHE_TTL)
+        
+        # 相同的查询同时进行时只请求一次（例如预取和用户的追问同时查询同一城市）
+        self._single_flight = SingleFlight()
+        
+        # 批量查询的线程池（首次使用时创建）
+        self._batch_executor = None
+        self._batch_executor_lock = threading.Lock()
+    
+    def is_cached(self, method, *args):
+        """查询结果是否已在缓存中（预取前检查，避免重复请求）
+        Args:
+            method: 查询方法名（CACHE_KEYS中的键）
+            args: 查询参数，与调用该方法时相同
+        """
+        return self.response_cache is not None and self.response_cache.contains(CACHE_KEYS[method](*args))
+    
+    def get_cache_stats(self):
+        """获取查询结果缓存统计"""
+        return self.response_cache.get_stats() if self.response_cache else {}
+    
+    def _cached_call(self, method, fetch, *args):
+        """先查缓存，未命中时调用fetch并缓存成功的结果；相同查询正在进行时等待并共享其结果"""
+        key = CACHE_KEYS[method](*args)
+        if self.response_cache is not None:
+            result = self.response_cache.get(key)
+            if result is not None:
+                logger.debug("查询结果命中缓存: %s", key)
+                return result
+        return self._single_flight.do(key, self._fetch_and_cache, key, fetch, *args)
+    
+    def _fetch_and_cache(self, key, fetch, *args):
+        result = fetch(*args)
+        # 失败的提示信息不缓存，下次重新请求
+        if self.response_cache is not None and result and not result.startswith("抱歉"):
+            self.response_cache.put(key, result)
+        return result
+    
+    def _get_batch_executor(self):
+        with self._batch_executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=APIConfig.BATCH_WORKERS, thread_name_prefix="api-batch"
+                )
+            return self._batch_executor
     
     def get_weather(self, city, time=None):
         """获取指定城市的天气信息"""
         try:
-            logger.info(f"获取天气信息 - 城市: {city}, 时间: {time}")
+            logger.info("获取天气信息 - 城市: %s, 时间: %s", city, time)
             
             # 使用网络爬虫获取天气信息
-            return self.crawler.get_weather(city, time)
+            return self._cached_call("get_weather", self.crawler.get_weather, city, time)
             
         except Exception as e:
             logger.error(f"处理天气信息失败: {e}")
@@ -63,13 +123,32 @@ class APIIntegrator:
             else:
                 return f"抱歉，获取{city}的天气信息失败"
     
+    def get_weather_many(self, cities, time=None):
+        """并发获取多个城市的天气信息
+        Args:
+            cities: 城市名称列表
+            time: 时间信息（可选），所有城市相同
+        Returns:
+            与 cities 顺序一致的天气信息列表（重复的城市只查询一次）
+        """
+        unique_cities = list(dict.fromkeys(cities))
+        logger.info("批量获取天气信息 - 城市: %s, 时间: %s", "、".join(unique_cities), time)
+        if len(unique_cities) <= 1:
+            results = {city: self.get_weather(city, time) for city in unique_cities}
+        else:
+            # 同一主机的并发请求数由爬虫按主机限制
+            executor = self._get_batch_executor()
+            futures = {city: executor.submit(self.get_weather, city, time) for city in unique_cities}
+            results = {city: future.result() for city, future in futures.items()}
+        return [results[city] for city in cities]
+    
     def get_news(self, category="top", count=5):
         """获取新闻信息"""
         try:
-            logger.info(f"获取新闻信息 - 分类: {category}, 数量: {count}")
+            logger.info("获取新闻信息 - 分类: %s, 数量: %s", category, count)
             
             # 使用网络爬虫获取新闻信息
-            return self.crawler.get_news()
+            return self._cached_call("get_news", lambda category, count: self.crawler.get_news(), category, count)
             
         except Exception as e:
             logger.error(f"处理新闻信息失败: {e}")
@@ -78,7 +157,7 @@ class APIIntegrator:
     def get_translation(self, text, from_lang="zh", to_lang="en"):
         """获取翻译结果"""
         try:
-            logger.info(f"获取翻译结果 - 文本: {text}, 源语言: {from_lang}, 目标语言: {to_lang}")
+            logger.info("获取翻译结果 - 文本: %s, 源语言: %s, 目标语言: %s", text, from_lang, to_lang)
             
             # 使用网络爬虫获取翻译结果
             return self.crawler.search_internet(f"{text} 的{to_lang}翻译")
@@ -90,7 +169,7 @@ class APIIntegrator:
     def play_music(self, song_name):
         """播放音乐"""
         try:
-            logger.info(f"播放音乐 - 歌曲名称: {song_name}")
+            logger.info("播放音乐 - 歌曲名称: %s", song_name)
             
             # 使用网络爬虫搜索音乐
             return self.crawler.search_internet(f"{song_name} 在线播放")
@@ -102,7 +181,7 @@ class APIIntegrator:
     def get_stock_info(self, stock_code):
         """获取股票信息"""
         try:
-            logger.info(f"获取股票信息 - 股票代码: {stock_code}")
+            logger.info("获取股票信息 - 股票代码: %s", stock_code)
             
             # 使用网络爬虫获取股票信息
             return self.crawler.search_internet(f"{stock_code} 股票行情")
@@ -128,7 +207,7 @@ class APIIntegrator:
     def calculate(self, expression):
         """计算数学表达式"""
         try:
-            logger.info(f"计算数学表达式 - 表达式: {expression}")
+            logger.info("计算数学表达式 - 表达式: %s", expression)
             
             # 简单的数学计算（实际项目中可以使用更复杂的表达式解析库）
             # 只允许基本的四则运算，确保安全
@@ -162,7 +241,7 @@ class APIIntegrator:
     def open_folder(self, path):
         """打开指定文件夹"""
         try:
-            logger.info(f"打开文件夹 - 路径: {path}")
+            logger.info("打开文件夹 - 路径: %s", path)
             
             # 检查用户权限
             if not self.security_manager.has_permission("open_folder"):
@@ -177,7 +256,7 @@ class APIIntegrator:
     def open_application(self, app_name):
         """打开指定应用程序"""
         try:
-            logger.info(f"打开应用程序 - 名称: {app_name}")
+            logger.info("打开应用程序 - 名称: %s", app_name)
             
             # 检查用户权限
             if not self.security_manager.has_permission("open_application"):
@@ -192,7 +271,7 @@ class APIIntegrator:
     def run_command(self, command):
         """运行指定命令"""
         try:
-            logger.info(f"运行命令 - 命令: {command}")
+            logger.info("运行命令 - 命令: %s", command)
             
             # 检查用户权限
             from src.security.security_manager import get_security_manager
@@ -219,7 +298,7 @@ class APIIntegrator:
     def search_map(self, location):
         """搜索地图位置"""
         try:
-            logger.info(f"搜索地图位置 - 位置: {location}")
+            logger.info("搜索地图位置 - 位置: %s", location)
             return self.crawler.search_map(location)
         except Exception as e:
             logger.error(f"搜索地图位置失败: {e}")
@@ -233,8 +312,8 @@ class APIIntegrator:
             top_k: 返回的搜索结果数量，默认为3
         """
         try:
-            logger.info(f"搜索互联网 - 查询: {query}, 模糊搜索: {fuzzy}, 结果数量: {top_k}")
-            return self.crawler.search_internet(query, fuzzy=fuzzy, top_k=top_k)
+            logger.info("搜索互联网 - 查询: %s, 模糊搜索: %s, 结果数量: %s", query, fuzzy, top_k)
+            return self._cached_call("search_internet", self.crawler.search_internet, query, fuzzy, top_k)
         except Exception as e:
             logger.error(f"搜索互联网失败: {e}")
             return f"抱歉，搜索互联网时出错"
@@ -242,7 +321,7 @@ class APIIntegrator:
     def list_files(self, directory):
         """列出目录中的文件"""
         try:
-            logger.info(f"列出目录文件 - 目录: {directory}")
+            logger.info("列出目录文件 - 目录: %s", directory)
             
             # 检查用户权限
             if not self.security_manager.has_permission("list_files"):
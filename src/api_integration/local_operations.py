@@ -6,10 +6,16 @@
 """
 
 import os
+import sys
 import subprocess
 import logging
 import platform
 
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.nlp.rule_store import get_rule_store
+
 logger = logging.getLogger(__name__)
 
 class LocalOperations:
@@ -70,54 +76,8 @@ class LocalOperations:
             操作结果字符串
         """
         try:
-            # 应用程序路径映射
-            app_paths = {
-                '记事本': 'notepad.exe',
-                '计算器': 'calc.exe',
-                '画图': 'mspaint.exe',
-                '浏览器': 'start "" https://www.baidu.com',
-                'chrome': 'chrome.exe',
-                'edge': 'msedge.exe',
-                'firefox': 'firefox.exe',
-                'word': 'winword.exe',
-                'excel': 'excel.exe',
-                'powerpoint': 'powerpnt.exe',
-                'vscode': 'code.exe',
-                'pycharm': 'pycharm64.exe',
-                '酷狗': 'start "" "KuGou"',
-                '酷狗音乐': 'start "" "KuGou"',
-                '支付宝': 'start "" https://www.alipay.com',
-                '淘宝': 'start "" https://www.taobao.com',
-                '京东': 'start "" https://www.jd.com',
-                '抖音': 'start "" https://www.douyin.com',
-                '快手': 'start "" https://www.kuaishou.com',
-                '小红书': 'start "" https://www.xiaohongshu.com',
-                '微博': 'start "" https://www.weibo.com',
-                'B站': 'start "" https://www.bilibili.com',
-                '哔哩哔哩': 'start "" https://www.bilibili.com',
-                '腾讯视频': 'start "" https://v.qq.com',
-                '爱奇艺': 'start "" https://www.iqiyi.com',
-                '优酷': 'start "" https://www.youku.com',
-                '网易云音乐': 'start "" https://music.163.com',
-                'QQ音乐': 'start "" https://y.qq.com',
-                '高德地图': 'start "" https://ditu.amap.com',
-                '百度地图': 'start "" https://map.baidu.com',
-                '滴滴出行': 'start "" https://www.didiglobal.com',
-                '美团': 'start "" https://www.meituan.com',
-                '饿了么': 'start "" https://www.ele.me',
-                '相机': 'mspaint.exe',
-                '相册': 'explorer.exe shell:My Pictures',
-                '日历': 'explorer.exe shell:LocalAppData\Microsoft\Windows\Calendar',
-                '闹钟': 'explorer.exe shell:LocalAppData\Microsoft\Windows\Alarms',
-                '联系人': 'explorer.exe shell:LocalAppData\Microsoft\Windows\People',
-                '短信': 'explorer.exe shell:LocalAppData\Microsoft\Windows\Messaging',
-                '电话': 'start "" https://www.baidu.com/s?wd=网络电话',
-                '设置': 'start ms-settings:',
-                '蓝牙': 'start ms-settings:bluetooth',
-                'WiFi': 'start ms-settings:network-wifi',
-                '手电筒': 'start ms-settings:easeofaccess-keyboard',
-                '备忘录': 'start "" https://www.onenote.com'
-            }
+            # 应用程序路径映射（来自规则存储，修改 data/rules/app_paths.json 后自动生效）
+            app_paths = get_rule_store().snapshot.app_paths
             
             # 转换为小写进行匹配
             app_name_lower = app_name.lower()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询结果缓存模块
+缓存天气、新闻、搜索等网络查询的结果，按类别设置过期时间，条目数量超出上限时按LRU淘汰。
+对话中的追问和后台预取的结果都从这里命中，避免重复请求网络
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """带过期时间的LRU查询结果缓存"""
+
+    def __init__(self, max_entries=256, ttls=None, default_ttl=300):
+        """初始化缓存
+        Args:
+            max_entries: 最多缓存的条目数量
+            ttls: {类别: 过期时间（秒）}，类别为缓存键的第一个元素
+            default_ttl: 未配置类别的过期时间（秒）
+        """
+        self.max_entries = max_entries
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict()  # 键 -> (过期时间, 结果)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """读取缓存，未命中或已过期时返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def contains(self, key):
+        """是否有未过期的缓存（不计入命中统计）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def put(self, key, value, ttl=None):
+        """写入缓存
+        Args:
+            key: 缓存键，元组，第一个元素为类别（如"weather"）
+            value: 查询结果
+            ttl: 过期时间（秒），默认按类别配置
+        """
+        if ttl is None:
+            ttl = self.ttls.get(key[0], self.default_ttl)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """获取缓存统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求合并模块（single-flight）
+同一个键的请求正在进行时，后到的调用不再重复请求，而是等待并共享第一个调用的结果（或异常）。
+请求结束后键即被移除，之后的调用会重新请求（结果缓存由调用方负责）。
+同时支持线程（do）和协程（do_async）调用
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """按键合并并发的相同请求（线程安全）"""
+
+    def __init__(self):
+        self._calls = {}  # 键 -> 进行中的 Future
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def _join(self, key):
+        """加入该键的请求，返回 (Future, 是否由本次调用执行)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                logger.debug("合并进行中的请求: %s", key)
+                return future, False
+            future = self._calls[key] = Future()
+            # 标记为执行中：等待的协程被取消时不会连带取消这个共享的 Future
+            future.set_running_or_notify_cancel()
+            self.executed += 1
+            return future, True
+
+    def _run(self, key, future, func, args, kwargs):
+        """执行请求并把结果（或异常）交给所有等待的调用"""
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def do(self, key, func, *args, **kwargs):
+        """执行 func(*args, **kwargs)；同一个键已有调用在进行时等待并返回它的结果
+        Returns:
+            func 的返回值（异常同样传给所有等待的调用）
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, func, args, kwargs)
+        return future.result()
+
+    async def do_async(self, key, func, *args, executor=None, **kwargs):
+        """协程版本：阻塞的 func 在线程池中执行，等待时不占用事件循环
+        与 do() 共用同一组进行中的请求，线程和协程发起的相同请求同样会被合并。
+        发起请求的协程被取消时，请求仍会完成，其他等待的调用不受影响
+        Args:
+            executor: 执行 func 的线程池，默认使用事件循环的默认线程池
+        """
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(executor, self._run, key, future, func, args, kwargs)
+        return await asyncio.wrap_future(future)
+
+    def in_flight(self, key):
+        """该键的请求是否正在进行"""
+        with self._lock:
+            return key in self._calls
+
+    def get_stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
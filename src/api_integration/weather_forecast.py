@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+天气预报模块
+把中国天气网的7天预报页解析为结构化的预报对象（每天的日期、天气、温度范围和风力），
+同一城市的预报解析一次后按过期时间缓存，"明天"、"周五"、"这周"、"周末"等不同问法
+都从同一份预报中取对应的日期，不再每个问题请求一次网页
+"""
+
+import os
+import re
+import sys
+import logging
+from datetime import date, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = {"一": 0, "二": 1, "三": 2, "四": 3, "五": 4, "六": 5, "日": 6, "天": 6, "七": 6}
+WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+# 相对日期（较长的词在前，避免"大后天"被当成"后天"）
+RELATIVE_DAYS = [("大后天", 3), ("后天", 2), ("后日", 2), ("明天", 1), ("明日", 1), ("次日", 1),
+                 ("今天", 0), ("今日", 0), ("现在", 0), ("大前天", -3), ("前天", -2), ("昨天", -1), ("昨日", -1)]
+
+# "周天"表示周日，但"这周天气"中的"周天"不是
+_WEEKDAY_PATTERN = re.compile(r"(下下|下个?|上个?|这个?|本)?(?:周|星期|礼拜)([一二三四五六日七]|天(?!气))")
+_NEXT_DAYS_PATTERN = re.compile(r"(?:未来|接下来|最近|近)(\d+|[一二三四五六七两几])天")
+_CHINESE_NUMBERS = {"一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "几": 3}
+_TEMPERATURE_PATTERN = re.compile(r"-?\d+")
+
+
+class DayForecast:
+    """一天的天气预报"""
+
+    __slots__ = ("date", "label", "weather", "night_weather", "high", "low", "temperature", "wind")
+
+    def __init__(self, day, label, weather, night_weather, temperature, wind):
+        """初始化
+        Args:
+            day: 日期（datetime.date）
+            label: 页面上的日期文字，如"19日（今天）"
+            weather: 白天天气
+            night_weather: 夜间天气
+            temperature: 页面上的温度文字，如"26/18℃"
+            wind: 风力
+        """
+        self.date = day
+        self.label = label
+        self.weather = weather
+        self.night_weather = night_weather
+        self.temperature = temperature
+        self.wind = wind
+        numbers = [int(n) for n in _TEMPERATURE_PATTERN.findall(temperature)]
+        self.high = max(numbers) if numbers else None
+        self.low = min(numbers) if numbers else None
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat(), "label": self.label, "weather": self.weather,
+            "night_weather": self.night_weather, "high": self.high, "low": self.low, "wind": self.wind
+        }
+
+
+class Forecast:
+    """一个城市的多日预报（第一天为发布当天）"""
+
+    def __init__(self, city, days):
+        self.city = city
+        self.days = days
+
+    def __len__(self):
+        return len(self.days)
+
+    def on(self, day):
+        """指定日期的预报，不在预报范围内时返回 None"""
+        if not self.days:
+            return None
+        offset = (day - self.days[0].date).days
+        if 0 <= offset < len(self.days):
+            return self.days[offset]
+        return None
+
+    def select(self, time=None, today=None):
+        """按时间描述选出对应日期的预报
+        Args:
+            time: "明天"、"周五"、"下周三"、"这周"、"周末"、"未来三天"等，为空表示今天
+            today: 当前日期，默认 date.today()
+        Returns:
+            ([DayForecast, ...], 是否为多天查询)；请求的日期超出预报范围时列表为空
+        """
+        today = today or date.today()
+        dates, is_range = resolve_dates(time, today)
+        return self._on_dates(dates), is_range
+
+    def _on_dates(self, dates):
+        return [day for day in (self.on(d) for d in dates) if day is not None]
+
+    def describe(self, time=None, today=None, city=None):
+        """生成回复文字
+        Args:
+            time: 时间描述
+            today: 当前日期，默认 date.today()
+            city: 回复中使用的城市名（用户的说法可能与预报的城市名不同），默认为预报的城市名
+        """
+        city = city or self.city
+        today = today or date.today()
+        dates, is_range = resolve_dates(time, today)
+        days = self._on_dates(dates)
+        if not days:
+            if dates and max(dates) < today:
+                # "昨天"、"上周三"，以及周六问"这周五"
+                last = max(dates)
+                return (f"抱歉，{time}（{last.month}月{last.day}日）已经过去了，"
+                        f"只能查询{city}今天起{len(self.days)}天内的天气预报")
+            return f"抱歉，只能查询{city}未来{len(self.days)}天内的天气"
+
+        if not is_range:
+            day = days[0]
+            if day.date == today:
+                time_str = "今日"
+            else:
+                time_str = time or f"{(day.date - today).days}天后"
+            return f"{city}{time_str}{day.label}天气：{day.weather}，温度：{day.temperature}，风力：{day.wind}"
+
+        lines = [f"{city}{time or ''}天气："]
+        for day in days:
+            lines.append(f"{day.label} {WEEKDAY_NAMES[day.date.weekday()]}：{day.weather}，"
+                         f"温度：{day.temperature}，风力：{day.wind}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {"city": self.city, "days": [day.to_dict() for day in self.days]}
+
+
+def resolve_dates(time, today):
+    """把时间描述解析为日期列表
+    已经过去的日期（"昨天"、"上周三"、周六问"这周五"）照常返回，由调用方判断
+    Returns:
+        ([date, ...], 是否为多天查询)
+    """
+    if not time:
+        return [today], False
+    time = time.strip()
+
+    # 范围：周末、这周/本周、下周、未来N天
+    if "周末" in time:
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        if today.weekday() == 6:
+            saturday = today - timedelta(days=1)
+        if "下" in time:
+            saturday += timedelta(days=7)
+        elif "上" in time:
+            saturday -= timedelta(days=7)
+        return [saturday, saturday + timedelta(days=1)], True
+
+    match = _WEEKDAY_PATTERN.search(time)
+    if match:
+        prefix, weekday = match.groups()
+        target = WEEKDAYS[weekday]
+        monday = today - timedelta(days=today.weekday())
+        if prefix and prefix.startswith("下下"):
+            return [monday + timedelta(days=14 + target)], False
+        if prefix and prefix.startswith("下"):
+            return [monday + timedelta(days=7 + target)], False
+        if prefix and prefix.startswith("上"):
+            return [monday + timedelta(days=target - 7)], False
+        if prefix:
+            return [monday + timedelta(days=target)], False
+        # 只说"周五"：今天或之后最近的周五
+        return [today + timedelta(days=(target - today.weekday()) % 7)], False
+
+    if any(word in time for word in ("这周", "本周", "这个星期", "本星期", "这星期")):
+        return [today + timedelta(days=i) for i in range(7 - today.weekday())], True
+    if any(word in time for word in ("下周", "下个星期", "下星期")):
+        monday = today + timedelta(days=7 - today.weekday())
+        return [monday + timedelta(days=i) for i in range(7)], True
+    if any(word in time for word in ("上周", "上个星期", "上星期")):
+        monday = today - timedelta(days=today.weekday() + 7)
+        return [monday + timedelta(days=i) for i in range(7)], True
+
+    match = _NEXT_DAYS_PATTERN.search(time)
+    if match:
+        count = match.group(1)
+        count = int(count) if count.isdigit() else _CHINESE_NUMBERS[count]
+        return [today + timedelta(days=i) for i in range(count)], True
+    if any(word in time for word in ("这几天", "最近几天", "一周", "七天", "7天")):
+        days = 3 if "几天" in time else 7
+        return [today + timedelta(days=i) for i in range(days)], True
+
+    for word, offset in RELATIVE_DAYS:
+        if word in time:
+            return [today + timedelta(days=offset)], False
+    return [today], False
+
+
+def parse_forecast(soup, city, today=None):
+    """从中国天气网7天预报页解析预报
+    Args:
+        soup: 页面的 BeautifulSoup 对象
+        city: 城市名称
+        today: 页面对应的日期（第一天），默认 date.today()
+    Returns:
+        Forecast，页面中没有预报时返回 None
+    """
+    weather_info = soup.find(class_='c7d')
+    if not weather_info:
+        return None
+
+    today = today or date.today()
+    days = []
+    for index, item in enumerate(weather_info.find_all('li')):
+        # 日期（从h1标签获取）
+        date_tag = item.find('h1')
+        label = date_tag.text.strip() if date_tag else ""
+
+        # 白天和夜间天气
+        wea_tags = item.find_all(class_='wea')
+        day_wea = wea_tags[0].text.strip() if wea_tags else ""
+        night_wea = wea_tags[1].text.strip() if len(wea_tags) > 1 else day_wea
+
+        # 温度和风力
+        tem_tag = item.find(class_='tem')
+        temperature = tem_tag.text.strip() if tem_tag else ""
+        win_tag = item.find(class_='win')
+        wind = win_tag.text.strip() if win_tag else ""
+
+        if not (label and day_wea and temperature and wind):
+            logger.warning("%s第%d天的预报不完整，停止解析", city, index + 1)
+            break
+        days.append(DayForecast(today + timedelta(days=index), label, day_wea, night_wea, temperature, wind))
+
+    return Forecast(city, days) if days else None
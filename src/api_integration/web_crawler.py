@@ -11,26 +11,113 @@ import requests
 from bs4 import BeautifulSoup
 import logging
 import re
+import threading
 from datetime import datetime
+from urllib.parse import unquote, urlsplit
+from requests.adapters import HTTPAdapter
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from config.config import APIConfig
 from src.nlp.nlp_processor import NLPProcessor
+from src.nlp.rule_store import get_rule_store
+from src.api_integration.response_cache import ResponseCache
+from src.api_integration.weather_forecast import parse_forecast
+from src.api_integration.single_flight import SingleFlight
+from src.monitoring.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+
+def normalize_url(url):
+    """规范化URL（去掉协议和片段，主机名小写，路径和参数解码），
+    同一个页面无论是否经过百分号编码都得到相同的结果"""
+    parts = urlsplit(url)
+    normalized = parts.netloc.lower() + unquote(parts.path or "/")
+    if parts.query:
+        normalized += "?" + unquote(parts.query)
+    return normalized
+
+
 class WebCrawler:
     """网络爬虫类，用于获取天气、新闻等信息"""
     
-    def __init__(self):
-        """初始化爬虫"""
+    def __init__(self, url_rewriter=None):
+        """初始化爬虫
+        Args:
+            url_rewriter: 可选的URL改写函数，请求前调用（例如把请求转发到本地回放服务器）
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.url_rewriter = url_rewriter
+        self.request_timeout = APIConfig.REQUEST_TIMEOUT
+        
+        # 复用连接的HTTP会话，连接池大小决定同一主机可并发的请求数
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=APIConfig.HTTP_POOL_CONNECTIONS, pool_maxsize=APIConfig.HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 相同网页（规范化URL相同）的并发请求共用一次请求和解析结果
+        self._single_flight = SingleFlight()
+        
+        # 每个主机同时进行的请求数上限，避免批量查询时对同一网站并发过多
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # 解析后的多日预报，按城市代码缓存
+        self.forecast_cache = ResponseCache(
+            max_entries=APIConfig.FORECAST_CACHE_SIZE, ttls={"forecast": APIConfig.FORECAST_CACHE_TTL}
+        )
+        
         # 初始化NLP处理器用于模糊搜索
         self.nlp_processor = NLPProcessor()
     
+    @traced("crawler.fetch")
+    def _fetch(self, url):
+        """请求网页，返回解码后的文本"""
+        if self.url_rewriter:
+            url = self.url_rewriter(url)
+        with self._host_slot(urlsplit(url).netloc):
+            response = self.session.get(url, headers=self.headers, timeout=self.request_timeout)
+        response.encoding = 'utf-8'
+        return response.text
+    
+    def _host_slot(self, host):
+        """获取主机的并发信号量"""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(APIConfig.MAX_REQUESTS_PER_HOST)
+            return slot
+    
+    @traced("crawler.parse")
+    def _parse(self, html):
+        """解析网页"""
+        return BeautifulSoup(html, 'html.parser')
+    
+    def _load_page(self, url):
+        return self._parse(self._fetch(url))
+    
+    def fetch_page(self, url):
+        """请求并解析网页
+        同一网页正在被其他线程请求时不再重复请求，等待并共用它的解析结果
+        （解析结果由多个调用共享，只读取不修改）
+        Returns:
+            BeautifulSoup 对象
+        """
+        return self._single_flight.do(normalize_url(url), self._load_page, url)
+    
+    async def fetch_page_async(self, url, executor=None):
+        """fetch_page 的协程版本，与线程发起的相同请求同样合并
+        Args:
+            url: 网页地址
+            executor: 执行请求的线程池，默认使用事件循环的默认线程池
+        """
+        return await self._single_flight.do_async(normalize_url(url), self._load_page, url, executor=executor)
+    
     def get_weather(self, city, time=None):
         """获取天气信息
         Args:
@@ -40,64 +127,16 @@ class WebCrawler:
             天气信息字符串
         """
         try:
-            # 使用中国天气网获取天气信息
-            url = f'http://www.weather.com.cn/weather/{self._get_city_code(city)}.shtml'
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.encoding = 'utf-8'
+            city_code = self._get_city_code(city)
+            if not city_code:
+                return f"抱歉，暂不支持查询{city}的天气"
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 提取天气信息
-            weather_info = soup.find(class_='c7d')
-            if not weather_info:
+            forecast = self.get_forecast(city_code, city)
+            if forecast is None:
                 return f"抱歉，无法获取{city}的天气信息"
             
-            # 解析时间参数
-            day_index = 0  # 默认今天
-            if time:
-                time = time.lower()
-                if "明天" in time or "次日" in time:
-                    day_index = 1
-                elif "后天" in time or "后日" in time:
-                    day_index = 2
-                elif "大后天" in time:
-                    day_index = 3
-                elif "周" in time or "星期" in time:
-                    # 简单处理星期查询，这里假设返回的是未来7天的天气
-                    # 实际应用中需要更复杂的日期计算
-                    pass
-            
-            # 获取指定天数的天气
-            days = weather_info.find_all('li')
-            if day_index < len(days):
-                target_day = days[day_index]
-                
-                # 提取日期信息（从h1标签获取）
-                date_tag = target_day.find('h1')
-                date = date_tag.text.strip() if date_tag else ""
-                
-                # 提取天气信息
-                wea_tags = target_day.find_all(class_='wea')
-                day_wea = wea_tags[0].text.strip() if wea_tags else ""
-                night_wea = wea_tags[1].text.strip() if len(wea_tags) > 1 else day_wea
-                
-                # 提取温度信息
-                tem_tag = target_day.find(class_='tem')
-                temp = tem_tag.text.strip() if tem_tag else ""
-                
-                # 提取风力信息
-                win_tag = target_day.find(class_='win')
-                wind = win_tag.text.strip() if win_tag else ""
-                
-                # 构建天气信息
-                if date and day_wea and temp and wind:
-                    # 根据时间参数调整返回信息
-                    time_str = "今日" if day_index == 0 else time if time else f"{day_index}天后"
-                    return f"{city}{time_str}{date}天气：{day_wea}，温度：{temp}，风力：{wind}"
-                else:
-                    return f"抱歉，无法解析{city}{time}的天气信息"
-            else:
-                return f"抱歉，无法获取{city}{time}的天气信息"
+            # 不同的时间问法都从同一份预报中取对应日期
+            return forecast.describe(time, city=city)
             
         except Exception as e:
             logger.error(f"获取天气信息失败: {e}")
@@ -106,53 +145,31 @@ class WebCrawler:
             else:
                 return f"抱歉，获取{city}的天气信息时出错"
     
+    def get_forecast(self, city_code, city):
+        """获取城市的多日预报（按城市代码缓存，过期前不再请求网页）
+        Args:
+            city_code: 中国天气网城市代码
+            city: 城市名称
+        Returns:
+            Forecast，页面中没有预报时返回 None
+        """
+        forecast = self.forecast_cache.get(("forecast", city_code))
+        if forecast is not None:
+            return forecast
+        
+        url = f'http://www.weather.com.cn/weather/{city_code}.shtml'
+        forecast = parse_forecast(self.fetch_page(url), city)
+        if forecast is not None:
+            self.forecast_cache.put(("forecast", city_code), forecast)
+        return forecast
+    
     def _get_city_code(self, city):
-        """获取城市代码（中国天气网）"""
-        # 简单的城市代码映射
-        city_codes = {
-            '北京': '101010100',
-            '上海': '101020100',
-            '广州': '101280101',
-            '深圳': '101280601',
-            '杭州': '101210101',
-            '成都': '101270101',
-            '重庆': '101040100',
-            '西安': '101110101',
-            '武汉': '101200101',
-            '南京': '101190101',
-            '天津': '101030100',
-            '苏州': '101190401',
-            '郑州': '101180101',
-            '长沙': '101250101',
-            '沈阳': '101070101',
-            '青岛': '101120201',
-            '济南': '101120101',
-            '大连': '101070201',
-            '宁波': '101210401',
-            '南宁': '101300101',
-            '厦门': '101230201',
-            '福州': '101230101',
-            '长春': '101060101',
-            '哈尔滨': '101050101',
-            '合肥': '101220101',
-            '南昌': '101240101',
-            '昆明': '101290101',
-            '贵阳': '101260101',
-            '太原': '101100101',
-            '石家庄': '101090101',
-            '兰州': '101160101',
-            '乌鲁木齐': '101130101',
-            '呼和浩特': '101080101',
-            '西宁': '101150101',
-            '银川': '101170101',
-            '拉萨': '101230201',
-            '海口': '101310101',
-            '三亚': '101310201',
-            '香港': '101320101',
-            '澳门': '101330101',
-            '台北': '101340101'
-        }
-        return city_codes.get(city, '101010100')  # 默认北京
+        """获取城市代码（中国天气网）
+        依次按精确、去掉"市/区/县"后缀、最长前缀、拼音和模糊匹配查找城市索引，
+        例如"苏州工业园区"得到苏州的代码；找不到时返回 None，不再默认北京
+        """
+        match = get_rule_store().snapshot.city_index.resolve(city)
+        return match[1] if match else None
     
     def get_news(self):
         """获取最新新闻
@@ -162,10 +179,7 @@ class WebCrawler:
         try:
             # 使用新浪新闻获取最新资讯
             url = 'https://news.sina.com.cn/china/'
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self.fetch_page(url)
             
             # 提取新闻标题和链接
             news_list = []
@@ -225,14 +239,11 @@ class WebCrawler:
             original_query = query
             if fuzzy:
                 query = self.nlp_processor.expand_query_with_synonyms(query)
-                logger.info(f"原始查询: {original_query}, 扩展后查询: {query}")
+                logger.debug("原始查询: %s, 扩展后查询: %s", original_query, query)
             
             # 使用Bing搜索
             url = f'https://cn.bing.com/search?q={query}'
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self.fetch_page(url)
             
             # 提取搜索结果
             search_items = soup.find_all('li', class_='b_algo')
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对话上下文持久化模块
+把会话上下文按字段保存到SQLite（每个字段一行紧凑的JSON数据），
+每轮对话后只写入发生变化的字段；会话在第一次被访问时才从数据库加载，
+重启后用户偏好（常用城市、名字、喜欢的话题等）不会丢失。
+开启 SecurityConfig.ENCRYPT_USER_DATA 时字段值加密保存（与对话历史相同）；
+超过保留期限未更新的会话定期清理
+"""
+
+import os
+import sys
+import time
+import logging
+import sqlite3
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+from config.config import SecurityConfig
+from src.security.security_manager import get_security_manager
+from src.dialogue_manager.dialogue_context import DialogueContext
+
+
+class ContextStore:
+    """SQLite对话上下文存储"""
+
+    def __init__(self, db_path, encrypt=None):
+        """初始化存储
+        Args:
+            db_path: SQLite数据库文件路径
+            encrypt: 是否加密字段值，默认 SecurityConfig.ENCRYPT_USER_DATA
+        """
+        self.db_path = db_path
+        self.encrypt = SecurityConfig.ENCRYPT_USER_DATA if encrypt is None else encrypt
+        self.security_manager = get_security_manager()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 所有线程共用一个连接，由锁保证串行访问
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        # 每个会话最近一次写入的字段数据，用于判断哪些字段发生了变化
+        self._snapshots = {}
+
+        self._initialize_database()
+
+    def _initialize_database(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS session_context (
+                    session_id TEXT,
+                    field TEXT,
+                    value TEXT,
+                    updated_at REAL,
+                    format_version INTEGER NOT NULL DEFAULT 1,
+                    is_encrypted INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (session_id, field)
+                )
+            ''')
+            # 早期版本的表没有格式版本和加密标记列，其中的数据为 marshal 格式（版本1），加载时忽略
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(session_context)")}
+            for column in ("format_version", "is_encrypted"):
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE session_context ADD COLUMN {column} INTEGER NOT NULL DEFAULT "
+                        f"{1 if column == 'format_version' else 0}"
+                    )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_session_context_updated ON session_context (updated_at)"
+            )
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    user_id TEXT PRIMARY KEY,
+                    session_id TEXT
+                )
+            ''')
+            self._conn.commit()
+
+    def save(self, context):
+        """保存上下文中发生变化的字段
+        Returns:
+            写入的字段数量
+        """
+        session_id = context.session_id
+        snapshot = self._snapshots.get(session_id, {})
+        changed = []
+        for name in DialogueContext.FIELDS:
+            data = DialogueContext.dump_field(context.get_field_state(name))
+            if snapshot.get(name) != data:
+                changed.append((name, data))
+        if not changed:
+            return 0
+
+        now = time.time()
+        is_encrypted = 1 if self.encrypt else 0
+        rows = [
+            (session_id, name, self.security_manager.encrypt(data) if self.encrypt else data,
+             now, DialogueContext.FORMAT_VERSION, is_encrypted)
+            for name, data in changed
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO session_context "
+                "(session_id, field, value, updated_at, format_version, is_encrypted) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            snapshot = self._snapshots.setdefault(session_id, {})
+            snapshot.update(changed)
+        return len(changed)
+
+    def load(self, session_id):
+        """加载会话上下文，不存在时返回None"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, format_version, is_encrypted FROM session_context WHERE session_id = ?",
+                (session_id,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        context = DialogueContext(session_id=session_id)
+        snapshot = {}
+        for name, value, format_version, is_encrypted in rows:
+            if name not in DialogueContext.FIELDS:
+                continue
+            if format_version != DialogueContext.FORMAT_VERSION:
+                logger.warning("会话%s的字段%s格式版本%s不受支持，使用默认值", session_id, name, format_version)
+                continue
+            try:
+                data = self.security_manager.decrypt(value) if is_encrypted else value
+                context.set_field_state(name, DialogueContext.load_field(data))
+                snapshot[name] = data
+            except Exception as e:
+                # 单个字段损坏时使用默认值，不影响其他字段
+                logger.error(f"恢复会话{session_id}的字段{name}失败: {e}")
+        with self._lock:
+            self._snapshots[session_id] = snapshot
+        logger.info("已从存储恢复会话: %s", session_id)
+        return context
+
+    def forget(self, session_id):
+        """释放会话在内存中的快照（会话被淘汰时调用，数据库中的数据保留）"""
+        with self._lock:
+            self._snapshots.pop(session_id, None)
+
+    def delete(self, session_id):
+        """删除会话的所有数据（会话被关闭时调用）
+        Returns:
+            存储中是否有该会话的数据
+        """
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM session_context WHERE session_id = ?", (session_id,)).rowcount
+            self._conn.execute("DELETE FROM user_sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+            self._snapshots.pop(session_id, None)
+        return deleted > 0
+
+    def delete_expired(self, max_age):
+        """删除超过 max_age 秒未更新的会话
+        Returns:
+            删除的会话数量
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM session_context GROUP BY session_id HAVING MAX(updated_at) < ?", (cutoff,)
+            )]
+            if not expired:
+                return 0
+            self._conn.executemany("DELETE FROM session_context WHERE session_id = ?", [(sid,) for sid in expired])
+            self._conn.executemany("DELETE FROM user_sessions WHERE session_id = ?", [(sid,) for sid in expired])
+            self._conn.commit()
+            for session_id in expired:
+                self._snapshots.pop(session_id, None)
+        logger.info("清理%d个过期的持久化会话", len(expired))
+        return len(expired)
+
+    def get_user_session(self, user_id):
+        """获取用户最近使用的会话ID"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id FROM user_sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_user_session(self, user_id, session_id):
+        """记录用户当前使用的会话ID"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_sessions (user_id, session_id) VALUES (?, ?)", (user_id, session_id)
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
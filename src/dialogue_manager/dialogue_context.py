@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对话上下文模型
+使用 __slots__ 的紧凑对象保存每个会话的上下文：最近查询用定长deque，
+话题频次用Counter，实体按类型建立索引；支持序列化为紧凑的字节数据，
+便于把空闲会话换出到磁盘。序列化使用JSON，格式不随Python版本变化
+"""
+
+import os
+import sys
+import json
+from collections import Counter, deque
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class EntityList(list):
+    """实体列表：元素仍是 (实体类型, 实体值) 元组，额外按类型建立索引"""
+
+    __slots__ = ("_index",)
+
+    def __init__(self, entities=()):
+        super().__init__(entities)
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None:
+            index = {}
+            for entity_type, entity in self:
+                index.setdefault(entity_type, []).append(entity)
+            self._index = index
+        return self._index
+
+    def first(self, entity_type, default=None):
+        """获取指定类型的第一个实体"""
+        values = self._get_index().get(entity_type)
+        return values[0] if values else default
+
+    def all(self, entity_type):
+        """获取指定类型的所有实体"""
+        return list(self._get_index().get(entity_type, ()))
+
+    def has(self, entity_type):
+        return entity_type in self._get_index()
+
+    def append(self, item):
+        super().append(item)
+        if self._index is not None:
+            self._index.setdefault(item[0], []).append(item[1])
+
+    def extend(self, items):
+        super().extend(items)
+        self._index = None
+
+    # 其他修改操作使索引失效，下次查询时重建
+    def _invalidate(name):
+        method = getattr(list, name)
+
+        def wrapper(self, *args, **kwargs):
+            self._index = None
+            return method(self, *args, **kwargs)
+
+        wrapper.__name__ = name
+        return wrapper
+
+    insert = _invalidate("insert")
+    remove = _invalidate("remove")
+    pop = _invalidate("pop")
+    clear = _invalidate("clear")
+    sort = _invalidate("sort")
+    reverse = _invalidate("reverse")
+    __setitem__ = _invalidate("__setitem__")
+    __delitem__ = _invalidate("__delitem__")
+    __iadd__ = _invalidate("__iadd__")
+    del _invalidate
+
+
+class UserMemory:
+    """用户记忆"""
+
+    __slots__ = ("preferred_city", "preferred_language", "user_name", "recent_queries", "topic_counts")
+
+    # 最近查询保留的数量
+    MAX_RECENT_QUERIES = 5
+    # 同一意图出现多少次视为喜欢的话题
+    FAVORITE_THRESHOLD = 2
+
+    def __init__(self):
+        self.preferred_city = None
+        self.preferred_language = "zh-CN"
+        self.user_name = None
+        self.recent_queries = deque(maxlen=self.MAX_RECENT_QUERIES)
+        self.topic_counts = Counter()
+
+    @property
+    def favorite_topics(self):
+        """出现次数达到阈值的意图"""
+        return [topic for topic, count in self.topic_counts.items() if count >= self.FAVORITE_THRESHOLD]
+
+    def remember_query(self, intent):
+        """记录一次查询意图"""
+        if intent not in self.recent_queries:
+            self.recent_queries.append(intent)
+        self.topic_counts[intent] += 1
+
+    def to_state(self):
+        return (self.preferred_city, self.preferred_language, self.user_name,
+                tuple(self.recent_queries), dict(self.topic_counts))
+
+    @classmethod
+    def from_state(cls, state):
+        """从 to_state 的结果恢复（JSON解码后元组变为列表）"""
+        memory = cls()
+        memory.preferred_city, memory.preferred_language, memory.user_name, recent, counts = state
+        memory.recent_queries.extend(recent)
+        memory.topic_counts.update(counts)
+        return memory
+
+    def __repr__(self):
+        return (f"UserMemory(preferred_city={self.preferred_city!r}, user_name={self.user_name!r}, "
+                f"recent_queries={list(self.recent_queries)!r})")
+
+
+class DialogueContext:
+    """单个会话的对话上下文"""
+
+    __slots__ = ("user_id", "session_id", "last_intent", "last_entities", "last_response", "topic",
+                 "conversation_turns", "pending_questions", "memory", "conversation_topic", "topic_turns",
+                 "start_time")
+
+    # 序列化格式版本，格式变化时递增（1 为早期的 marshal 格式，已不再支持）
+    FORMAT_VERSION = 2
+
+    def __init__(self, user_id="default", session_id=None):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.last_intent = None
+        self.last_entities = None
+        self.last_response = None
+        self.topic = None
+        self.conversation_turns = 0
+        self.pending_questions = []
+        self.memory = UserMemory()
+        self.conversation_topic = None
+        self.topic_turns = 0
+        self.start_time = datetime.now()
+
+    # 可单独持久化的字段（session_id 作为键，不在其中）
+    FIELDS = ("user_id", "last_intent", "last_entities", "last_response", "topic", "conversation_turns",
+              "pending_questions", "memory", "conversation_topic", "topic_turns", "start_time")
+
+    def get_field_state(self, name):
+        """获取字段的可序列化状态（只包含基本类型）"""
+        if name == "last_entities":
+            return None if self.last_entities is None else tuple(tuple(e) for e in self.last_entities)
+        if name == "memory":
+            return self.memory.to_state()
+        if name == "start_time":
+            return self.start_time.timestamp()
+        return getattr(self, name)
+
+    def set_field_state(self, name, state):
+        """从可序列化状态恢复字段"""
+        if name == "last_entities":
+            state = None if state is None else EntityList(tuple(e) for e in state)
+        elif name == "memory":
+            state = UserMemory.from_state(state)
+        elif name == "start_time":
+            state = datetime.fromtimestamp(state)
+        elif name == "pending_questions":
+            state = list(state)
+        setattr(self, name, state)
+
+    @staticmethod
+    def dump_field(state):
+        """把字段状态编码为紧凑的JSON文本"""
+        return json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def load_field(data):
+        return json.loads(data)
+
+    def to_bytes(self):
+        """序列化为字节数据（首字节为格式版本）"""
+        state = [self.session_id] + [self.get_field_state(name) for name in self.FIELDS]
+        return bytes([self.FORMAT_VERSION]) + self.dump_field(state).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data):
+        """从 to_bytes 生成的数据恢复上下文"""
+        if not data or data[0] != cls.FORMAT_VERSION:
+            raise ValueError(f"不支持的对话上下文格式版本: {data[0] if data else None}")
+        state = cls.load_field(data[1:].decode("utf-8"))
+        context = cls(session_id=state[0])
+        for name, field_state in zip(cls.FIELDS, state[1:]):
+            context.set_field_state(name, field_state)
+        return context
+
+    def __repr__(self):
+        return (f"DialogueContext(session_id={self.session_id!r}, turns={self.conversation_turns}, "
+                f"last_intent={self.last_intent!r}, topic={self.conversation_topic!r}, memory={self.memory!r})")
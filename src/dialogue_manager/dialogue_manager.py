@@ -8,6 +8,10 @@ import os
 import sys
 import logging
 import sqlite3
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -17,12 +21,40 @@ logger = logging.getLogger(__name__)
 
 from config.config import DialogueManagerConfig, SecurityConfig
 from src.security.security_manager import get_security_manager
+from src.dialogue_manager.dialogue_context import DialogueContext, EntityList
+from src.dialogue_manager.context_store import ContextStore
+from src.dialogue_manager.followup_engine import FollowupEngine
+from src.dialogue_manager.slot_extractor import SlotExtractor
+from src.dialogue_manager.intent_planner import IntentPlanner, SEQUENTIAL_INTENTS
+from src.dialogue_manager.prefetcher import Prefetcher
+from src.monitoring.tracing import traced
 
 class DialogueManager:
     """对话管理器类"""
     
-    def __init__(self):
-        """初始化对话管理器"""
+    # 固定回复（启动时可预先合成语音）
+    GREETINGS = {
+        "morning": ["早上好！有什么可以帮助你的吗？",
+                    "早安！很高兴为您服务。"],
+        "afternoon": ["下午好！有什么可以帮助你的吗？",
+                      "午安！很高兴为您服务。"],
+        "evening": ["晚上好！有什么可以帮助你的吗？",
+                    "晚安！很高兴为您服务。"]
+    }
+    JOKES = [
+        "为什么程序员总是分不清万圣节和圣诞节？因为 Oct 31 == Dec 25！",
+        "有一天，代码对程序员说：我有个 bug。程序员说：别担心，我来修复你。代码说：不，我是想说，我有个 bug，我很喜欢它。",
+        "为什么计算机喜欢冬天？因为它们有 Windows！"
+    ]
+    TRANSLATION_RESPONSE = "抱歉，翻译功能正在开发中"
+    NAME_RESPONSE = "我是您的语音助手，很高兴为您服务！"
+    EXIT_RESPONSE = "感谢使用，再见！"
+    
+    def __init__(self, nlp_processor=None):
+        """初始化对话管理器
+        Args:
+            nlp_processor: 可选的NLP处理器，多个会话共享同一个对话管理器时只需创建一次
+        """
         # 对话历史保存路径
         self.history_path = DialogueManagerConfig.HISTORY_PATH
         
@@ -38,27 +70,20 @@ class DialogueManager:
         # 初始化对话历史数据库
         self._initialize_database()
         
+        # 对话上下文存储（可选），重启后恢复会话
+        self.context_store = None
+        self._last_context_purge = 0
+        if DialogueManagerConfig.CONTEXT_STORE_ENABLED:
+            try:
+                self.context_store = ContextStore(DialogueManagerConfig.CONTEXT_STORE_PATH)
+            except Exception as e:
+                logger.error(f"对话上下文存储初始化失败: {e}")
+            self.purge_expired_contexts()
+        
         # 当前对话上下文 - 增强版，支持多轮对话和上下文理解
-        self.current_context = {
-            "user_id": "default",  # 未来可支持多用户
-            "session_id": self._generate_session_id(),
-            "last_intent": None,
-            "last_entities": None,
-            "last_response": None,
-            "topic": None,
-            "conversation_turns": 0,
-            "pending_questions": [],
-            "memory": {
-                "preferred_city": None,
-                "preferred_language": "zh-CN",
-                "favorite_topics": [],
-                "recent_queries": [],
-                "user_name": None
-            },
-            "conversation_topic": None,
-            "topic_turns": 0,
-            "start_time": datetime.now()
-        }
+        # 多会话时由 use_context 按线程切换，未切换时使用默认上下文
+        self._local = threading.local()
+        self._default_context = self._restore_default_context()
         
         # 上下文相关意图映射（扩展）
         self.contextual_intents = {
@@ -73,9 +98,30 @@ class DialogueManager:
             "open_folder": ["打开", "查看", "浏览", "文件夹"]
         }
         
+        # 追问推断引擎：上下文关键词和追问规则预先编译为关键词自动机
+        self.followup_engine = FollowupEngine(self.contextual_intents)
+        
         # 初始化NLP处理器
-        from src.nlp.nlp_processor import NLPProcessor
-        self.nlp_processor = NLPProcessor()
+        if nlp_processor is None:
+            from src.nlp.nlp_processor import NLPProcessor
+            nlp_processor = NLPProcessor()
+        self.nlp_processor = nlp_processor
+        
+        # 复合语句的多意图规划，独立的处理函数在线程池中并发执行
+        self.intent_planner = IntentPlanner(self.nlp_processor) if DialogueManagerConfig.MULTI_INTENT_ENABLED else None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        # 槽位提取器：各意图的提取规则在此预先编译
+        self.slot_extractor = SlotExtractor()
+        
+        # 追问预取：按对话历史中的意图转移，在后台预先查询最可能的下一轮
+        self.prefetcher = None
+        if DialogueManagerConfig.PREFETCH_ENABLED:
+            try:
+                self.prefetcher = Prefetcher(self.history_path)
+            except Exception as e:
+                logger.error(f"追问预取初始化失败: {e}")
         
         # 定义意图处理函数映射
         self.intent_handlers = {
@@ -97,6 +143,105 @@ class DialogueManager:
             "joke": self.handle_joke,
             "unknown": self.handle_unknown
         }
+        # 每个处理函数单独记录耗时（关闭追踪时保持原函数）
+        self.intent_handlers = {
+            intent: traced(f"handler.{intent}")(handler) for intent, handler in self.intent_handlers.items()
+        }
+    
+    @property
+    def current_context(self):
+        """当前线程正在处理的会话上下文"""
+        context = getattr(self._local, "context", None)
+        return context if context is not None else self._default_context
+    
+    @current_context.setter
+    def current_context(self, context):
+        self._default_context = context
+    
+    def new_context(self, user_id="default", session_id=None):
+        """创建一个新的对话上下文"""
+        return DialogueContext(user_id=user_id, session_id=session_id or self._generate_session_id())
+    
+    def _restore_default_context(self):
+        """恢复默认用户上次使用的会话，没有时创建新会话"""
+        if self.context_store:
+            session_id = self.context_store.get_user_session("default")
+            context = self.load_context(session_id) if session_id else None
+            if context:
+                return context
+        
+        context = self.new_context()
+        if self.context_store:
+            try:
+                self.context_store.set_user_session("default", context.session_id)
+            except Exception as e:
+                logger.error(f"保存默认会话ID失败: {e}")
+        return context
+    
+    def load_context(self, session_id):
+        """从存储中加载会话上下文，不存在时返回None"""
+        if not self.context_store:
+            return None
+        try:
+            return self.context_store.load(session_id)
+        except Exception as e:
+            logger.error(f"加载会话{session_id}失败: {e}")
+            return None
+    
+    def forget_context(self, session_id):
+        """会话被淘汰出内存时释放存储中的变更快照（数据库中的数据保留，之后可以恢复）"""
+        if self.context_store:
+            self.context_store.forget(session_id)
+    
+    def delete_context(self, session_id):
+        """会话被关闭时删除存储中的数据，之后同一ID不会再恢复出用户的名字和偏好
+        Returns:
+            存储中是否有该会话的数据
+        """
+        if not self.context_store:
+            return False
+        try:
+            return self.context_store.delete(session_id)
+        except Exception as e:
+            logger.error(f"删除会话{session_id}失败: {e}")
+            return False
+    
+    def purge_expired_contexts(self, force=False):
+        """删除超过保留时间未更新的持久化会话（两次清理至少间隔 CONTEXT_PURGE_INTERVAL 秒）
+        Returns:
+            删除的会话数量
+        """
+        if not self.context_store:
+            return 0
+        now = time.time()
+        if not force and now - self._last_context_purge < DialogueManagerConfig.CONTEXT_PURGE_INTERVAL:
+            return 0
+        self._last_context_purge = now
+        try:
+            return self.context_store.delete_expired(DialogueManagerConfig.CONTEXT_RETENTION)
+        except Exception as e:
+            logger.error(f"清理过期会话失败: {e}")
+            return 0
+    
+    @traced("dialogue.persist_context")
+    def _persist_context(self):
+        """保存当前上下文中发生变化的字段"""
+        if not self.context_store:
+            return
+        try:
+            self.context_store.save(self.current_context)
+        except Exception as e:
+            logger.error(f"保存对话上下文失败: {e}")
+    
+    @contextmanager
+    def use_context(self, context):
+        """在当前线程中切换到指定会话的上下文"""
+        previous = getattr(self._local, "context", None)
+        self._local.context = context
+        try:
+            yield context
+        finally:
+            self._local.context = previous
     
     def _initialize_database(self):
         """初始化对话历史数据库"""
@@ -121,13 +266,14 @@ class DialogueManager:
                 )
             ''')
             
-            # 确保is_encrypted列存在（如果表已经存在但没有这个列）
-            try:
-                cursor.execute("ALTER TABLE dialogue_history ADD COLUMN is_encrypted INTEGER DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                # 如果列已经存在，忽略此错误
-                pass
+            # 确保is_encrypted和session_id列存在（如果表已经存在但没有这些列）
+            for column in ("is_encrypted INTEGER DEFAULT 0", "session_id TEXT"):
+                try:
+                    cursor.execute(f"ALTER TABLE dialogue_history ADD COLUMN {column}")
+                    conn.commit()
+                except sqlite3.OperationalError:
+                    # 如果列已经存在，忽略此错误
+                    pass
             
             conn.commit()
             conn.close()
@@ -143,11 +289,13 @@ class DialogueManager:
     
     def _update_context(self, user_input, intent, entities, response):
         """更新对话上下文"""
+        context = self.current_context
+        
         # 更新基本上下文信息
-        self.current_context["last_intent"] = intent
-        self.current_context["last_entities"] = entities
-        self.current_context["last_response"] = response
-        self.current_context["conversation_turns"] += 1
+        context.last_intent = intent
+        context.last_entities = entities
+        context.last_response = response
+        context.conversation_turns += 1
         
         # 更新用户记忆
         self._update_user_memory(intent, entities, user_input)
@@ -155,209 +303,208 @@ class DialogueManager:
         # 更新对话主题
         self._update_conversation_topic(intent)
         
-        logger.info(f"更新后的对话上下文: {self.current_context}")
+        logger.debug("更新后的对话上下文: %s", context)
     
     def _update_user_memory(self, intent, entities, user_input):
         """更新用户记忆"""
-        memory = self.current_context["memory"]
+        memory = self.current_context.memory
         
         # 更新用户偏好城市
         if intent == "weather":
-            for entity_type, entity in entities:
-                if entity_type == "city":
-                    memory["preferred_city"] = entity
-                    break
+            city = entities.first("city")
+            if city:
+                memory.preferred_city = city
         
-        # 记录最近查询
+        # 记录最近查询和话题频次（出现多次的意图视为喜欢的话题）
         if intent and intent != "unknown":
-            if intent not in memory["recent_queries"]:
-                memory["recent_queries"].append(intent)
-            # 保持最近查询不超过5个
-            if len(memory["recent_queries"]) > 5:
-                memory["recent_queries"].pop(0)
-        
-        # 更新用户喜欢的话题
-        if intent and intent not in memory["favorite_topics"]:
-            # 如果同一意图出现多次，视为喜欢的话题
-            from collections import Counter
-            query_counts = Counter(memory["recent_queries"])
-            if query_counts.get(intent, 0) >= 2:
-                memory["favorite_topics"].append(intent)
+            memory.remember_query(intent)
         
         # 从实体中提取更多用户信息
-        for entity_type, entity in entities:
-            if entity_type == "person" and not memory["user_name"]:
-                # 如果用户提到了自己的名字，记住它
-                memory["user_name"] = entity
-            elif entity_type == "language":
-                memory["preferred_language"] = entity
+        user_name = entities.first("person")
+        if user_name and not memory.user_name:
+            # 如果用户提到了自己的名字，记住它
+            memory.user_name = user_name
+        language = entities.first("language")
+        if language:
+            memory.preferred_language = language
     
     def _update_conversation_topic(self, intent):
         """更新对话主题"""
+        context = self.current_context
         if intent and intent != "unknown":
-            if self.current_context["conversation_topic"] == intent:
-                self.current_context["topic_turns"] += 1
+            if context.conversation_topic == intent:
+                context.topic_turns += 1
             else:
-                self.current_context["conversation_topic"] = intent
-                self.current_context["topic_turns"] = 1
+                context.conversation_topic = intent
+                context.topic_turns = 1
         else:
             # 如果当前意图未知，保持原有主题
-            if self.current_context["topic_turns"] > 0:
-                self.current_context["topic_turns"] += 1
+            if context.topic_turns > 0:
+                context.topic_turns += 1
     
+    @traced("dialogue.resolve_context")
     def _handle_contextual_conversation(self, user_input, intent, entities):
-        """处理上下文相关的对话（增强版）"""
-        # 如果当前没有明确意图，但有上下文，尝试基于上下文推断
-        if (intent is None or intent == "unknown") and self.current_context["last_intent"]:
-            # 检查用户输入是否与上一个意图相关
-            last_intent = self.current_context["last_intent"]
-            
-            # 1. 基于上下文关键词的意图推断
-            for ctx_intent, keywords in self.contextual_intents.items():
-                if last_intent == ctx_intent:
-                    for keyword in keywords:
-                        if keyword in user_input:
-                            intent = last_intent
-                            break
-            
-            # 2. 基于对话主题的意图推断
-            if (intent is None or intent == "unknown") and self.current_context["conversation_topic"]:
-                topic = self.current_context["conversation_topic"]
-                if topic in self.contextual_intents:
-                    for keyword in self.contextual_intents[topic]:
-                        if keyword in user_input:
-                            intent = topic
-                            break
-            
-            # 3. 基于疑问词的意图推断
-            if intent is None or intent == "unknown":
-                question_words = ["呢", "？", "怎么", "为什么", "哪里", "什么", "如何", "多少"]
-                if any(word in user_input for word in question_words):
-                    # 如果用户用疑问词追问，延续上一个意图
-                    intent = last_intent
-        
-        # 扩展：处理天气查询的上下文信息
-        if intent == "weather" or ((intent is None or intent == "unknown") and self.current_context["last_intent"] == "weather"):
-            # 检查是否有城市实体
-            has_city = any(entity_type == "city" for entity_type, entity in entities)
-            
-            # 如果没有城市实体，尝试从上下文获取
-            if not has_city:
-                # 1. 优先使用用户偏好城市
-                if self.current_context["memory"]["preferred_city"]:
-                    entities.append(("city", self.current_context["memory"]["preferred_city"]))
-                # 2. 其次使用上次查询的城市
-                elif self.current_context["last_intent"] == "weather" and self.current_context["last_entities"]:
-                    for entity_type, entity in self.current_context["last_entities"]:
-                        if entity_type == "city":
-                            entities.append((entity_type, entity))
-                            break
-            
-            # 如果用户只提供了时间信息或疑问词，仍然使用天气意图
-            if intent is None or intent == "unknown":
-                time_keywords = ["今天", "明天", "后天", "大后天", "周一", "周二", "周三", "周四", "周五", "周六", "周日", "早上", "下午", "晚上", "上午", "夜间", "凌晨"]
-                if any(keyword in user_input for keyword in time_keywords) or "呢" in user_input:
-                    intent = "weather"
-        
-        # 扩展：处理时间和日期查询的上下文信息
-        if (intent == "time" or intent == "date") or ((intent is None or intent == "unknown") and 
-                                                     (self.current_context["last_intent"] in ["time", "date"])):
-            # 如果用户只是追问时间/日期相关信息，保持相同意图
-            if intent is None or intent == "unknown":
-                time_date_keywords = ["几点", "时间", "日期", "几号", "今天", "明天", "现在", "几时", "何时", "星期几"]
-                if any(keyword in user_input for keyword in time_date_keywords) or "呢" in user_input:
-                    intent = self.current_context["last_intent"]
-        
-        # 扩展：处理搜索查询的上下文信息
-        if intent == "search_internet" or ((intent is None or intent == "unknown") and 
-                                           self.current_context["last_intent"] == "search_internet"):
-            # 如果用户追问更多信息，延续搜索意图
-            if intent is None or intent == "unknown":
-                search_keywords = ["更多", "详细", "信息", "资料", "了解", "然后呢"]
-                if any(keyword in user_input for keyword in search_keywords) or "呢" in user_input:
-                    intent = "search_internet"
-                    # 如果有上次的搜索查询，作为当前查询的上下文
-                    if self.current_context["last_entities"]:
-                        for entity_type, entity in self.current_context["last_entities"]:
-                            if entity_type == "query":
-                                # 检查当前是否已有查询实体
-                                has_query = any(e_type == "query" for e_type, e in entities)
-                                if not has_query:
-                                    entities.append(("query", entity))
-                                break
-        
-        return intent, entities
+        """处理上下文相关的对话：推断追问的意图并沿用上一轮的槽位"""
+        return self.followup_engine.resolve(user_input, intent, entities, self.current_context)
+    
+    def _extract_slots(self, intent, user_input, entities):
+        """处理函数被直接调用（未传入槽位）时提取槽位"""
+        if not isinstance(entities, EntityList):
+            entities = EntityList(entities)
+        return self.slot_extractor.extract(intent, user_input, entities, self.current_context)
     
     def process_user_input(self, user_input):
         """处理用户输入并返回NLP结果"""
         nlp_result = self.nlp_processor.process_text(user_input)
         return nlp_result["intent"], nlp_result["entities"]
 
+    @traced("dialogue.generate_response")
     def generate_response(self, user_input, api_integrator, intent=None, entities=None):
         """根据用户输入生成响应"""
         try:
-            logger.info(f"用户输入: {user_input}")
+            logger.debug("用户输入: %s", user_input)
             
             # 如果没有提供intent和entities，则使用NLP处理器处理用户输入
             if intent is None or entities is None:
+                # 复合语句拆分为多个意图处理
+                steps = self.intent_planner.plan(user_input) if self.intent_planner else None
+                if steps:
+                    return self._generate_multi_response(steps, api_integrator)
+                
                 # 使用NLP处理器处理用户输入
                 intent, entities = self.process_user_input(user_input)
             
+            # 按实体类型建立索引，处理函数可直接按类型取值
+            if not isinstance(entities, EntityList):
+                entities = EntityList(entities)
+            
             # 处理上下文相关的对话
             intent, entities = self._handle_contextual_conversation(user_input, intent, entities)
             
-            logger.info(f"生成响应 - 意图: {intent}, 实体: {entities}, 会话ID: {self.current_context['session_id']}")
+            logger.info("生成响应 - 意图: %s, 会话ID: %s", intent, self.current_context.session_id)
+            logger.debug("识别到的实体: %s", entities)
             
             # 获取意图处理函数
-            handler = self.intent_handlers.get(intent, self.handle_unknown)
+            handler = self.intent_handlers.get(intent, self.intent_handlers["unknown"])
             
-            # 调用处理函数生成响应
-            response = handler(user_input, intent, entities, api_integrator)
+            # 提取槽位后调用处理函数生成响应
+            slots = self.slot_extractor.extract(intent, user_input, entities, self.current_context)
+            response = handler(user_input, intent, entities, api_integrator, slots=slots)
             
-            # 更新对话上下文
+            # 更新对话上下文并持久化变化的字段
+            previous_intent = self.current_context.last_intent
             self._update_context(user_input, intent, entities, response)
+            self._persist_context()
+            
+            # 记录意图转移，后台预取下一轮可能的追问
+            if self.prefetcher:
+                self.prefetcher.observe(previous_intent, intent)
+            self._prefetch_followups(intent, slots, api_integrator)
             
             # 保存对话历史
             self._save_dialogue_history(user_input, intent, str(entities), response)
             
-            logger.info(f"生成的响应: {response}")
+            logger.debug("生成的响应: %s", response)
             return response
             
         except Exception as e:
             logger.error(f"生成响应失败: {e}")
             return self._get_default_response()
     
-    def handle_greeting(self, user_input, intent, entities, api_integrator):
-        """处理问候意图"""
-        greetings = ["你好！我是你的语音助手，有什么可以帮助你的吗？", 
-                     "您好！很高兴为您服务。", 
-                     "你好！需要我做什么吗？"]
+    def _generate_multi_response(self, steps, api_integrator):
+        """处理复合语句：按顺序解析各子句，并发执行独立的处理函数，按原顺序合并回复"""
+        context = self.current_context
+        
+        # 上下文推断和槽位提取在当前线程按顺序完成
+        prepared = []
+        for clause, intent, entities in steps:
+            intent, entities = self._handle_contextual_conversation(clause, intent, EntityList(entities))
+            slots = self.slot_extractor.extract(intent, clause, entities, context)
+            handler = self.intent_handlers.get(intent, self.intent_handlers["unknown"])
+            prepared.append((clause, intent, entities, slots, handler))
+        
+        # 独立的查询提交到线程池；有副作用的操作在当前线程按顺序执行
+        futures = {}
+        for index, (clause, intent, entities, slots, handler) in enumerate(prepared):
+            if intent not in SEQUENTIAL_INTENTS:
+                futures[index] = self._get_executor().submit(
+                    self._run_handler, context, handler, clause, intent, entities, api_integrator, slots
+                )
         
+        responses = []
+        for index, (clause, intent, entities, slots, handler) in enumerate(prepared):
+            try:
+                if index in futures:
+                    response = futures[index].result()
+                else:
+                    response = handler(clause, intent, entities, api_integrator, slots=slots)
+            except Exception as e:
+                logger.error(f"处理子句失败 - 意图: {intent}, 错误: {e}")
+                response = self._get_default_response()
+            responses.append(response)
+        
+        # 按子句顺序更新上下文，每个子句保存一条对话历史
+        for (clause, intent, entities, slots, handler), response in zip(prepared, responses):
+            previous_intent = context.last_intent
+            self._update_context(clause, intent, entities, response)
+            self._save_dialogue_history(clause, intent, str(entities), response)
+            if self.prefetcher:
+                self.prefetcher.observe(previous_intent, intent)
+        self._persist_context()
+        
+        # 按最后一个子句预取下一轮可能的追问
+        clause, intent, entities, slots, handler = prepared[-1]
+        self._prefetch_followups(intent, slots, api_integrator)
+        
+        response = "\n".join(responses)
+        logger.debug("生成的响应: %s", response)
+        return response
+    
+    def _run_handler(self, context, handler, user_input, intent, entities, api_integrator, slots):
+        """在工作线程中以指定会话的上下文执行处理函数"""
+        with self.use_context(context):
+            return handler(user_input, intent, entities, api_integrator, slots=slots)
+    
+    def _prefetch_followups(self, intent, slots, api_integrator):
+        """在后台预取下一轮可能的追问，结果写入API集成器的查询结果缓存"""
+        if not self.prefetcher or not hasattr(api_integrator, "is_cached"):
+            return
+        try:
+            self.prefetcher.prefetch(intent, slots, self.current_context, api_integrator)
+        except Exception as e:
+            logger.error(f"提交追问预取失败: {e}")
+    
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=DialogueManagerConfig.MULTI_INTENT_WORKERS,
+                    thread_name_prefix="dialogue-intent"
+                )
+            return self._executor
+    
+    def handle_greeting(self, user_input, intent, entities, api_integrator, slots=None):
+        """处理问候意图"""
         # 根据时间调整问候语
         now = datetime.now()
         hour = now.hour
         
         if hour < 12:
-            greetings = ["早上好！有什么可以帮助你的吗？", 
-                         "早安！很高兴为您服务。"]
+            greetings = self.GREETINGS["morning"]
         elif hour < 18:
-            greetings = ["下午好！有什么可以帮助你的吗？", 
-                         "午安！很高兴为您服务。"]
+            greetings = self.GREETINGS["afternoon"]
         else:
-            greetings = ["晚上好！有什么可以帮助你的吗？", 
-                         "晚安！很高兴为您服务。"]
+            greetings = self.GREETINGS["evening"]
         
         import random
         return random.choice(greetings)
     
-    def handle_weather(self, user_input, intent, entities, api_integrator):
+    def handle_weather(self, user_input, intent, entities, api_integrator, slots=None):
         """处理天气查询意图"""
+        slots = slots or self._extract_slots("weather", user_input, entities)
+        
         # 提取城市实体
-        city = None
-        for entity_type, entity in entities:
-            if entity_type == "city":
-                city = entity
-                break
+        city = slots["city"]
         
         # 直接检查用户输入中是否包含南宁
         # 解决Windows环境下实体提取可能失败的问题
@@ -366,27 +513,26 @@ class DialogueManager:
         
         # 如果没有提取到城市，尝试从上下文中获取
         if not city:
+            context = self.current_context
             # 1. 优先使用用户偏好城市
-            if "preferred_city" in self.current_context["memory"]:
-                city = self.current_context["memory"]["preferred_city"]
+            if context.memory.preferred_city:
+                city = context.memory.preferred_city
             # 2. 其次使用上次查询的城市
-            elif self.current_context["last_intent"] == "weather" and self.current_context["last_entities"]:
-                for entity_type, entity in self.current_context["last_entities"]:
-                    if entity_type == "city":
-                        city = entity
-                        break
-            # 3. 最后使用默认城市
+            elif context.last_intent == "weather" and context.last_entities:
+                city = context.last_entities.first("city")
+            # 3. 都没有时询问用户，不猜测城市
             if not city:
-                city = "北京"
+                return "请问您想查询哪个城市的天气？"
         
         # 提取时间实体
-        time = None
-        for entity_type, entity in entities:
-            if entity_type == "time":
-                time = entity
-                break
+        time = slots["time"]
         
         try:
+            # 多个城市时并发查询，按提到的顺序回复
+            cities = slots.get("cities") or []
+            if len(cities) > 1 and hasattr(api_integrator, "get_weather_many"):
+                return "\n".join(api_integrator.get_weather_many(cities, time))
+            
             # 调用API获取天气信息
             weather_info = api_integrator.get_weather(city, time)
             
@@ -395,7 +541,7 @@ class DialogueManager:
             logger.error(f"获取天气信息失败: {e}")
             return f"抱歉，获取{city}的天气信息失败，请稍后重试"
     
-    def handle_news(self, user_input, intent, entities, api_integrator):
+    def handle_news(self, user_input, intent, entities, api_integrator, slots=None):
         """处理新闻查询意图"""
         try:
             # 调用新闻API获取新闻信息
@@ -405,7 +551,7 @@ class DialogueManager:
             logger.error(f"获取新闻信息失败: {e}")
             return "抱歉，获取新闻信息失败，请稍后重试"
     
-    def handle_calculator(self, user_input, intent, entities, api_integrator):
+    def handle_calculator(self, user_input, intent, entities, api_integrator, slots=None):
         """处理计算意图"""
         try:
             # 简单的数学表达式计算
@@ -430,13 +576,13 @@ class DialogueManager:
             logger.error(f"计算失败: {e}")
             return "抱歉，计算失败，请检查您的输入"
     
-    def handle_time(self, user_input, intent, entities, api_integrator):
+    def handle_time(self, user_input, intent, entities, api_integrator, slots=None):
         """处理时间查询意图"""
         now = datetime.now()
         current_time = now.strftime("%H:%M:%S")
         return f"现在的时间是 {current_time}"
     
-    def handle_date(self, user_input, intent, entities, api_integrator):
+    def handle_date(self, user_input, intent, entities, api_integrator, slots=None):
         """处理日期查询意图"""
         now = datetime.now()
         current_date = now.strftime("%Y年%m月%d日")
@@ -447,55 +593,17 @@ class DialogueManager:
         
         return f"今天是 {current_date}，{weekday}"
     
-    def handle_music(self, user_input, intent, entities, api_integrator):
+    def handle_music(self, user_input, intent, entities, api_integrator, slots=None):
         """处理音乐播放意图"""
-        import re
-        
-        # 提取音乐名称
-        music_name = None
-        
-        # 1. 从实体中提取
-        for entity_type, entity in entities:
-            if entity_type == "music_name":
-                music_name = entity
-                break
-        
-        # 2. 从用户输入中提取
-        if not music_name:
-            patterns = [
-                r"播放\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
-                r"听\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
-                r"放\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
-                r"来首\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
-                r"我想听\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
-                r"想听\s*(.+?)(?:的歌|的音乐)?$",
-                r"播放的音乐是\s*(.+)$",
-                r"想播放的音乐是\s*(.+)$"
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, user_input)
-                if match:
-                    music_name = match.group(1).strip()
-                    # 去除语气词
-                    music_name = re.sub(r'[吧呗啊哦了]+$', '', music_name).strip()
-                    if music_name and music_name not in ["音乐", "歌", "歌曲"]:
-                        break
-                    else:
-                        music_name = None
-        
-        # 3. 检查上下文中是否有音乐名
-        if not music_name and self.current_context["last_intent"] == "music":
-            # 用户可能在追问，直接使用当前输入作为音乐名
-            clean_input = re.sub(r'^(播放|听|放|来首|我想听|想听)\s*', '', user_input)
-            clean_input = re.sub(r'[吧呗啊哦了]+$', '', clean_input).strip()
-            if clean_input and clean_input not in ["音乐", "歌", "歌曲", "什么"]:
-                music_name = clean_input
+        # 提取音乐名称（实体、输入中的"播放+歌名"模式或追问）
+        slots = slots or self._extract_slots("music", user_input, entities)
+        music_name = slots["music_name"]
         
         # 如果没有提取到音乐名称，返回提示
         if not music_name:
             return "请告诉我您想要播放的音乐名称，例如：播放周杰伦的歌、听稻香"
         
-        logger.info(f"准备播放音乐: {music_name}")
+        logger.info("准备播放音乐: %s", music_name)
         
         try:
             # 调用音乐播放API
@@ -505,88 +613,34 @@ class DialogueManager:
             logger.error(f"播放音乐失败: {e}")
             return f"抱歉，播放音乐时出错: {str(e)}"
     
-    def handle_translation(self, user_input, intent, entities, api_integrator):
+    def handle_translation(self, user_input, intent, entities, api_integrator, slots=None):
         """处理翻译意图"""
-        return "抱歉，翻译功能正在开发中"
+        return self.TRANSLATION_RESPONSE
     
-    def handle_name(self, user_input, intent, entities, api_integrator):
+    def handle_name(self, user_input, intent, entities, api_integrator, slots=None):
         """处理询问名字意图"""
-        return "我是您的语音助手，很高兴为您服务！"
+        return self.NAME_RESPONSE
     
-    def handle_joke(self, user_input, intent, entities, api_integrator):
+    def handle_joke(self, user_input, intent, entities, api_integrator, slots=None):
         """处理讲笑话意图"""
-        jokes = [
-            "为什么程序员总是分不清万圣节和圣诞节？因为 Oct 31 == Dec 25！",
-            "有一天，代码对程序员说：我有个 bug。程序员说：别担心，我来修复你。代码说：不，我是想说，我有个 bug，我很喜欢它。",
-            "为什么计算机喜欢冬天？因为它们有 Windows！"
-        ]
         import random
-        return random.choice(jokes)
+        return random.choice(self.JOKES)
     
-    def handle_exit(self, user_input, intent, entities, api_integrator):
+    def handle_exit(self, user_input, intent, entities, api_integrator, slots=None):
         """处理退出意图"""
-        return "感谢使用，再见！"
+        return self.EXIT_RESPONSE
     
-    def handle_open_folder(self, user_input, intent, entities, api_integrator):
+    def handle_open_folder(self, user_input, intent, entities, api_integrator, slots=None):
         """处理打开文件夹意图"""
-        import re
-        
-        # 提取文件夹路径
-        folder_path = None
-        
-        # 1. 从实体中提取
-        for entity_type, entity in entities:
-            if entity_type == "file_path":
-                folder_path = entity
-                break
-        
-        # 2. 从用户输入中提取
-        if not folder_path:
-            # 常见文件夹关键词
-            folder_keywords = {
-                "桌面": "桌面",
-                "文档": "文档",
-                "下载": "下载",
-                "图片": "图片",
-                "音乐": "音乐",
-                "视频": "视频",
-                "我的文档": "文档",
-                "我的桌面": "桌面",
-                "我的下载": "下载",
-                "我的图片": "图片",
-                "我的音乐": "音乐",
-                "我的视频": "视频",
-                "文档文件夹": "文档",
-                "下载文件夹": "下载",
-                "图片文件夹": "图片"
-            }
-            
-            for keyword, path in folder_keywords.items():
-                if keyword in user_input:
-                    folder_path = path
-                    break
-            
-            # 尝试从"打开+路径"模式提取
-            if not folder_path:
-                patterns = [
-                    r"打开\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$",
-                    r"查看\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$",
-                    r"浏览\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$"
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, user_input)
-                    if match:
-                        candidate = match.group(1).strip()
-                        # 检查是否是文件夹相关
-                        if any(kw in candidate for kw in ["文件夹", "目录", "桌面", "文档", "下载", "图片", "音乐", "视频"]):
-                            folder_path = candidate
-                            break
+        # 提取文件夹路径（实体、常见文件夹关键词或"打开+路径"模式）
+        slots = slots or self._extract_slots("open_folder", user_input, entities)
+        folder_path = slots["folder_path"]
         
         # 如果没有提取到文件夹路径，返回提示
         if not folder_path:
             return "请告诉我您想要打开的文件夹，例如：打开桌面、打开文档文件夹"
         
-        logger.info(f"准备打开文件夹: {folder_path}")
+        logger.info("准备打开文件夹: %s", folder_path)
         
         try:
             # 调用本地操作API打开文件夹
@@ -596,68 +650,25 @@ class DialogueManager:
             logger.error(f"打开文件夹失败: {e}")
             return f"抱歉，打开文件夹时出错: {str(e)}"
     
-    def handle_open_application(self, user_input, intent, entities, api_integrator):
+    def handle_open_application(self, user_input, intent, entities, api_integrator, slots=None):
         """处理打开应用程序意图"""
-        import re
-        
-        # 提取应用程序名称
-        app_name = None
-        
-        # 1. 首先从实体中提取
-        for entity_type, entity in entities:
-            if entity_type == "app_name":
-                app_name = entity
-                break
-        
-        # 2. 如果没有从实体中提取到，尝试从用户输入中直接提取
-        if not app_name:
-            # 匹配"打开/启动/运行/开启 + 应用名"模式
-            patterns = [
-                r"打开\s*(.+?)(?:吧|呗|啊|哦|了)?$",
-                r"启动\s*(.+?)(?:吧|呗|啊|哦|了)?$",
-                r"运行\s*(.+?)(?:吧|呗|啊|哦|了)?$",
-                r"开启\s*(.+?)(?:吧|呗|啊|哦|了)?$",
-                r"帮我打开\s*(.+?)(?:吧|呗|啊|哦|了)?$",
-                r"请打开\s*(.+?)(?:吧|呗|啊|哦|了)?$"
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, user_input)
-                if match:
-                    app_name = match.group(1).strip()
-                    # 去除可能的语气词
-                    app_name = re.sub(r'[吧呗啊哦了]+$', '', app_name).strip()
-                    if app_name:
-                        break
-        
-        # 3. 如果还是没有，检查是否直接说了应用名
-        if not app_name:
-            # 常见应用名列表
-            common_apps = [
-                "微信", "QQ", "浏览器", "Chrome", "Edge", "Firefox", "Word", "Excel", 
-                "PowerPoint", "记事本", "计算器", "画图", "酷狗", "酷狗音乐", "网易云音乐",
-                "QQ音乐", "B站", "哔哩哔哩", "抖音", "微博", "淘宝", "京东", "支付宝",
-                "钉钉", "飞书", "企业微信", "腾讯会议", "Zoom", "VSCode", "PyCharm",
-                "设置", "控制面板", "任务管理器", "命令提示符", "PowerShell"
-            ]
-            for app in common_apps:
-                if app.lower() in user_input.lower():
-                    app_name = app
-                    break
+        # 提取应用程序名称（实体、"打开+应用名"模式或常见应用名）
+        slots = slots or self._extract_slots("open_application", user_input, entities)
+        app_name = slots["app_name"]
         
         # 如果没有提取到应用程序名称，返回提示
         if not app_name:
             return "请告诉我您想要打开的应用程序名称，例如：打开微信、打开记事本"
         
-        logger.info(f"准备打开应用: {app_name}")
+        logger.info("准备打开应用: %s", app_name)
         
         try:
             # 检查是否需要确认敏感操作
             if SecurityConfig.REQUIRE_CONFIRMATION_FOR_SENSITIVE_OPS:
                 # 检查是否为敏感操作
-                sensitive_apps = ["cmd", "命令提示符", "powershell", "终端", "bash", "注册表", "regedit"]
-                if app_name.lower() in [app.lower() for app in sensitive_apps]:
+                if self.slot_extractor.is_sensitive_app(app_name):
                     # 记录需要确认的操作
-                    self.current_context["pending_questions"].append({
+                    self.current_context.pending_questions.append({
                         "type": "confirmation",
                         "action": "open_application",
                         "params": {"app_name": app_name},
@@ -672,14 +683,11 @@ class DialogueManager:
             logger.error(f"打开应用程序失败: {e}")
             return f"抱歉，打开应用程序时出错: {str(e)}"
     
-    def handle_search_map(self, user_input, intent, entities, api_integrator):
+    def handle_search_map(self, user_input, intent, entities, api_integrator, slots=None):
         """处理地图搜索意图"""
         # 提取位置
-        location = None
-        for entity_type, entity in entities:
-            if entity_type == "location":
-                location = entity
-                break
+        slots = slots or self._extract_slots("search_map", user_input, entities)
+        location = slots["location"]
         
         # 如果没有提取到位置，返回提示
         if not location:
@@ -693,24 +701,15 @@ class DialogueManager:
             logger.error(f"地图搜索失败: {e}")
             return f"抱歉，地图搜索时出错: {str(e)}"
     
-    def handle_search_internet(self, user_input, intent, entities, api_integrator):
+    def handle_search_internet(self, user_input, intent, entities, api_integrator, slots=None):
         """处理互联网搜索意图"""
         # 提取搜索查询
-        query = None
-        for entity_type, entity in entities:
-            if entity_type == "query":
-                query = entity
-                break
+        slots = slots or self._extract_slots("search_internet", user_input, entities)
+        query = slots["query"]
         
         # 如果没有提取到查询，返回提示
         if not query:
-            # 尝试从用户输入中提取查询
-            import re
-            query_match = re.search(r'搜索(.+)', user_input)
-            if query_match:
-                query = query_match.group(1)
-            else:
-                return "请告诉我您想要搜索的内容"
+            return "请告诉我您想要搜索的内容"
         
         try:
             # 调用互联网搜索API
@@ -720,14 +719,11 @@ class DialogueManager:
             logger.error(f"互联网搜索失败: {e}")
             return f"抱歉，互联网搜索时出错: {str(e)}"
     
-    def handle_list_files(self, user_input, intent, entities, api_integrator):
+    def handle_list_files(self, user_input, intent, entities, api_integrator, slots=None):
         """处理列出文件意图"""
         # 提取目录路径
-        directory = None
-        for entity_type, entity in entities:
-            if entity_type == "file_path":
-                directory = entity
-                break
+        slots = slots or self._extract_slots("list_files", user_input, entities)
+        directory = slots["directory"]
         
         # 如果没有提取到目录路径，返回提示
         if not directory:
@@ -741,10 +737,11 @@ class DialogueManager:
             logger.error(f"列出文件失败: {e}")
             return f"抱歉，列出文件时出错: {str(e)}"
     
-    def handle_unknown(self, user_input, intent, entities, api_integrator):
+    def handle_unknown(self, user_input, intent, entities, api_integrator, slots=None):
         """处理未知意图"""
         return self._get_default_response()
     
+    @traced("dialogue.save_history")
     def _save_dialogue_history(self, user_input, intent, entities, response):
         """保存对话历史到数据库"""
         try:
@@ -768,9 +765,9 @@ class DialogueManager:
             # 插入对话记录
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             cursor.execute('''
-                INSERT INTO dialogue_history (timestamp, user_input, intent, entities, response, is_encrypted)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (timestamp, user_input, intent, entities, response, is_encrypted))
+                INSERT INTO dialogue_history (timestamp, user_input, intent, entities, response, is_encrypted, session_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (timestamp, user_input, intent, entities, response, is_encrypted, self.current_context.session_id))
             
             conn.commit()
             conn.close()
@@ -803,7 +800,7 @@ class DialogueManager:
                     )
                 ''', (delete_count,))
                 conn.commit()
-                logger.info(f"已清理 {delete_count} 条旧对话历史记录")
+                logger.debug("已清理 %d 条旧对话历史记录", delete_count)
             
             conn.close()
             
@@ -815,6 +812,15 @@ class DialogueManager:
         import random
         return random.choice(self.default_responses)
     
+    def get_static_responses(self):
+        """获取所有固定回复文本，用于预先合成语音"""
+        responses = list(self.default_responses)
+        for greetings in self.GREETINGS.values():
+            responses.extend(greetings)
+        responses.extend(self.JOKES)
+        responses.extend([self.TRANSLATION_RESPONSE, self.NAME_RESPONSE, self.EXIT_RESPONSE])
+        return responses
+    
     def get_dialogue_history(self, limit=10):
         """获取最近的对话历史"""
         try:
@@ -864,6 +870,10 @@ class DialogueManager:
             conn.commit()
             conn.close()
             
+            # 从对话中学到的意图转移也一并清除
+            if self.prefetcher:
+                self.prefetcher.stats.clear()
+            
             logger.info("对话历史已清空")
             return True
             
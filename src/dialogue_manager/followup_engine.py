@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追问推断模块
+把上下文关键词、疑问词和追问规则预先编译成一个 Aho-Corasick 关键词自动机，
+对用户输入只扫描一遍就得到所有命中的关键词组，再按声明式规则推断意图、
+沿用上一轮的槽位（城市、查询内容、时间等）。新增追问规则只需修改规则表
+"""
+
+import os
+import sys
+import logging
+from collections import deque
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+# 疑问词：用户用疑问词追问时延续上一个意图
+QUESTION_WORDS = ["呢", "？", "怎么", "为什么", "哪里", "什么", "如何", "多少"]
+
+# 追问规则
+#   prior_intents: 上一轮意图在其中、本轮意图未知时适用
+#   keywords: 本轮输入命中其中任意关键词即视为追问
+#   resolve_to: 追问时推断出的意图，None 表示沿用上一轮意图
+#   carry: 槽位沿用规则
+#       slot: 实体类型
+#       sources: 取值来源，按顺序尝试（"memory.<属性>" 或 "last_entities"）
+#       when: "always" 表示本轮意图为该规则的意图时总是补全，"followup" 表示只在追问时补全
+FOLLOWUP_RULES = [
+    {
+        "name": "weather",
+        "prior_intents": ["weather"],
+        "keywords": ["今天", "明天", "后天", "大后天", "周一", "周二", "周三", "周四", "周五", "周六", "周日",
+                     "早上", "下午", "晚上", "上午", "夜间", "凌晨", "呢"],
+        "resolve_to": "weather",
+        "carry": [
+            {"slot": "city", "sources": ["memory.preferred_city", "last_entities"], "when": "always"},
+            {"slot": "time_word", "sources": ["last_entities"], "when": "followup"}
+        ]
+    },
+    {
+        "name": "time_date",
+        "prior_intents": ["time", "date"],
+        "keywords": ["几点", "时间", "日期", "几号", "今天", "明天", "现在", "几时", "何时", "星期几", "呢"],
+        "resolve_to": None,
+        "carry": []
+    },
+    {
+        "name": "search_internet",
+        "prior_intents": ["search_internet"],
+        "keywords": ["更多", "详细", "信息", "资料", "了解", "然后呢", "呢"],
+        "resolve_to": "search_internet",
+        "carry": [
+            {"slot": "query", "sources": ["last_entities"], "when": "followup"}
+        ]
+    }
+]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 多关键词匹配自动机"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        self._built = False
+
+    def add(self, keyword, label):
+        """添加关键词及其所属的标签"""
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._output[state].add(label)
+        self._built = False
+
+    def build(self):
+        """计算失败指针（添加完所有关键词后调用）"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+        self._built = True
+
+    def scan(self, text):
+        """扫描文本一遍，返回命中的所有标签"""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        labels = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                labels |= output[state]
+        return labels
+
+
+class FollowupEngine:
+    """追问推断引擎"""
+
+    QUESTION_LABEL = ("question",)
+
+    def __init__(self, contextual_intents, rules=None, question_words=None):
+        """初始化并编译关键词自动机
+        Args:
+            contextual_intents: {意图: 上下文关键词列表}
+            rules: 追问规则列表，默认使用 FOLLOWUP_RULES
+            question_words: 疑问词列表，默认使用 QUESTION_WORDS
+        """
+        self.rules = rules if rules is not None else FOLLOWUP_RULES
+        self.automaton = KeywordAutomaton()
+
+        # 上下文关键词按意图分组（同时用于“上一轮意图”和“对话主题”）
+        self._context_labels = {}
+        for intent, keywords in contextual_intents.items():
+            label = ("context", intent)
+            self._context_labels[intent] = label
+            for keyword in keywords:
+                self.automaton.add(keyword, label)
+
+        for word in (question_words if question_words is not None else QUESTION_WORDS):
+            self.automaton.add(word, self.QUESTION_LABEL)
+
+        # 规则按上一轮意图和目标意图建立索引
+        self._rules_by_prior = {}
+        self._rules_by_target = {}
+        for index, rule in enumerate(self.rules):
+            label = ("rule", index)
+            for keyword in rule["keywords"]:
+                self.automaton.add(keyword, label)
+            for prior_intent in rule["prior_intents"]:
+                self._rules_by_prior.setdefault(prior_intent, []).append((label, rule))
+                target = rule["resolve_to"] or prior_intent
+                self._rules_by_target.setdefault(target, []).append(rule)
+
+        self.automaton.build()
+
+    def resolve(self, user_input, intent, entities, context):
+        """根据上下文推断意图并补全槽位
+        Args:
+            user_input: 用户输入
+            intent: NLP识别出的意图（可能为None或"unknown"）
+            entities: EntityList 实体列表（会被就地补全）
+            context: DialogueContext 当前会话上下文
+        Returns:
+            (intent, entities)
+        """
+        last_intent = context.last_intent
+        if intent not in (None, "unknown") or not last_intent:
+            # 意图明确或没有上一轮：只按“总是补全”的规则补全槽位
+            for rule in self._rules_by_target.get(intent, ()):
+                self._carry_slots(rule, "always", entities, context)
+            return intent, entities
+
+        labels = self.automaton.scan(user_input)
+
+        # 1. 命中上一轮意图的上下文关键词
+        if self._context_labels.get(last_intent) in labels:
+            intent = last_intent
+        # 2. 命中对话主题的上下文关键词
+        elif self._context_labels.get(context.conversation_topic) in labels:
+            intent = context.conversation_topic
+        # 3. 用疑问词追问，延续上一个意图
+        elif self.QUESTION_LABEL in labels:
+            intent = last_intent
+
+        # 4. 按追问规则推断意图并补全槽位
+        for label, rule in self._rules_by_prior.get(last_intent, ()):
+            is_followup = intent in (None, "unknown") and label in labels
+            if is_followup:
+                intent = rule["resolve_to"] or last_intent
+            target = rule["resolve_to"] or last_intent
+            if intent == target or intent in (None, "unknown"):
+                self._carry_slots(rule, "always", entities, context)
+                if is_followup or intent == last_intent:
+                    self._carry_slots(rule, "followup", entities, context)
+
+        # 意图明确但不是由上一轮推断出来的（例如第1-3步推断到其他主题），补全该意图的槽位
+        if intent != last_intent and intent not in (None, "unknown"):
+            for rule in self._rules_by_target.get(intent, ()):
+                if last_intent not in rule["prior_intents"]:
+                    self._carry_slots(rule, "always", entities, context)
+
+        return intent, entities
+
+    @staticmethod
+    def _carry_slots(rule, when, entities, context):
+        for carry in rule["carry"]:
+            if carry["when"] != when or entities.has(carry["slot"]):
+                continue
+            value = FollowupEngine._lookup(carry, context, rule)
+            if value:
+                entities.append((carry["slot"], value))
+
+    @staticmethod
+    def _lookup(carry, context, rule):
+        for source in carry["sources"]:
+            if source.startswith("memory."):
+                value = getattr(context.memory, source[len("memory."):], None)
+            elif source == "last_entities":
+                if context.last_intent not in rule["prior_intents"] or not context.last_entities:
+                    continue
+                value = context.last_entities.first(carry["slot"])
+            else:
+                value = None
+            if value:
+                return value
+        return None
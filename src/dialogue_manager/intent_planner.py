@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多意图规划模块
+把“北京天气怎么样，顺便讲个笑话，再看看新闻”这类复合语句切分为多个子句，
+分别识别意图；只有每个子句都能识别出明确意图时才按多意图处理。
+多数带逗号的语句并不是复合语句，因此先只对子句做规则匹配（不分词、不调用机器学习模型），
+每个子句都命中规则后才对各子句做完整的NLP处理，不是复合语句时只多花几次正则匹配
+"""
+
+import os
+import re
+import sys
+import logging
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# 子句分隔：标点，以及不依赖标点的连接词
+_CLAUSE_SEPARATOR = re.compile(r"[，,。；;！!？?\n]+|(?=顺便|然后|另外|还有|并且|同时)")
+# 子句开头的连接词，识别意图前去掉
+_LEADING_CONNECTOR = re.compile(r"^(?:顺便|然后|另外|还有|并且|同时|再|也|还)+")
+
+# 有副作用、需要按顺序在当前线程执行的意图（打开应用、播放音乐等）
+SEQUENTIAL_INTENTS = {"open_application", "open_folder", "music", "list_files", "exit"}
+
+
+def split_utterance(text):
+    """把语句切分为子句（去掉开头的连接词和空子句）"""
+    clauses = []
+    for clause in _CLAUSE_SEPARATOR.split(text):
+        clause = _LEADING_CONNECTOR.sub("", clause.strip()).strip()
+        if clause:
+            clauses.append(clause)
+    return clauses
+
+
+class IntentPlanner:
+    """多意图规划器"""
+
+    def __init__(self, nlp_processor, max_clauses=4):
+        """初始化规划器
+        Args:
+            nlp_processor: NLP处理器（需要 detect_intent 和 process_text），用于识别每个子句的意图
+            max_clauses: 最多处理的子句数量，超出时不按多意图处理
+        """
+        self.nlp_processor = nlp_processor
+        self.max_clauses = max_clauses
+
+    def plan(self, user_input):
+        """规划复合语句
+        Returns:
+            [(子句, 意图, 实体列表), ...]；不是复合语句时返回None
+        """
+        clauses = split_utterance(user_input)
+        if len(clauses) < 2 or len(clauses) > self.max_clauses:
+            return None
+
+        # 任何一个子句没有命中意图规则（例如“上海呢”这样的追问），都按单一意图处理整句；
+        # 这一步只做规则匹配，放弃时不会浪费分词、实体提取和模型预测
+        for clause in clauses:
+            intent = self.nlp_processor.detect_intent(clause)
+            if not intent or intent == "unknown":
+                return None
+
+        steps = []
+        for clause in clauses:
+            result = self.nlp_processor.process_text(clause)
+            if not result["intent"] or result["intent"] == "unknown":
+                return None
+            steps.append((clause, result["intent"], result["entities"]))
+
+        logger.info("复合语句拆分为%d个意图: %s", len(steps), " / ".join(intent for _, intent, _ in steps))
+        return steps
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追问预取模块
+统计意图转移（上一轮意图 -> 下一轮意图）并持久化到对话历史数据库的 intent_transitions 表，
+每轮对话后按转移概率在后台预先查询最可能的下一轮（天气的“明天呢”“后天呢”、新闻等），
+结果写入API集成器的查询结果缓存，用户追问时直接命中。
+预取请求受令牌桶带宽预算限制，不会挤占正常查询。
+搜索的“更多”追问沿用上一轮的查询，结果已经在缓存中，因此不做预取
+"""
+
+import os
+import sys
+import time
+import logging
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+from config.config import DialogueManagerConfig
+
+
+# 先验转移次数：历史记录较少时，按常见的追问习惯预取
+PRIOR_TRANSITIONS = {
+    "weather": {"weather": 3}
+}
+
+# 天气追问常问的时间（None 表示今天）
+WEATHER_FOLLOWUP_TIMES = [None, "明天", "后天"]
+
+
+class TransitionStats:
+    """意图转移统计
+
+    对话历史表只保留最近 MAX_HISTORY_LENGTH 条记录，不能作为统计来源，
+    因此转移次数单独累计在 intent_transitions 表中，重启后继续使用
+    """
+
+    def __init__(self, priors=None, db_path=None):
+        """初始化统计
+        Args:
+            priors: {上一轮意图: {下一轮意图: 先验次数}}（只在内存中，不写入数据库）
+            db_path: 持久化转移次数的数据库路径，为None时只在内存中统计
+        """
+        self.priors = priors or {}
+        self.db_path = None
+        self._counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._add_priors()
+        if db_path:
+            self.load(db_path)
+
+    def _add_priors(self):
+        for previous, transitions in self.priors.items():
+            self._counts[previous].update(transitions)
+
+    @staticmethod
+    def _is_valid(intent):
+        return bool(intent) and intent != "unknown"
+
+    def record(self, previous_intent, intent):
+        """记录一次意图转移（同时累加到数据库）"""
+        if not self._is_valid(previous_intent) or not self._is_valid(intent):
+            return
+        with self._lock:
+            self._counts[previous_intent][intent] += 1
+        if self.db_path:
+            self._save([(previous_intent, intent, 1)])
+
+    def load(self, db_path):
+        """从数据库加载累计的转移次数，之后的记录也写入该数据库
+        表为空时（首次使用）先从现存的对话历史中统计
+        Returns:
+            加载的转移次数
+        """
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS intent_transitions (
+                        previous_intent TEXT NOT NULL,
+                        intent TEXT NOT NULL,
+                        count INTEGER NOT NULL,
+                        PRIMARY KEY (previous_intent, intent)
+                    )
+                ''')
+                conn.commit()
+                rows = conn.execute("SELECT previous_intent, intent, count FROM intent_transitions").fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"读取意图转移统计失败: {e}")
+            return 0
+
+        self.db_path = db_path
+        if not rows:
+            rows = self._count_history(db_path)
+            self._save(rows)
+
+        with self._lock:
+            for previous, intent, count in rows:
+                self._counts[previous][intent] += count
+        return sum(count for _, _, count in rows)
+
+    def _count_history(self, db_path):
+        """从对话历史表中统计意图转移（按会话分组、按记录顺序）
+        Returns:
+            [(上一轮意图, 下一轮意图, 次数), ...]
+        """
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                rows = conn.execute("SELECT session_id, intent FROM dialogue_history ORDER BY id").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            # 对话历史表尚未创建
+            return []
+
+        counts = Counter()
+        last_intents = {}
+        for session_id, intent in rows:
+            previous = last_intents.get(session_id)
+            if self._is_valid(previous) and self._is_valid(intent):
+                counts[(previous, intent)] += 1
+            last_intents[session_id] = intent
+        return [(previous, intent, count) for (previous, intent), count in counts.items()]
+
+    def _save(self, rows):
+        """把转移次数累加到数据库"""
+        if not rows:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.executemany('''
+                    INSERT INTO intent_transitions (previous_intent, intent, count) VALUES (?, ?, ?)
+                    ON CONFLICT (previous_intent, intent) DO UPDATE SET count = count + excluded.count
+                ''', rows)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"保存意图转移统计失败: {e}")
+
+    def clear(self):
+        """清空统计（恢复为先验次数）"""
+        with self._lock:
+            self._counts.clear()
+            self._add_priors()
+        if not self.db_path:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("DELETE FROM intent_transitions")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"清空意图转移统计失败: {e}")
+
+    def predict(self, intent, min_probability=0.0, limit=None):
+        """预测下一轮意图
+        Returns:
+            [(下一轮意图, 概率), ...]，按概率从高到低排列
+        """
+        with self._lock:
+            transitions = self._counts.get(intent)
+            if not transitions:
+                return []
+            total = sum(transitions.values())
+            ranked = transitions.most_common(limit)
+        return [(next_intent, count / total) for next_intent, count in ranked if count / total >= min_probability]
+
+
+class TokenBucket:
+    """令牌桶：限制预取请求的速率"""
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, cost=1):
+        """尝试取出令牌，预算不足时返回False（不等待）"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < cost:
+                return False
+            self._tokens -= cost
+            return True
+
+
+class Prefetcher:
+    """追问预取器"""
+
+    def __init__(self, history_path=None, workers=None, min_probability=None, max_lookups=None,
+                 rate=None, burst=None):
+        """初始化预取器
+        Args:
+            history_path: 对话历史数据库路径，意图转移次数保存在其中的 intent_transitions 表
+            workers: 后台预取线程数
+            min_probability: 下一轮意图的最低概率
+            max_lookups: 每轮最多预取的查询数量
+            rate: 每分钟最多发出的预取请求数
+            burst: 允许的突发请求数
+        """
+        self.workers = workers or DialogueManagerConfig.PREFETCH_WORKERS
+        self.min_probability = (min_probability if min_probability is not None
+                                else DialogueManagerConfig.PREFETCH_MIN_PROBABILITY)
+        self.max_lookups = max_lookups or DialogueManagerConfig.PREFETCH_MAX_LOOKUPS
+
+        self.stats = TransitionStats(PRIOR_TRANSITIONS)
+        if history_path:
+            loaded = self.stats.load(history_path)
+            logger.info(f"已加载{loaded}次意图转移统计")
+
+        self.budget = TokenBucket(rate or DialogueManagerConfig.PREFETCH_RATE,
+                                  burst or DialogueManagerConfig.PREFETCH_BURST)
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = set()  # 正在预取的查询，避免重复提交
+
+        self.submitted = 0
+        self.completed = 0
+        self.over_budget = 0
+
+        # 下一轮意图 -> 查询生成函数
+        self._lookup_builders = {
+            "weather": self._weather_lookups,
+            "news": self._news_lookups
+        }
+
+    def observe(self, previous_intent, intent):
+        """记录一轮对话的意图转移"""
+        self.stats.record(previous_intent, intent)
+
+    def prefetch(self, intent, slots, context, api_integrator):
+        """按转移概率在后台预取下一轮最可能的查询
+        Args:
+            intent: 本轮意图
+            slots: 本轮槽位
+            context: 已更新的当前会话上下文
+            api_integrator: 执行查询的API集成器
+        Returns:
+            提交的预取数量
+        """
+        lookups = []
+        for next_intent, probability in self.stats.predict(intent, self.min_probability):
+            builder = self._lookup_builders.get(next_intent)
+            if builder is not None:
+                lookups.extend(builder(intent, slots or {}, context))
+            if len(lookups) >= self.max_lookups:
+                break
+
+        submitted = 0
+        for method, args in lookups[:self.max_lookups]:
+            key = (method,) + tuple(args)
+            if api_integrator.is_cached(method, *args):
+                continue
+            with self._lock:
+                if key in self._pending:
+                    continue
+                if not self.budget.try_acquire():
+                    self.over_budget += 1
+                    logger.debug("预取带宽预算不足，跳过: %s", key)
+                    break
+                self._pending.add(key)
+                self.submitted += 1
+            self._get_executor().submit(self._run, api_integrator, method, args, key)
+            submitted += 1
+        return submitted
+
+    def _run(self, api_integrator, method, args, key):
+        try:
+            getattr(api_integrator, method)(*args)
+            logger.debug("预取完成: %s", key)
+        except Exception as e:
+            logger.error(f"预取失败 - {key}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                self.completed += 1
+
+    def _weather_lookups(self, intent, slots, context):
+        # 与追问推断的槽位沿用规则一致：优先用户偏好城市，其次上一轮的城市
+        city = context.memory.preferred_city
+        if not city and context.last_intent == "weather" and context.last_entities:
+            city = context.last_entities.first("city")
+        if not city:
+            return []
+        if intent == "weather":
+            # 刚查过天气：预取其他几天
+            times = [t for t in WEATHER_FOLLOWUP_TIMES if t != slots.get("time")]
+        else:
+            times = [None]
+        return [("get_weather", (city, t)) for t in times]
+
+    def _news_lookups(self, intent, slots, context):
+        return [("get_news", ())]
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dialogue-prefetch")
+            return self._executor
+
+    def shutdown(self):
+        """停止后台预取线程"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def get_stats(self):
+        """获取预取统计"""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "pending": len(self._pending),
+                "over_budget": self.over_budget
+            }
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多会话管理模块
+所有会话共享同一个对话管理器（NLP处理器、意图处理函数）和API集成器，
+每个会话只保存自己的轻量对话上下文。不同会话的对话可以并发处理，
+同一会话的对话按到达顺序依次处理；空闲会话按LRU和过期时间淘汰
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+from config.config import DialogueManagerConfig
+
+
+class Session:
+    """单个会话"""
+
+    def __init__(self, session_id, context):
+        self.session_id = session_id
+        self.context = context
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.turns = 0
+        # 保证同一会话的对话按顺序处理
+        self.lock = threading.Lock()
+
+    def touch(self):
+        self.last_active = time.time()
+
+
+class SessionManager:
+    """会话管理器"""
+
+    def __init__(self, dialogue_manager, api_integrator, max_sessions=None, session_ttl=None):
+        """初始化会话管理器
+        Args:
+            dialogue_manager: 所有会话共享的 DialogueManager 实例
+            api_integrator: 所有会话共享的 APIIntegrator 实例
+            max_sessions: 最多保留的会话数量，超出时淘汰最久未活动的会话
+            session_ttl: 会话空闲多久（秒）后过期
+        """
+        self.dialogue_manager = dialogue_manager
+        self.api_integrator = api_integrator
+        self.max_sessions = max_sessions or DialogueManagerConfig.MAX_SESSIONS
+        self.session_ttl = session_ttl or DialogueManagerConfig.SESSION_TTL
+
+        self._sessions = OrderedDict()  # 按最近活动时间排序
+        self._lock = threading.Lock()
+        self.evicted_count = 0
+
+    def create_session(self, user_id="default", session_id=None, context=None):
+        """创建新会话
+        Args:
+            context: 可选的已有上下文（从存储恢复的会话）
+        Returns:
+            Session 对象
+        """
+        if context is None:
+            context = self.dialogue_manager.new_context(user_id=user_id, session_id=session_id)
+        with self._lock:
+            # 并发请求同一个会话时只保留一个
+            session = self._sessions.get(context.session_id)
+            if session is not None:
+                return session
+            session = Session(context.session_id, context)
+            self._sessions[session.session_id] = session
+            self._evict_locked()
+        logger.info("创建会话: %s", session.session_id)
+        return session
+
+    def get_session(self, session_id):
+        """获取会话，不存在或已过期时返回None"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if self._is_expired(session, time.time()):
+                self._remove_locked(session_id)
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create_session(self, session_id=None, user_id="default"):
+        """获取会话，内存中不存在时先尝试从存储恢复，仍不存在时以该ID创建"""
+        if not session_id:
+            return self.create_session(user_id=user_id)
+        session = self.get_session(session_id)
+        if session is not None:
+            return session
+        context = self.dialogue_manager.load_context(session_id)
+        return self.create_session(user_id=user_id, session_id=session_id, context=context)
+
+    def close_session(self, session_id):
+        """关闭会话，同时删除持久化的会话数据（包括只在存储中、尚未加载的会话）
+        Returns:
+            会话是否存在
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            # 等待正在处理的一轮结束，避免删除后又被写回存储
+            with session.lock:
+                deleted = self.dialogue_manager.delete_context(session_id)
+        else:
+            deleted = self.dialogue_manager.delete_context(session_id)
+        if session is None and not deleted:
+            return False
+        logger.info("关闭会话: %s", session_id)
+        return True
+
+    def handle_turn(self, session_id, user_input):
+        """处理一轮对话
+        Args:
+            session_id: 会话ID，不存在时自动创建
+            user_input: 用户输入文本
+        Returns:
+            (session_id, response)
+        """
+        session = self.get_or_create_session(session_id)
+        with session.lock:
+            session.touch()
+            with self.dialogue_manager.use_context(session.context):
+                response = self.dialogue_manager.generate_response(user_input, self.api_integrator)
+            session.turns += 1
+            session.touch()
+        return session.session_id, response
+
+    def evict_expired(self):
+        """淘汰所有过期会话（数据保留在存储中），并清理超过保留时间的持久化会话
+        Returns:
+            从内存中淘汰的会话数量
+        """
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, session in self._sessions.items() if self._is_expired(session, now)]
+            for session_id in expired:
+                self._remove_locked(session_id)
+            self.evicted_count += len(expired)
+        if expired:
+            logger.info("淘汰%d个过期会话", len(expired))
+        self.dialogue_manager.purge_expired_contexts()
+        return len(expired)
+
+    def get_stats(self):
+        """获取会话统计"""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "session_ttl": self.session_ttl,
+                "evicted_sessions": self.evicted_count
+            }
+
+    def _is_expired(self, session, now):
+        # 正在处理对话的会话不视为过期
+        return now - session.last_active > self.session_ttl and not session.lock.locked()
+
+    def _remove_locked(self, session_id):
+        """从内存中淘汰会话（调用方持有锁），持久化的数据保留，之后访问时恢复"""
+        if self._sessions.pop(session_id, None) is None:
+            return False
+        self.dialogue_manager.forget_context(session_id)
+        return True
+
+    def _evict_locked(self):
+        """超出数量上限时淘汰最久未活动的会话（调用方持有锁）"""
+        now = time.time()
+        # 最久未活动的会话在前，过期的先淘汰
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and not self._is_expired(session, now):
+                break
+            self._remove_locked(session_id)
+            self.evicted_count += 1
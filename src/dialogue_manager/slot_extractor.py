@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+槽位提取模块
+各意图的提取规则（正则、关键词表、应用名表）在构造时预先编译，
+按意图分派到对应的提取函数，处理函数直接使用提取好的槽位
+"""
+
+import os
+import re
+import sys
+import logging
+from functools import lru_cache
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1024)
+def normalize(text):
+    """统一大小写和首尾空白（结果缓存，多个意图共享）"""
+    return text.strip().lower()
+
+
+# 句尾语气词
+_TRAILING_PARTICLES = re.compile(r'[吧呗啊哦了]+$')
+
+# 音乐名称的提取规则
+MUSIC_PATTERNS = [
+    r"播放\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
+    r"听\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
+    r"放\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
+    r"来首\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
+    r"我想听\s*(.+?)(?:的歌|的音乐)?(?:吧|呗|啊)?$",
+    r"想听\s*(.+?)(?:的歌|的音乐)?$",
+    r"播放的音乐是\s*(.+)$",
+    r"想播放的音乐是\s*(.+)$"
+]
+MUSIC_PREFIX = r'^(播放|听|放|来首|我想听|想听)\s*'
+MUSIC_GENERIC_WORDS = {"音乐", "歌", "歌曲"}
+MUSIC_FOLLOWUP_REJECT = {"音乐", "歌", "歌曲", "什么"}
+
+# 常见文件夹关键词（按顺序匹配）
+FOLDER_KEYWORDS = [
+    ("桌面", "桌面"),
+    ("文档", "文档"),
+    ("下载", "下载"),
+    ("图片", "图片"),
+    ("音乐", "音乐"),
+    ("视频", "视频"),
+    ("我的文档", "文档"),
+    ("我的桌面", "桌面"),
+    ("我的下载", "下载"),
+    ("我的图片", "图片"),
+    ("我的音乐", "音乐"),
+    ("我的视频", "视频"),
+    ("文档文件夹", "文档"),
+    ("下载文件夹", "下载"),
+    ("图片文件夹", "图片")
+]
+FOLDER_PATTERNS = [
+    r"打开\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$",
+    r"查看\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$",
+    r"浏览\s*(.+?)(?:文件夹)?(?:吧|呗|啊)?$"
+]
+FOLDER_HINTS = ["文件夹", "目录", "桌面", "文档", "下载", "图片", "音乐", "视频"]
+
+# 应用名称的提取规则
+APP_PATTERNS = [
+    r"打开\s*(.+?)(?:吧|呗|啊|哦|了)?$",
+    r"启动\s*(.+?)(?:吧|呗|啊|哦|了)?$",
+    r"运行\s*(.+?)(?:吧|呗|啊|哦|了)?$",
+    r"开启\s*(.+?)(?:吧|呗|啊|哦|了)?$",
+    r"帮我打开\s*(.+?)(?:吧|呗|啊|哦|了)?$",
+    r"请打开\s*(.+?)(?:吧|呗|啊|哦|了)?$"
+]
+COMMON_APPS = [
+    "微信", "QQ", "浏览器", "Chrome", "Edge", "Firefox", "Word", "Excel",
+    "PowerPoint", "记事本", "计算器", "画图", "酷狗", "酷狗音乐", "网易云音乐",
+    "QQ音乐", "B站", "哔哩哔哩", "抖音", "微博", "淘宝", "京东", "支付宝",
+    "钉钉", "飞书", "企业微信", "腾讯会议", "Zoom", "VSCode", "PyCharm",
+    "设置", "控制面板", "任务管理器", "命令提示符", "PowerShell"
+]
+# 需要用户确认的敏感应用
+SENSITIVE_APPS = ["cmd", "命令提示符", "powershell", "终端", "bash", "注册表", "regedit"]
+
+SEARCH_PATTERN = r'搜索(.+)'
+
+
+class SlotExtractor:
+    """按意图分派的槽位提取器"""
+
+    def __init__(self):
+        """预编译所有提取规则"""
+        self._music_patterns = [re.compile(p) for p in MUSIC_PATTERNS]
+        self._music_prefix = re.compile(MUSIC_PREFIX)
+        self._folder_patterns = [re.compile(p) for p in FOLDER_PATTERNS]
+        self._app_patterns = [re.compile(p) for p in APP_PATTERNS]
+        self._search_pattern = re.compile(SEARCH_PATTERN)
+
+        # 应用名表预先规范化，匹配时不再逐个转换大小写
+        self._common_apps = [(normalize(app), app) for app in COMMON_APPS]
+        self._sensitive_apps = frozenset(normalize(app) for app in SENSITIVE_APPS)
+
+        # 意图 -> 提取函数
+        self._extractors = {
+            "weather": self._extract_weather,
+            "music": self._extract_music,
+            "open_folder": self._extract_folder,
+            "open_application": self._extract_application,
+            "search_map": self._extract_location,
+            "search_internet": self._extract_query,
+            "list_files": self._extract_directory
+        }
+
+    def extract(self, intent, user_input, entities, context=None):
+        """提取指定意图的槽位
+        Args:
+            intent: 意图
+            user_input: 用户输入
+            entities: EntityList 实体列表
+            context: 当前对话上下文（部分意图的追问需要）
+        Returns:
+            槽位字典，没有对应提取函数的意图返回空字典
+        """
+        extractor = self._extractors.get(intent)
+        if extractor is None:
+            return {}
+        return extractor(user_input, entities, context)
+
+    def is_sensitive_app(self, app_name):
+        """是否为需要确认的敏感应用"""
+        return normalize(app_name) in self._sensitive_apps
+
+    def _extract_weather(self, user_input, entities, context):
+        # NLP输出的时间实体类型为 time_word（追问时也沿用该类型）
+        return {
+            "city": entities.first("city"),
+            # 比较多个城市的天气时（如"北京和上海天气"）并发查询
+            "cities": entities.all("city"),
+            "time": entities.first("time_word") or entities.first("time")
+        }
+
+    def _extract_music(self, user_input, entities, context):
+        # 1. 从实体中提取
+        music_name = entities.first("music_name")
+
+        # 2. 从用户输入中提取
+        if not music_name:
+            for pattern in self._music_patterns:
+                match = pattern.search(user_input)
+                if match:
+                    # 去除语气词
+                    candidate = _TRAILING_PARTICLES.sub('', match.group(1).strip()).strip()
+                    if candidate and candidate not in MUSIC_GENERIC_WORDS:
+                        music_name = candidate
+                        break
+
+        # 3. 用户在追问，直接使用当前输入作为音乐名
+        if not music_name and context is not None and context.last_intent == "music":
+            clean_input = self._music_prefix.sub('', user_input)
+            clean_input = _TRAILING_PARTICLES.sub('', clean_input).strip()
+            if clean_input and clean_input not in MUSIC_FOLLOWUP_REJECT:
+                music_name = clean_input
+
+        return {"music_name": music_name}
+
+    def _extract_folder(self, user_input, entities, context):
+        # 1. 从实体中提取
+        folder_path = entities.first("file_path")
+
+        # 2. 常见文件夹关键词
+        if not folder_path:
+            for keyword, path in FOLDER_KEYWORDS:
+                if keyword in user_input:
+                    folder_path = path
+                    break
+
+        # 3. "打开+路径"模式
+        if not folder_path:
+            for pattern in self._folder_patterns:
+                match = pattern.search(user_input)
+                if match:
+                    candidate = match.group(1).strip()
+                    # 检查是否是文件夹相关
+                    if any(hint in candidate for hint in FOLDER_HINTS):
+                        folder_path = candidate
+                        break
+
+        return {"folder_path": folder_path}
+
+    def _extract_application(self, user_input, entities, context):
+        # 1. 从实体中提取
+        app_name = entities.first("app_name")
+
+        # 2. 匹配"打开/启动/运行/开启 + 应用名"模式
+        if not app_name:
+            for pattern in self._app_patterns:
+                match = pattern.search(user_input)
+                if match:
+                    app_name = _TRAILING_PARTICLES.sub('', match.group(1).strip()).strip()
+                    if app_name:
+                        break
+
+        # 3. 检查是否直接说了常见应用名
+        if not app_name:
+            normalized_input = normalize(user_input)
+            for normalized_app, app in self._common_apps:
+                if normalized_app in normalized_input:
+                    app_name = app
+                    break
+
+        return {"app_name": app_name}
+
+    def _extract_location(self, user_input, entities, context):
+        return {"location": entities.first("location")}
+
+    def _extract_query(self, user_input, entities, context):
+        query = entities.first("query")
+        if not query:
+            match = self._search_pattern.search(user_input)
+            if match:
+                query = match.group(1)
+        return {"query": query}
+
+    def _extract_directory(self, user_input, entities, context):
+        return {"directory": entities.first("file_path")}
@@ -13,18 +13,12 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入配置和安全管理器
-from config.config import GlobalConfig, APIConfig, SecurityConfig
+from config.config import APIConfig, SecurityConfig, TTSConfig, MonitoringConfig
+from src.monitoring.log_pipeline import setup_logging
 from security.security_manager import SecurityManager
 
-# 配置日志
-logging.basicConfig(
-    level=getattr(logging, GlobalConfig.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(GlobalConfig.LOG_FILE),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# 配置日志（异步写入）
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 加载环境变量
@@ -41,6 +35,7 @@ class VoiceAssistant:
         self.speech_recognizer = None
         self.nlp_processor = None
         self.tts_engine = None
+        self.tts_worker = None
         self.dialogue_manager = None
         self.api_integrator = None
         self.ui = None
@@ -70,11 +65,24 @@ class VoiceAssistant:
             self.tts_engine = TTSEngine()
             logger.info("语音合成模块初始化成功")
             
+            # 由播报线程独占语音合成引擎，播报期间主循环可以继续工作
+            from src.tts.tts_worker import TTSWorker
+            self.tts_worker = TTSWorker(self.tts_engine)
+            self.tts_worker.start()
+            if TTSConfig.BARGE_IN_ENABLED:
+                # 检测到用户说话时打断当前播报
+                self.speech_recognizer.on_voice_detected = self.tts_worker.barge_in
+            
             # 导入并初始化对话管理模块
             from src.dialogue_manager.dialogue_manager import DialogueManager
-            self.dialogue_manager = DialogueManager()
+            self.dialogue_manager = DialogueManager(nlp_processor=self.nlp_processor)
             logger.info("对话管理模块初始化成功")
             
+            # 后台预先合成固定回复，之后播报时直接命中缓存
+            self.tts_engine.prewarm_cache_async(self.dialogue_manager.get_static_responses() + [
+                "语音助手已启动，您可以开始说话了", "再见，期待与您再次交流", "程序已关闭", "程序运行出错，请检查日志"
+            ])
+            
             # 导入并初始化API集成模块
             from src.api_integration.api_integrator import APIIntegrator
             self.api_integrator = APIIntegrator()
@@ -96,10 +104,14 @@ class VoiceAssistant:
     def run(self):
         """启动语音助手"""
         logger.info("语音助手启动成功")
-        self.tts_engine.speak("语音助手已启动，您可以开始说话了")
+        self.tts_worker.speak_async("语音助手已启动，您可以开始说话了")
         
         try:
             while True:
+                if not TTSConfig.BARGE_IN_ENABLED:
+                    # 未启用打断时等待播报结束再监听，避免录入助手自己的声音
+                    self.tts_worker.wait_until_idle()
+                
                 # 等待用户语音输入
                 logger.info("等待用户语音输入...")
                 user_input = self.speech_recognizer.recognize()
@@ -110,28 +122,40 @@ class VoiceAssistant:
                     # 处理用户输入
                     response = self.process_input(user_input)
                     
-                    # 输出响应
+                    # 输出响应（异步播报，不阻塞下一轮监听）
                     logger.info(self.security_manager.mask_sensitive_data(f"助手响应: {response}"))
-                    self.tts_engine.speak(response)
+                    self.tts_worker.speak_async(response)
                     
                     # 如果是退出命令，结束程序
                     if self._is_exit_command(user_input):
                         logger.info("用户发出退出命令，程序即将关闭")
-                        self.tts_engine.speak("再见，期待与您再次交流")
+                        self.tts_worker.speak_async("再见，期待与您再次交流")
+                        self.tts_worker.wait_until_idle()
                         break
                         
         except KeyboardInterrupt:
             logger.info("用户中断程序")
-            self.tts_engine.speak("程序已关闭")
+            self.tts_worker.flush()
+            self.tts_worker.interrupt()
+            self.tts_worker.speak_async("程序已关闭")
+            self.tts_worker.wait_until_idle(timeout=5)
         except Exception as e:
             logger.error(f"程序运行出错: {e}")
-            self.tts_engine.speak("程序运行出错，请检查日志")
+            self.tts_worker.speak_async("程序运行出错，请检查日志")
+            self.tts_worker.wait_until_idle(timeout=5)
+        finally:
+            self.tts_worker.stop()
+            self.tts_engine.close()
+            
+            # 导出各阶段耗时统计
+            from src.monitoring.tracing import get_tracer
+            tracer = get_tracer()
+            if tracer.enabled:
+                tracer.dump_json(MonitoringConfig.TRACE_EXPORT_PATH)
     
     def process_input(self, user_input):
         """处理用户输入"""
         try:
-            logger.info(f"用户输入: {user_input}")
-            
             # 直接通过DialogueManager生成响应
             response = self.dialogue_manager.generate_response(
                 user_input, self.api_integrator
@@ -13,17 +13,11 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入配置
-from config.config import GlobalConfig
+from config.config import MonitoringConfig
+from src.monitoring.log_pipeline import setup_logging
 
-# 配置日志
-logging.basicConfig(
-    level=getattr(logging, GlobalConfig.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(GlobalConfig.LOG_FILE),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# 配置日志（异步写入）
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 加载环境变量
@@ -63,7 +57,7 @@ class VoiceAssistantText:
             
             # 导入并初始化对话管理模块
             from src.dialogue_manager.dialogue_manager import DialogueManager
-            self.dialogue_manager = DialogueManager()
+            self.dialogue_manager = DialogueManager(nlp_processor=self.nlp_processor)
             logger.info("对话管理模块初始化成功")
             
             # 导入并初始化API集成模块
@@ -91,7 +85,7 @@ class VoiceAssistantText:
                 user_input = input("\n用户: ")
                 
                 if user_input.strip():
-                    logger.info(f"用户输入: {user_input}")
+                    logger.info("用户输入: %s", user_input)
                     
                     # 如果是退出命令，结束程序
                     if self._is_exit_command(user_input):
@@ -108,7 +102,7 @@ class VoiceAssistantText:
                     response = self.process_input(user_input)
                     
                     # 输出响应
-                    logger.info(f"助手响应: {response}")
+                    logger.info("助手响应: %s", response)
                     if self.tts_engine:
                         try:
                             self.tts_engine.speak(response)
@@ -130,6 +124,12 @@ class VoiceAssistantText:
                     self.tts_engine.speak("程序运行出错，请检查日志")
                 except Exception as e:
                     logger.warning(f"语音合成失败: {e}")
+        finally:
+            # 导出各阶段耗时统计
+            from src.monitoring.tracing import get_tracer
+            tracer = get_tracer()
+            if tracer.enabled:
+                tracer.dump_json(MonitoringConfig.TRACE_EXPORT_PATH)
     
     def process_input(self, user_input):
         """处理用户输入"""
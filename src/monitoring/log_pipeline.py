@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步日志模块
+业务线程只把日志记录放入队列（QueueHandler），由后台线程（QueueListener）
+格式化并写入轮转日志文件和控制台，磁盘I/O和字符串格式化不占用对话处理的时间。
+支持按模块设置日志级别，热路径上的DEBUG日志可按比例采样并按日志模板限速。
+用法（程序入口调用一次）：
+    from src.monitoring.log_pipeline import setup_logging
+    setup_logging()
+"""
+
+import os
+import sys
+import queue
+import random
+import atexit
+import logging
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import GlobalConfig
+
+# 可以安全推迟到后台线程格式化的参数类型（不会在记录之后被修改）
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None), bytes)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """把格式化推迟到后台线程的队列处理器
+    标准 QueueHandler 在放入队列前就格式化消息；这里只要参数都是不可变类型就原样放入队列，
+    由监听线程格式化。参数中有可变对象时（之后可能被修改）在当前线程格式化，保证内容准确
+    """
+
+    def prepare(self, record):
+        # 只有一个字典参数时 record.args 就是这个字典本身
+        args = record.args
+        if args and (isinstance(args, dict) or not all(isinstance(arg, _IMMUTABLE_TYPES) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # 异常信息中的traceback对象不能跨线程长期保存，先格式化为文本
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class ModuleLevelFilter(logging.Filter):
+    """按模块名前缀过滤日志级别
+    部分第三方库（如jieba）导入时会重设自己的日志级别，只调用 setLevel 可能被覆盖，
+    因此在队列处理器上再按模块检查一次
+    """
+
+    def __init__(self, module_levels=None):
+        super().__init__()
+        self.levels = {}
+        self.update(module_levels or {})
+
+    def update(self, module_levels):
+        for name, module_level in module_levels.items():
+            self.levels[name] = getattr(logging, str(module_level).upper())
+
+    def filter(self, record):
+        name = record.name
+        while name:
+            level = self.levels.get(name)
+            if level is not None:
+                return record.levelno >= level
+            name = name.rpartition(".")[0]
+        return True
+
+
+class DebugThrottleFilter(logging.Filter):
+    """热路径DEBUG日志的采样和限速
+    只作用于DEBUG及以下级别；按（模块名, 日志模板）分别限速，超出的记录直接丢弃
+    """
+
+    def __init__(self, sample_rate=1.0, rate_limit=None, burst=None):
+        """初始化过滤器
+        Args:
+            sample_rate: 采样比例（0~1），1 表示不采样
+            rate_limit: 每条日志模板每秒最多输出的次数，None 表示不限速
+            burst: 允许的突发次数，默认等于 rate_limit
+        """
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or rate_limit
+        self._buckets = {}  # (模块名, 日志模板) -> [令牌数, 更新时间]
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return False
+        if not self.rate_limit:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_limit)
+            bucket[1] = now
+            if bucket[0] < 1:
+                self.dropped += 1
+                return False
+            bucket[0] -= 1
+        return True
+
+
+_listener = None
+_queue_handler = None
+_module_filter = ModuleLevelFilter()
+_setup_lock = threading.Lock()
+
+
+def setup_logging(log_file=None, level=None, console=True, module_levels=None,
+                  sample_rate=None, rate_limit=None):
+    """配置异步日志（重复调用时直接返回已创建的监听器）
+    Args:
+        log_file: 日志文件路径，默认 GlobalConfig.LOG_FILE，为空字符串时不写文件
+        level: 根日志级别，默认 GlobalConfig.LOG_LEVEL
+        console: 是否同时输出到控制台
+        module_levels: {模块名前缀: 级别}，默认 GlobalConfig.LOG_MODULE_LEVELS
+        sample_rate: DEBUG日志采样比例，默认 GlobalConfig.LOG_DEBUG_SAMPLE_RATE
+        rate_limit: 每条DEBUG日志模板每秒最多输出的次数，默认 GlobalConfig.LOG_DEBUG_RATE_LIMIT
+    Returns:
+        QueueListener
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = logging.Formatter(GlobalConfig.LOG_FORMAT)
+        handlers = []
+        log_file = GlobalConfig.LOG_FILE if log_file is None else log_file
+        if log_file:
+            directory = os.path.dirname(log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                log_file, maxBytes=GlobalConfig.LOG_MAX_BYTES,
+                backupCount=GlobalConfig.LOG_BACKUP_COUNT, encoding="utf-8"
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        _queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(_module_filter)
+        _queue_handler.addFilter(DebugThrottleFilter(
+            sample_rate=GlobalConfig.LOG_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate,
+            rate_limit=GlobalConfig.LOG_DEBUG_RATE_LIMIT if rate_limit is None else rate_limit
+        ))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(getattr(logging, (level or GlobalConfig.LOG_LEVEL).upper()))
+        set_module_levels(GlobalConfig.LOG_MODULE_LEVELS if module_levels is None else module_levels)
+
+        _listener = QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def set_module_levels(module_levels):
+    """按模块设置日志级别（可在运行中调用）"""
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(getattr(logging, str(module_level).upper()))
+    _module_filter.update(module_levels)
+
+
+def get_dropped_count():
+    """被采样或限速丢弃的DEBUG日志数量"""
+    if _queue_handler is None:
+        return 0
+    return sum(getattr(f, "dropped", 0) for f in _queue_handler.filters)
+
+
+def shutdown_logging():
+    """写完队列中剩余的日志并停止后台线程"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
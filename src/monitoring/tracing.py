@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能追踪模块
+用上下文管理器（span）记录一轮对话中各阶段的耗时：ASR、NLP、上下文推断、
+意图处理函数、网络请求与解析、数据库写入、TTS等。每个阶段在内存中维护耗时直方图，
+可导出为JSON或Prometheus文本格式；同时保留最近几轮的完整调用树。
+
+关闭追踪时 traced 装饰器直接返回原函数，span 返回共享的空操作对象，不引入开销。
+用法：
+    @traced("nlp.process_text")
+    def process_text(self, text): ...
+
+    with span("crawler.fetch"):
+        ...
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+from config.config import MonitoringConfig
+
+
+class Histogram:
+    """固定桶边界的耗时直方图（单位：秒）"""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max", "errors")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.errors = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """按桶内线性插值估算分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(value, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "sum_ms": self.sum * 1000,
+            "avg_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * 1000,
+            "max_ms": (self.max or 0.0) * 1000,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000
+        }
+
+
+class Span:
+    """一个阶段的耗时记录"""
+
+    __slots__ = ("tracer", "name", "start", "duration", "error", "children")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+        self.duration = 0.0
+        self.error = False
+        self.children = []
+
+    def __enter__(self):
+        self.tracer._push(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        self.error = exc_type is not None
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self):
+        data = {"name": self.name, "duration_ms": self.duration * 1000}
+        if self.error:
+            data["error"] = True
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+class _NoopSpan:
+    """关闭追踪时使用的空操作span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """阶段耗时追踪器"""
+
+    def __init__(self, enabled=False, buckets=None, recent_traces=20):
+        """初始化追踪器
+        Args:
+            enabled: 是否启用追踪
+            buckets: 直方图桶边界（秒，升序）
+            recent_traces: 保留最近多少个完整调用树（顶层span）
+        """
+        self.enabled = enabled
+        self.buckets = sorted(buckets or MonitoringConfig.TRACE_BUCKETS)
+        self._histograms = {}
+        self._recent = deque(maxlen=recent_traces)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """创建一个span（上下文管理器），关闭追踪时返回空操作对象"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name)
+
+    def traced(self, name):
+        """函数装饰器：用span包裹整个函数调用
+        关闭追踪时直接返回原函数，因此需在导入被追踪的模块之前决定是否启用
+        """
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with Span(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _push(self, span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+
+    def _finish(self, span):
+        stack = self._local.stack
+        stack.pop()
+        parent = stack[-1] if stack else None
+        with self._lock:
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = Histogram(self.buckets)
+            histogram.observe(span.duration)
+            if span.error:
+                histogram.errors += 1
+            if parent is None:
+                self._recent.append(span)
+        if parent is not None:
+            parent.children.append(span)
+
+    def get_stats(self):
+        """获取各阶段的耗时统计"""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def get_recent_traces(self):
+        """获取最近的完整调用树"""
+        with self._lock:
+            return [span.to_dict() for span in self._recent]
+
+    def export_json(self, indent=None):
+        """导出为JSON文本"""
+        data = {"enabled": self.enabled, "stages": self.get_stats(), "recent_traces": self.get_recent_traces()}
+        return json.dumps(data, ensure_ascii=False, indent=indent)
+
+    def export_prometheus(self, prefix="voice_assistant"):
+        """导出为Prometheus文本格式"""
+        metric = f"{prefix}_stage_duration_seconds"
+        errors_metric = f"{prefix}_stage_errors_total"
+        lines = [
+            f"# HELP {metric} Duration of each processing stage in seconds.",
+            f"# TYPE {metric} histogram"
+        ]
+        error_lines = [
+            f"# HELP {errors_metric} Number of stage executions that raised an exception.",
+            f"# TYPE {errors_metric} counter"
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{label}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{stage="{label}"}} {histogram.count}')
+                error_lines.append(f'{errors_metric}{{stage="{label}"}} {histogram.errors}')
+        return "\n".join(lines + error_lines) + "\n"
+
+    def dump_json(self, path):
+        """把统计结果写入JSON文件"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.export_json(indent=2))
+            logger.info(f"性能追踪结果已导出: {path}")
+        except Exception as e:
+            logger.error(f"导出性能追踪结果失败: {e}")
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+
+
+# 全局追踪器
+_tracer = Tracer(
+    enabled=MonitoringConfig.TRACING_ENABLED,
+    recent_traces=MonitoringConfig.TRACE_RECENT_TRACES
+)
+
+
+def get_tracer():
+    """获取全局追踪器"""
+    return _tracer
+
+
+def span(name):
+    """在全局追踪器上创建span"""
+    return _tracer.span(name)
+
+
+def traced(name):
+    """使用全局追踪器的函数装饰器"""
+    return _tracer.traced(name)
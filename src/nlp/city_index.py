@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+城市代码索引
+把中国天气网的城市代码表（cities.tsv）编译为紧凑的二进制文件，运行时通过 mmap 映射，
+不把几千个城市名加载为Python对象。文件中是三张按字节序排序的表，查询时二分查找：
+    城市名表    城市名 -> 城市代码
+    拼音表      拼音 -> 城市序号
+    删除变体表  城市名删去一个字 -> 城市序号（编辑距离为1的模糊匹配）
+支持精确、前缀、拼音和模糊查询，以及在文本中查找城市名（供NLP实体提取使用）。
+含有城市名但不是地名的词（"宁德时代"等）列在 data/rules/non_city_words.json 中，由规则存储加载。
+重新生成索引：
+    python src/nlp/city_index.py data/rules/cities.tsv data/rules/city_index.bin
+"""
+
+import os
+import re
+import sys
+import mmap
+import struct
+import logging
+import argparse
+from bisect import bisect_left
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CIDX"
+FORMAT_VERSION = 1
+# 文件头：魔数、格式版本、城市数、拼音表条数、删除变体表条数
+_HEADER = struct.Struct("<4sHIII")
+
+# 查询时可以去掉的行政区划后缀（较长的在前）
+ADMIN_SUFFIXES = ("特别行政区", "自治州", "地区", "新区", "市", "区", "县")
+
+# 在文本中查找城市名时的最短长度（避免单字误匹配）
+MIN_GAZETTEER_LENGTH = 2
+
+# 城市名没有单独成词时，后面紧跟这些词仍然视为城市（"泉州市天气"中"泉州市"是一个词）
+LOCATION_SUFFIXES = ADMIN_SUFFIXES + ("省", "工业园区", "开发区", "高新区")
+WEATHER_WORDS = ("天气", "气温", "温度", "下雨", "下雪", "降雨", "降温", "刮风", "空气", "雾霾", "台风", "多少度")
+TIME_WORDS = ("今天", "明天", "后天", "昨天", "今晚", "明晚", "明早", "周末", "本周", "这周", "下周", "周一", "周二",
+              "周三", "周四", "周五", "周六", "周日", "早上", "上午", "中午", "下午", "晚上", "现在", "最近", "未来")
+_CITY_CONTEXT_WORDS = LOCATION_SUFFIXES + WEATHER_WORDS + TIME_WORDS
+
+
+def _token_boundaries(tokens):
+    """分词结果中各个词的起止位置"""
+    boundaries = {0}
+    position = 0
+    for token in tokens:
+        position += len(token)
+        boundaries.add(position)
+    return boundaries
+
+
+def _is_city_mention(text, start, end, boundaries):
+    """text[start:end] 是否作为城市出现：与分词边界对齐，或者后面紧跟地名后缀、天气词或时间词"""
+    if start in boundaries and end in boundaries:
+        return True
+    return text.startswith(_CITY_CONTEXT_WORDS, end)
+
+
+def read_tsv(tsv_path):
+    """读取城市代码表
+    每行：代码<TAB>城市名<TAB>拼音<TAB>省份，拼音和省份可以为空，# 开头的行为注释
+    Returns:
+        [(城市名, 代码, 拼音), ...]
+    """
+    rows = []
+    with open(tsv_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) < 2 or not fields[0].isdigit():
+                raise ValueError(f"{tsv_path} 第{line_number}行格式错误: {line}")
+            pinyin = fields[2].strip().lower().replace(" ", "") if len(fields) > 2 else ""
+            rows.append((fields[1].strip(), int(fields[0]), pinyin))
+    return rows
+
+
+def _fill_pinyin(rows):
+    """拼音列为空时尝试用 pypinyin 生成（可选依赖）"""
+    if all(pinyin for _, _, pinyin in rows):
+        return rows
+    try:
+        from pypinyin import lazy_pinyin
+    except ImportError:
+        logger.warning("未安装pypinyin，拼音列为空的城市不支持拼音查询")
+        return rows
+    return [(name, code, pinyin or "".join(lazy_pinyin(name))) for name, code, pinyin in rows]
+
+
+def _deletions(name):
+    """城市名删去一个字得到的所有变体"""
+    return {name[:i] + name[i + 1:] for i in range(len(name))} if len(name) > 1 else set()
+
+
+def _pack_table(keys, values, value_format):
+    """打包一张排序表：偏移数组 + 键的字节串 + 值数组"""
+    encoded = [key.encode("utf-8") for key in keys]
+    offsets = [0]
+    for key in encoded:
+        offsets.append(offsets[-1] + len(key))
+    return (struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+            + struct.pack(f"<{len(values)}{value_format}", *values))
+
+
+def build_index(tsv_path, index_path):
+    """从城市代码表生成二进制索引（先写临时文件再替换，读取方不会看到写了一半的文件）
+    Returns:
+        城市数量
+    """
+    rows = _fill_pinyin(read_tsv(tsv_path))
+
+    # 同名城市只保留第一条（代码表中靠前的为地级市）
+    cities = {}
+    for name, code, pinyin in rows:
+        cities.setdefault(name, (code, pinyin))
+    names = sorted(cities, key=lambda name: name.encode("utf-8"))
+    position = {name: index for index, name in enumerate(names)}
+
+    pinyin_pairs = sorted({(cities[name][1], position[name]) for name in names if cities[name][1]},
+                          key=lambda pair: (pair[0].encode("utf-8"), pair[1]))
+    deletion_pairs = sorted({(variant, position[name]) for name in names for variant in _deletions(name)},
+                            key=lambda pair: (pair[0].encode("utf-8"), pair[1]))
+
+    data = (
+        _HEADER.pack(MAGIC, FORMAT_VERSION, len(names), len(pinyin_pairs), len(deletion_pairs))
+        + _pack_table(names, [cities[name][0] for name in names], "I")
+        + _pack_table([p for p, _ in pinyin_pairs], [i for _, i in pinyin_pairs], "I")
+        + _pack_table([d for d, _ in deletion_pairs], [i for _, i in deletion_pairs], "I")
+    )
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, index_path)
+    logger.info("已生成城市索引: %s（%d个城市）", index_path, len(names))
+    return len(names)
+
+
+class _Table:
+    """映射文件中的一张排序表，可直接用 bisect 二分查找"""
+
+    __slots__ = ("_buffer", "_count", "_offsets", "_keys", "_values")
+
+    def __init__(self, buffer, start, count):
+        self._buffer = buffer
+        self._count = count
+        self._offsets = start
+        self._keys = start + (count + 1) * 4
+        key_bytes = struct.unpack_from("<I", buffer, self._offsets + count * 4)[0]
+        self._values = self._keys + key_bytes
+
+    @property
+    def end(self):
+        return self._values + self._count * 4
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        start, end = struct.unpack_from("<II", self._buffer, self._offsets + index * 4)
+        return self._buffer[self._keys + start:self._keys + end]
+
+    def value(self, index):
+        return struct.unpack_from("<I", self._buffer, self._values + index * 4)[0]
+
+    def indices(self, key):
+        """精确查找，返回键等于 key 的所有序号"""
+        key = key.encode("utf-8")
+        start = end = bisect_left(self, key)
+        while end < self._count and self[end] == key:
+            end += 1
+        return range(start, end)
+
+    def find(self, key):
+        """精确查找，返回 [值, ...]"""
+        return [self.value(index) for index in self.indices(key)]
+
+    def prefix_range(self, prefix):
+        """以 prefix 开头的键的序号范围"""
+        prefix = prefix.encode("utf-8")
+        start = bisect_left(self, prefix)
+        end = start
+        while end < self._count and self[end].startswith(prefix):
+            end += 1
+        return start, end
+
+
+class CityIndex:
+    """内存映射的城市代码索引（只读，可在多个线程间共享）"""
+
+    def __init__(self, index_path, non_city_words=()):
+        """打开索引文件
+        Args:
+            index_path: 索引文件路径
+            non_city_words: 含有城市名但不是地名的词（"宁德时代"、"长沙发"），文本中查找城市名时排除
+        Raises:
+            OSError / ValueError: 文件不存在或格式不正确
+        """
+        self.path = index_path
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, pinyin_count, deletion_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"不支持的城市索引格式: {index_path}")
+        self._names = _Table(self._mmap, _HEADER.size, count)
+        self._pinyins = _Table(self._mmap, self._names.end, pinyin_count)
+        self._deletions = _Table(self._mmap, self._pinyins.end, deletion_count)
+        self._max_length = max((len(self._names[i].decode("utf-8")) for i in range(count)), default=0)
+        words = sorted({word for word in non_city_words if word}, key=len, reverse=True)
+        self._non_city_pattern = re.compile("|".join(map(re.escape, words))) if words else None
+
+    @classmethod
+    def open(cls, tsv_path, non_city_words=()):
+        """打开代码表对应的索引，不存在时先生成
+        索引文件名带有代码表的修改时间：代码表更新后生成新文件，而不是覆盖仍被映射的旧文件
+        （Windows 上无法替换已映射的文件），旧索引文件在不再使用后清理
+        """
+        directory = os.path.dirname(tsv_path)
+        index_name = f"city_index-{os.stat(tsv_path).st_mtime_ns}.bin"
+        index_path = os.path.join(directory, index_name)
+        if not os.path.exists(index_path):
+            build_index(tsv_path, index_path)
+            for name in os.listdir(directory):
+                if name.startswith("city_index-") and name.endswith(".bin") and name != index_name:
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+        return cls(index_path, non_city_words)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return self.exact(name) is not None
+
+    def _entry(self, index):
+        return self._names[index].decode("utf-8"), str(self._names.value(index))
+
+    def exact(self, name):
+        """精确查询，返回城市代码字符串，找不到返回 None"""
+        codes = self._names.find(name)
+        return str(codes[0]) if codes else None
+
+    def prefix(self, prefix, limit=10):
+        """前缀查询
+        Returns:
+            [(城市名, 代码), ...]
+        """
+        start, end = self._names.prefix_range(prefix)
+        return [self._entry(index) for index in range(start, min(end, start + limit))]
+
+    def pinyin(self, pinyin):
+        """拼音查询（不区分大小写，忽略空格），同音城市全部返回
+        Returns:
+            [(城市名, 代码), ...]
+        """
+        key = pinyin.lower().replace(" ", "")
+        return [self._entry(index) for index in self._pinyins.find(key)]
+
+    def fuzzy(self, name):
+        """编辑距离为1的模糊查询（错一个字、多一个字或少一个字）
+        Returns:
+            [(城市名, 代码), ...]
+        """
+        candidates = set()
+        for variant in _deletions(name):
+            # 多一个字：删去后就是城市名；错一个字：双方各删一个字后相同
+            candidates.update(self._names.indices(variant))
+            candidates.update(self._deletions.find(variant))
+        # 少一个字：城市名删去一个字后与输入相同
+        candidates.update(self._deletions.find(name))
+        matches = [self._entry(index) for index in sorted(candidates)]
+        return [(city, code) for city, code in matches if city != name]
+
+    def resolve(self, name):
+        """把用户说的地名解析为城市：依次尝试精确、去掉行政区划后缀、最长前缀、拼音和模糊匹配
+        例如"苏州工业园区"解析为苏州，"suzhou"解析为苏州
+        Returns:
+            (城市名, 代码)，无法确定时返回 None
+        """
+        if not name:
+            return None
+        name = name.strip()
+        code = self.exact(name)
+        if code:
+            return name, code
+
+        for suffix in ADMIN_SUFFIXES:
+            if name.endswith(suffix) and len(name) > len(suffix) + 1:
+                code = self.exact(name[:-len(suffix)])
+                if code:
+                    return name[:-len(suffix)], code
+
+        for length in range(min(len(name) - 1, self._max_length), MIN_GAZETTEER_LENGTH - 1, -1):
+            code = self.exact(name[:length])
+            if code:
+                return name[:length], code
+
+        if name.isascii():
+            matches = self.pinyin(name)
+        else:
+            matches = self.fuzzy(name)
+        # 有歧义时不猜测
+        return matches[0] if len(matches) == 1 else None
+
+    def _non_city_spans(self, text, boundaries):
+        """文本中出现的非地名词的位置（只计与分词边界对齐的出现，"长沙发布会"中的"长沙发"不算）"""
+        if self._non_city_pattern is None:
+            return []
+        return [(match.start(), match.end()) for match in self._non_city_pattern.finditer(text)
+                if match.start() in boundaries and match.end() in boundaries]
+
+    def find_in_text(self, text, tokens):
+        """在文本中查找城市名（从左到右，优先最长匹配）
+        城市名必须与分词结果对齐，或者后面紧跟地名后缀、天气词或时间词（"中山大学"中的"中山"不算）；
+        jieba会拆开的非地名词（"宁德时代"分为"宁德/时代"）由 non_city_words 排除
+        Args:
+            text: 文本
+            tokens: 该文本的分词结果（调用方已经分过词，这里不再重复分词）
+        Returns:
+            [城市名, ...]，按出现顺序去重
+        """
+        found = []
+        boundaries = _token_boundaries(tokens)
+        excluded = self._non_city_spans(text, boundaries)
+        position = 0
+        while position < len(text):
+            for length in range(min(self._max_length, len(text) - position), MIN_GAZETTEER_LENGTH - 1, -1):
+                candidate = text[position:position + length]
+                end = position + length
+                if any(start <= position and end <= stop for start, stop in excluded):
+                    continue
+                if self._names.indices(candidate) and _is_city_mention(text, position, end, boundaries):
+                    if candidate not in found:
+                        found.append(candidate)
+                    position += length
+                    break
+            else:
+                position += 1
+        return found
+
+    def close(self):
+        self._mmap.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成城市代码索引")
+    parser.add_argument("tsv", help="城市代码表（代码<TAB>城市名<TAB>拼音<TAB>省份）")
+    parser.add_argument("output", help="输出的索引文件")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = build_index(args.tsv, args.output)
+    print(f"已生成 {args.output}，共{count}个城市")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则和词典存储模块
+意图规则、实体词典、同义词和应用路径保存在 data/rules/*.json 中，
+城市代码表保存在 data/rules/cities.tsv 中（编译为内存映射的城市索引，见 city_index.py），
+查找城市名时排除的非地名词保存在 data/rules/non_city_words.json 中。
+RuleStore 把它们加载为不可变的规则快照（正则预先编译），后台线程定期检查文件修改时间，
+文件变化后在后台编译新快照，成功后整体替换引用（写时复制）。
+处理中的对话轮次继续使用开始时取得的快照，不会被阻塞，也不会看到一半新一半旧的规则；
+新快照编译失败时保留旧快照并记录错误。
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import NLPConfig
+from src.nlp.city_index import CityIndex
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# JSON规则文件名（不含扩展名）
+RULE_FILES = ("intent_rules", "entity_types", "synonyms", "app_paths", "non_city_words")
+
+# 城市代码表
+CITY_TABLE = "cities.tsv"
+
+# 匹配时忽略大小写的实体类型
+CASE_INSENSITIVE_ENTITIES = {"app_name"}
+
+
+def _compile(pattern, flags=0):
+    """编译正则，无效的正则返回 None（匹配时按普通字符串处理）"""
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        logger.warning("无效的正则表达式，按普通文本匹配: %s", pattern)
+        return None
+
+
+class RuleSnapshot:
+    """一个版本的规则数据和编译好的匹配器，创建后不再修改"""
+
+    __slots__ = ("version", "intent_rules", "entity_types", "synonyms", "app_paths", "non_city_words",
+                 "city_index", "intent_matchers", "entity_matchers")
+
+    def __init__(self, version, intent_rules, entity_types, synonyms, app_paths, non_city_words, city_index):
+        self.version = version
+        self.intent_rules = intent_rules
+        self.entity_types = entity_types
+        self.synonyms = synonyms
+        self.app_paths = app_paths
+        # {分类: [含有城市名但不是地名的词, ...]}
+        self.non_city_words = non_city_words
+        # 城市索引同时用于天气查询的城市代码和NLP的城市实体提取
+        self.city_index = city_index
+
+        # [(意图, [(编译后的正则或None, 原始模式), ...]), ...]，保持规则文件中的优先级顺序
+        self.intent_matchers = [
+            (intent, [(_compile(pattern, re.IGNORECASE), pattern) for pattern in patterns])
+            for intent, patterns in intent_rules.items()
+        ]
+        # {实体类型: [(编译后的正则或None, 原始模式), ...]}
+        self.entity_matchers = {
+            entity_type: [
+                (_compile(pattern, re.IGNORECASE if entity_type in CASE_INSENSITIVE_ENTITIES else 0), pattern)
+                for pattern in patterns
+            ]
+            for entity_type, patterns in entity_types.items()
+        }
+
+    @classmethod
+    def load(cls, rules_dir, version=1):
+        """从目录加载所有规则文件
+        Raises:
+            OSError / ValueError: 文件缺失或格式错误
+        """
+        data = {}
+        for name in RULE_FILES:
+            with open(os.path.join(rules_dir, f"{name}.json"), "r", encoding="utf-8") as f:
+                # 意图规则按文件中的顺序决定优先级
+                data[name] = json.load(f, object_pairs_hook=OrderedDict)
+            if not isinstance(data[name], dict):
+                raise ValueError(f"{name}.json 的顶层必须是对象")
+        non_city_words = [word for words in data["non_city_words"].values() for word in words]
+        data["city_index"] = CityIndex.open(os.path.join(rules_dir, CITY_TABLE), non_city_words)
+        return cls(version, **data)
+
+
+class RuleStore:
+    """可热更新的规则存储"""
+
+    def __init__(self, rules_dir=None, reload_interval=None):
+        """初始化规则存储并加载第一个快照
+        Args:
+            rules_dir: 规则目录，相对路径按项目根目录解析，默认 NLPConfig.RULES_DIR
+            reload_interval: 检查文件变化的间隔（秒），默认 NLPConfig.RULES_RELOAD_INTERVAL
+        """
+        rules_dir = rules_dir or NLPConfig.RULES_DIR
+        self.rules_dir = rules_dir if os.path.isabs(rules_dir) else os.path.join(PROJECT_ROOT, rules_dir)
+        self.reload_interval = reload_interval or NLPConfig.RULES_RELOAD_INTERVAL
+
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+        self._mtimes = self._scan()
+        # 首次加载失败直接抛出异常：没有规则时NLP无法工作
+        self._snapshot = RuleSnapshot.load(self.rules_dir)
+        logger.info("已加载规则: %s（%d个意图，%d个城市）", self.rules_dir,
+                    len(self._snapshot.intent_rules), len(self._snapshot.city_index))
+
+    @property
+    def snapshot(self):
+        """当前规则快照。一轮处理应只取一次并一直使用它"""
+        return self._snapshot
+
+    def add_listener(self, callback):
+        """注册规则更新回调，新快照生效后在更新线程中调用 callback(snapshot)
+        绑定方法只保存弱引用，对象被回收后自动失效
+        """
+        if hasattr(callback, "__self__"):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+
+    def _scan(self):
+        """读取规则文件的修改时间和大小"""
+        mtimes = {}
+        for name in [f"{name}.json" for name in RULE_FILES] + [CITY_TABLE]:
+            try:
+                stat = os.stat(os.path.join(self.rules_dir, name))
+                mtimes[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    def reload(self, force=False):
+        """文件有变化时重新加载
+        Args:
+            force: 不检查修改时间，直接重新加载
+        Returns:
+            是否换上了新快照
+        """
+        with self._reload_lock:
+            mtimes = self._scan()
+            if not force and mtimes == self._mtimes:
+                return False
+            self._mtimes = mtimes
+            try:
+                snapshot = RuleSnapshot.load(self.rules_dir, self._snapshot.version + 1)
+            except Exception as e:
+                logger.error(f"加载规则失败，继续使用版本{self._snapshot.version}: {e}")
+                return False
+            self._snapshot = snapshot
+
+        logger.info("规则已更新到版本%d", snapshot.version)
+        self._listeners = [ref for ref in self._listeners if ref() is not None]
+        for ref in list(self._listeners):
+            callback = ref()
+            if callback is None:
+                continue
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"规则更新回调失败: {e}")
+        return True
+
+    def start_watching(self):
+        """启动后台线程定期检查规则文件（重复调用无效）"""
+        if self._watcher is not None:
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="rule-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is None:
+            return
+        self._stop_event.set()
+        self._watcher.join(timeout=self.reload_interval + 1)
+        self._watcher = None
+
+    def _watch(self):
+        while not self._stop_event.wait(self.reload_interval):
+            self.reload()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rule_store():
+    """进程内共享的规则存储（NLP处理器、爬虫和本地操作使用同一份规则和同一个监视线程）"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RuleStore()
+            if NLPConfig.RULES_RELOAD_ENABLED:
+                _store.start_watching()
+        return _store
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多会话对话服务
+一个后端进程为多个设备提供对话服务，HTTP接口：
+    POST   /sessions                创建会话，返回 session_id
+    POST   /sessions/<id>/turns     发送一轮对话 {"text": "..."}，返回回复
+    DELETE /sessions/<id>           关闭会话
+    GET    /health                  服务状态和会话统计
+    GET    /metrics                 各阶段耗时直方图（Prometheus文本格式）
+    GET    /metrics.json            各阶段耗时统计和最近的调用树（JSON）
+"""
+
+import os
+import sys
+import logging
+import argparse
+import threading
+from dotenv import load_dotenv
+from flask import Flask, Response, jsonify, request
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import DialogueServerConfig
+from src.dialogue_manager.session_manager import SessionManager
+from src.monitoring.tracing import get_tracer
+from src.monitoring.log_pipeline import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def create_session_manager():
+    """创建共享资源（NLP处理器、对话管理器、API集成器）和会话管理器"""
+    from src.nlp.nlp_processor import NLPProcessor
+    from src.dialogue_manager.dialogue_manager import DialogueManager
+    from src.api_integration.api_integrator import APIIntegrator
+
+    dialogue_manager = DialogueManager(nlp_processor=NLPProcessor())
+    return SessionManager(dialogue_manager, APIIntegrator())
+
+
+def create_app(session_manager=None):
+    """创建Flask应用
+    Args:
+        session_manager: 可选的会话管理器，为None时创建默认实例
+    """
+    session_manager = session_manager or create_session_manager()
+    app = Flask(__name__)
+    # Flask 2.3 起 JSON_AS_ASCII 配置不再生效，直接设置JSON提供者
+    app.json.ensure_ascii = False
+    app.session_manager = session_manager
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "ok", **session_manager.get_stats()})
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(get_tracer().export_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/metrics.json", methods=["GET"])
+    def metrics_json():
+        return Response(get_tracer().export_json(), mimetype="application/json")
+
+    @app.route("/sessions", methods=["POST"])
+    def create_session():
+        data = request.get_json(silent=True) or {}
+        session = session_manager.create_session(user_id=data.get("user_id", "default"))
+        return jsonify({"session_id": session.session_id}), 201
+
+    @app.route("/sessions/<session_id>/turns", methods=["POST"])
+    def handle_turn(session_id):
+        data = request.get_json(silent=True) or {}
+        text = (data.get("text") or "").strip()
+        if not text:
+            return jsonify({"error": "缺少对话内容 text"}), 400
+        try:
+            session_id, response = session_manager.handle_turn(session_id, text)
+        except Exception as e:
+            logger.error(f"处理会话{session_id}的对话失败: {e}")
+            return jsonify({"error": "处理对话失败"}), 500
+        return jsonify({"session_id": session_id, "response": response})
+
+    @app.route("/sessions/<session_id>", methods=["DELETE"])
+    def close_session(session_id):
+        if not session_manager.close_session(session_id):
+            return jsonify({"error": "会话不存在"}), 404
+        return "", 204
+
+    return app
+
+
+def start_session_sweeper(session_manager, interval=None):
+    """启动后台线程，定期淘汰过期会话"""
+    interval = interval or DialogueServerConfig.SESSION_SWEEP_INTERVAL
+    stop_event = threading.Event()
+
+    def sweep():
+        while not stop_event.wait(interval):
+            try:
+                session_manager.evict_expired()
+            except Exception as e:
+                logger.error(f"清理过期会话失败: {e}")
+
+    threading.Thread(target=sweep, name="session-sweeper", daemon=True).start()
+    return stop_event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多会话对话服务")
+    parser.add_argument("--host", default=DialogueServerConfig.HOST)
+    parser.add_argument("--port", type=int, default=DialogueServerConfig.PORT)
+    args = parser.parse_args()
+
+    # 服务日志只输出到控制台，由进程管理器收集
+    setup_logging(log_file="")
+    load_dotenv()
+
+    app = create_app()
+    start_session_sweeper(app.session_manager)
+    logger.info(f"对话服务启动: http://{args.host}:{args.port}")
+    # threaded=True：不同会话的请求并发处理，同一会话由会话锁保证顺序
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+百度语音识别客户端模块
+复用同一个HTTP会话和访问令牌（过期前自动刷新），
+音频格式已符合要求时直接使用原始PCM数据，不再重新采样
+"""
+
+import os
+import sys
+import time
+import uuid
+import logging
+import threading
+import weakref
+import requests
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# 百度接口要求的音频格式：16kHz、16位、单声道PCM
+TARGET_SAMPLE_RATE = 16000
+TARGET_SAMPLE_WIDTH = 2
+# 原始PCM上传支持的采样率
+SUPPORTED_SAMPLE_RATES = (8000, 16000)
+
+# 转换后的PCM缓存：同一段音频被多个引擎或重试使用时只转换一次
+_pcm_cache = weakref.WeakKeyDictionary()
+_pcm_cache_lock = threading.Lock()
+
+
+def audio_to_pcm(audio, sample_rate=TARGET_SAMPLE_RATE, sample_width=TARGET_SAMPLE_WIDTH):
+    """获取指定格式的PCM数据
+    Args:
+        audio: speech_recognition.AudioData 对象
+    Returns:
+        PCM字节数据
+    """
+    # 麦克风已按目标格式打开时，直接返回原始帧数据
+    if audio.sample_rate == sample_rate and audio.sample_width == sample_width:
+        return audio.frame_data
+
+    key = (sample_rate, sample_width)
+    with _pcm_cache_lock:
+        cached = _pcm_cache.get(audio)
+        if cached and key in cached:
+            return cached[key]
+
+    pcm = audio.get_raw_data(convert_rate=sample_rate, convert_width=sample_width)
+    with _pcm_cache_lock:
+        _pcm_cache.setdefault(audio, {})[key] = pcm
+    return pcm
+
+
+class BaiduASRClient:
+    """百度语音识别REST客户端"""
+
+    TOKEN_URL = "https://aip.baidubce.com/oauth/2.0/token"
+    ASR_URL = "https://vop.baidu.com/server_api"
+
+    # 令牌失效相关的错误码，遇到时刷新令牌并重试一次
+    TOKEN_ERRORS = {110, 111, 3302}
+    # 音频中没有可识别内容的错误码
+    NO_SPEECH_ERRORS = {3301}
+    # 令牌提前刷新的时间余量（秒）
+    TOKEN_REFRESH_MARGIN = 300
+
+    def __init__(self, api_key, secret_key, dev_pid=1537, token_url=None, asr_url=None, timeout=10, session=None):
+        """初始化客户端
+        Args:
+            api_key: 百度API Key
+            secret_key: 百度Secret Key
+            dev_pid: 识别模型（1537为普通话）
+            token_url: 令牌接口地址（测试时可指向本地模拟服务）
+            asr_url: 识别接口地址（测试时可指向本地模拟服务）
+            timeout: 请求超时时间（秒）
+            session: 可选的requests会话
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.dev_pid = dev_pid
+        self.token_url = token_url or self.TOKEN_URL
+        self.asr_url = asr_url or self.ASR_URL
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.cuid = str(uuid.getnode())
+
+        self._token = None
+        self._token_expires_at = 0
+        self._token_lock = threading.Lock()
+
+    def get_token(self, force_refresh=False):
+        """获取访问令牌，过期前自动刷新"""
+        with self._token_lock:
+            if not force_refresh and self._token and time.time() < self._token_expires_at:
+                return self._token
+
+            response = self.session.post(self.token_url, params={
+                "grant_type": "client_credentials",
+                "client_id": self.api_key,
+                "client_secret": self.secret_key
+            }, timeout=self.timeout)
+            data = response.json()
+            if "access_token" not in data:
+                raise RuntimeError(f"获取百度访问令牌失败: {data.get('error_description', data)}")
+
+            self._token = data["access_token"]
+            expires_in = int(data.get("expires_in", 0))
+            self._token_expires_at = time.time() + max(0, expires_in - self.TOKEN_REFRESH_MARGIN)
+            logger.info("百度访问令牌已刷新")
+            return self._token
+
+    def recognize_pcm(self, pcm, sample_rate=TARGET_SAMPLE_RATE):
+        """识别16位单声道PCM数据
+        Returns:
+            识别文本，没有识别出内容时返回None
+        Raises:
+            ValueError: 采样率不受支持
+        """
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"百度语音识别只支持{SUPPORTED_SAMPLE_RATES}Hz的PCM音频: {sample_rate}")
+        result = self._post_audio(pcm, sample_rate, self.get_token())
+        if result.get("err_no") in self.TOKEN_ERRORS:
+            logger.info("百度访问令牌失效，刷新后重试")
+            result = self._post_audio(pcm, sample_rate, self.get_token(force_refresh=True))
+
+        err_no = result.get("err_no")
+        if err_no == 0:
+            texts = result.get("result") or []
+            return texts[0] if texts else None
+        if err_no in self.NO_SPEECH_ERRORS:
+            return None
+        raise RuntimeError(f"百度语音识别API失败: {result.get('err_msg', err_no)}")
+
+    def recognize(self, audio):
+        """识别speech_recognition.AudioData音频"""
+        return self.recognize_pcm(audio_to_pcm(audio))
+
+    def _post_audio(self, pcm, sample_rate, token):
+        """以原始PCM方式上传音频，避免base64编码的额外开销
+        原始上传时格式和采样率由 Content-Type 给出，音频长度即 Content-Length（由requests设置）
+        """
+        response = self.session.post(
+            self.asr_url,
+            params={"dev_pid": self.dev_pid, "cuid": self.cuid, "token": token},
+            data=pcm,
+            headers={"Content-Type": f"audio/pcm;rate={sample_rate}"},
+            timeout=self.timeout
+        )
+        return response.json()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持续监听模块
+采集线程把语音片段放入有界队列，识别线程池并行消费，
+识别期间不会停止采集，结果按采集顺序通知订阅者
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# 通知识别线程退出的哨兵
+_STOP = object()
+
+
+class ContinuousListener:
+    """持续监听引擎（生产者/消费者模型）"""
+
+    def __init__(self, capture_fn, recognize_fn, num_workers=2, queue_size=4, put_timeout=0.5):
+        """初始化持续监听引擎
+        Args:
+            capture_fn: 采集函数 capture_fn(stop_event)，是一个生成器，逐个产出语音片段，
+                        stop_event 置位后应尽快结束
+            recognize_fn: 识别函数 recognize_fn(audio)，返回识别文本或None
+            num_workers: 识别线程数量
+            queue_size: 待识别队列容量
+            put_timeout: 队列满时采集线程等待的最长时间（秒），超时后丢弃最旧的片段
+        """
+        self.capture_fn = capture_fn
+        self.recognize_fn = recognize_fn
+        self.num_workers = max(1, num_workers)
+        self.queue_size = max(1, queue_size)
+        self.put_timeout = put_timeout
+
+        self.segments = queue.Queue(maxsize=self.queue_size)
+        self.subscribers = []
+        self.dropped_segments = 0
+
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._stopping = []  # 已通知停止、可能尚未退出的线程
+        # 识别线程检查停止事件的间隔（秒），队列中放不下退出哨兵时靠它退出
+        self._poll_interval = 0.5
+        self._subscriber_lock = threading.Lock()
+
+        # 结果重排序：识别线程完成顺序可能和采集顺序不同
+        self._order_lock = threading.Lock()
+        self._next_seq = 0
+        self._finished = {}
+
+    @property
+    def is_running(self):
+        return bool(self._threads) and not self._stop_event.is_set()
+
+    def subscribe(self, callback):
+        """订阅识别结果，callback(text) 在识别线程中调用"""
+        with self._subscriber_lock:
+            if callback not in self.subscribers:
+                self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """取消订阅"""
+        with self._subscriber_lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def start(self, timeout=5):
+        """启动采集线程和识别线程池
+        上一轮的线程还没退出时（例如识别线程仍在等待网络请求）先等待它们，最多 timeout 秒；
+        每一轮使用自己的队列和停止事件，未退出的旧线程不会影响新一轮
+        """
+        if self.is_running:
+            logger.warning("持续监听已在运行")
+            return
+        if self._threads:
+            # 上一轮因采集错误退出，先通知残留的识别线程退出
+            self.stop()
+        if not self.join(timeout):
+            logger.warning("上一轮持续监听的线程仍未退出")
+
+        self._stop_event = stop_event = threading.Event()
+        self.segments = segments = queue.Queue(maxsize=self.queue_size)
+        with self._order_lock:
+            self._next_seq = 0
+            self._finished = {}
+        self._threads = [threading.Thread(target=self._capture_loop, args=(segments, stop_event),
+                                          name="listen-capture", daemon=True)]
+        for i in range(self.num_workers):
+            self._threads.append(
+                threading.Thread(target=self._worker_loop, args=(segments, stop_event),
+                                 name=f"listen-worker-{i}", daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"持续监听已启动，识别线程数: {self.num_workers}")
+
+    def stop(self):
+        """停止监听（不阻塞，可在界面线程中调用）
+        通知线程退出后立即返回：正在进行的识别（可能在等待网络请求）结束后线程自行退出，
+        其结果不再通知订阅者。需要等待线程退出时调用 join()
+        """
+        if not self._threads:
+            return
+
+        self._stop_event.set()
+
+        # 清空尚未识别的片段，为每个识别线程放入退出哨兵（放不下时识别线程靠停止事件退出）
+        while True:
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                break
+        for _ in range(self.num_workers):
+            try:
+                self.segments.put_nowait(_STOP)
+            except queue.Full:
+                break
+
+        self._stopping.extend(self._threads)
+        self._threads = []
+        logger.info("持续监听已停止")
+
+    def join(self, timeout=None):
+        """等待已停止的线程退出
+        Args:
+            timeout: 最长等待时间（秒），0 表示只检查不等待，None 表示一直等待
+        Returns:
+            线程是否已全部退出
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        current = threading.current_thread()
+        for thread in self._stopping:
+            if thread is current:
+                continue
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            thread.join(remaining)
+        self._stopping = [t for t in self._stopping if t.is_alive() and t is not current]
+        return not self._stopping
+
+    def _capture_loop(self, segments, stop_event):
+        """采集线程：持续采集语音片段并放入队列"""
+        seq = 0
+        try:
+            for audio in self.capture_fn(stop_event):
+                if stop_event.is_set():
+                    break
+                if audio is None:
+                    continue
+                self._enqueue(segments, stop_event, (seq, audio))
+                seq += 1
+        except Exception as e:
+            logger.error(f"持续监听采集错误: {e}")
+            stop_event.set()
+
+    def _enqueue(self, segments, stop_event, item):
+        """放入队列；队列满时先等待，仍然满则丢弃最旧的片段（背压）"""
+        try:
+            segments.put(item, timeout=self.put_timeout)
+            return
+        except queue.Full:
+            pass
+
+        try:
+            dropped = segments.get_nowait()
+            if dropped is not _STOP:
+                self.dropped_segments += 1
+                logger.warning(f"识别积压，丢弃最旧的语音片段，累计丢弃: {self.dropped_segments}")
+                self._publish(dropped[0], None, stop_event)
+        except queue.Empty:
+            pass
+        try:
+            segments.put_nowait(item)
+        except queue.Full:
+            # 已停止（队列中放入了退出哨兵）
+            pass
+
+    def _worker_loop(self, segments, stop_event):
+        """识别线程：从队列取出片段进行识别"""
+        while not stop_event.is_set():
+            try:
+                item = segments.get(timeout=self._poll_interval)
+            except queue.Empty:
+                continue
+            if item is _STOP or stop_event.is_set():
+                break
+
+            seq, audio = item
+            text = None
+            try:
+                text = self.recognize_fn(audio)
+            except Exception as e:
+                logger.error(f"持续监听识别错误: {e}")
+            self._publish(seq, text, stop_event)
+
+    def _publish(self, seq, text, stop_event):
+        """按采集顺序发布识别结果"""
+        # 回调也在锁内执行，保证多个识别线程之间的通知顺序
+        with self._order_lock:
+            if stop_event.is_set():
+                # 停止后才完成的识别：丢弃结果，不影响下一轮的结果顺序
+                return
+            self._finished[seq] = text
+            while self._next_seq in self._finished:
+                result = self._finished.pop(self._next_seq)
+                self._next_seq += 1
+                if result:
+                    self._notify(result)
+
+    def _notify(self, text):
+        """通知所有订阅者"""
+        logger.info(f"持续监听识别到: {text}")
+        with self._subscriber_lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(text)
+            except Exception as e:
+                logger.error(f"识别结果回调出错: {e}")
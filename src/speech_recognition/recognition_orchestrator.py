@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音识别调度模块
+将同一段音频并发/对冲地提交给多个识别引擎，取最先返回的可信结果，
+并根据各引擎的延迟和错误统计自适应地选择主引擎
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class EngineStats:
+    """单个识别引擎的运行统计"""
+
+    # 指数滑动平均的平滑系数
+    EWMA_ALPHA = 0.3
+    # 每单位错误率折算的延迟惩罚（秒）
+    FAILURE_PENALTY = 5.0
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.abandoned = 0
+        self.ewma_latency = None
+        self.ewma_error_rate = 0.0
+        self.last_error = None
+
+    def record(self, latency, success, error=None):
+        """记录一次识别结果"""
+        self.calls += 1
+        if success:
+            self.successes += 1
+            # 只有成功的调用才计入延迟，失败往往很快返回，会拉低平均值
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * self.ewma_latency
+        else:
+            self.failures += 1
+            self.last_error = error
+
+        self.ewma_error_rate = self.EWMA_ALPHA * (0.0 if success else 1.0) + (1 - self.EWMA_ALPHA) * self.ewma_error_rate
+
+    def score(self):
+        """引擎评分，越小越优先；没有统计数据时返回None"""
+        if self.calls == 0:
+            return None
+        # 错误率高的引擎即使速度快也要降权
+        return (self.ewma_latency or 0.0) + self.FAILURE_PENALTY * self.ewma_error_rate
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "abandoned": self.abandoned,
+            "ewma_latency": self.ewma_latency,
+            "ewma_error_rate": self.ewma_error_rate,
+            "last_error": self.last_error
+        }
+
+
+class RecognitionOrchestrator:
+    """语音识别调度器
+
+    引擎是可调用对象 recognize_fn(audio)，返回识别文本、(文本, 置信度)
+    或None；识别失败时抛出异常。测试中可以注册本地桩函数替代云端服务。
+
+    对冲中落败的引擎：尚未开始的调用会被取消（计入 cancelled）；已经在运行的调用
+    无法中断（阻塞的HTTP请求），会继续运行到结束并照常记录延迟和错误统计，
+    只是结果被丢弃（计入 abandoned）。它在结束前占用一个工作线程，
+    因此线程池大小应不小于引擎数量的两倍，避免下一次识别排在落败的调用之后。
+    """
+
+    def __init__(self, hedge_delay=1.0, timeout=10, min_confidence=0.0, max_workers=4):
+        """初始化识别调度器
+        Args:
+            hedge_delay: 对冲延迟（秒），主引擎超过该时间未返回时启动下一个引擎；0表示同时启动所有引擎
+            timeout: 单次识别的总超时时间（秒）
+            min_confidence: 结果的最低置信度（引擎返回置信度时生效）
+            max_workers: 线程池大小
+        """
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.min_confidence = min_confidence
+
+        self.engines = {}
+        self.stats = {}
+        self.preferred_engine = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr")
+
+    def register_engine(self, name, recognize_fn):
+        """注册识别引擎"""
+        with self._lock:
+            self.engines[name] = recognize_fn
+            self.stats.setdefault(name, EngineStats())
+        logger.info(f"已注册语音识别引擎: {name}")
+
+    def unregister_engine(self, name):
+        """注销识别引擎"""
+        with self._lock:
+            self.engines.pop(name, None)
+
+    def set_preferred_engine(self, name):
+        """设置首选引擎（在缺少统计数据时作为主引擎）"""
+        self.preferred_engine = name
+
+    def rank_engines(self):
+        """按统计评分对引擎排序，首选引擎在评分相近时优先"""
+        with self._lock:
+            names = list(self.engines)
+
+        def sort_key(name):
+            score = self.stats[name].score()
+            preferred = 0 if name == self.preferred_engine else 1
+            # 没有统计数据的引擎按首选顺序排在前面，以便尽快收集数据
+            if score is None:
+                return (0, preferred, 0.0)
+            if preferred == 0:
+                # 首选引擎享有20%的评分优势，避免频繁切换
+                score *= 0.8
+            return (1, score, preferred)
+
+        return sorted(names, key=sort_key)
+
+    def _run_engine(self, name, audio):
+        """在工作线程中运行单个引擎并记录统计"""
+        recognize_fn = self.engines.get(name)
+        start = time.time()
+        try:
+            result = recognize_fn(audio)
+        except Exception as e:
+            self.stats[name].record(time.time() - start, False, str(e))
+            logger.error(f"{name}语音识别失败: {e}")
+            raise
+
+        text, confidence = self._normalize_result(result)
+        # 引擎正常返回但没有结果（例如无法识别语音）时不计入错误率
+        self.stats[name].record(time.time() - start, True)
+        return text, confidence
+
+    @staticmethod
+    def _normalize_result(result):
+        """统一引擎返回值为 (文本, 置信度)"""
+        if isinstance(result, tuple):
+            text, confidence = result[0], result[1]
+        else:
+            text, confidence = result, None
+        text = text.strip() if isinstance(text, str) else None
+        return text or None, confidence
+
+    def _is_confident(self, text, confidence):
+        if not text:
+            return False
+        return confidence is None or confidence >= self.min_confidence
+
+    def recognize(self, audio):
+        """识别音频，返回 (文本, 引擎名称)；全部失败时返回 (None, None)"""
+        ranked = self.rank_engines()
+        if not ranked:
+            logger.error("没有可用的语音识别引擎")
+            return None, None
+
+        deadline = time.time() + self.timeout
+        pending = {}
+        pending_engines = list(ranked)
+
+        def launch_next():
+            name = pending_engines.pop(0)
+            future = self._executor.submit(self._run_engine, name, audio)
+            pending[future] = name
+
+        launch_next()
+        if self.hedge_delay <= 0:
+            while pending_engines:
+                launch_next()
+
+        try:
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.warning("语音识别超时")
+                    break
+
+                # 还有备用引擎时，最多等待对冲延迟就启动下一个
+                wait_time = min(self.hedge_delay, remaining) if pending_engines else remaining
+                done, _ = wait(list(pending), timeout=wait_time, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    if pending_engines:
+                        logger.info(f"识别引擎{list(pending.values())}未在{self.hedge_delay}秒内返回，启动对冲引擎")
+                        launch_next()
+                    continue
+
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        text, confidence = future.result()
+                    except Exception:
+                        text, confidence = None, None
+
+                    if self._is_confident(text, confidence):
+                        logger.info(f"{name}引擎返回识别结果")
+                        return text, name
+
+                # 已完成的引擎都失败了，立即启动下一个而不是等待对冲延迟
+                if not pending and pending_engines:
+                    launch_next()
+        finally:
+            # 取消尚未开始的任务；已在运行的请求无法中断，完成后只记录统计，结果被丢弃
+            for future, name in pending.items():
+                if future.done():
+                    continue
+                if future.cancel():
+                    self.stats[name].cancelled += 1
+                else:
+                    self.stats[name].abandoned += 1
+                    logger.debug("%s引擎的识别仍在运行，结果将被丢弃", name)
+
+        return None, None
+
+    def get_stats(self):
+        """获取各引擎统计信息"""
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def shutdown(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False)
@@ -9,9 +9,15 @@ import sys
 import time
 import logging
 import threading
+import numpy as np
 import pyaudio
 import speech_recognition as sr
 from config.config import SpeechRecognitionConfig
+from src.speech_recognition.wake_word_detector import WakeWordDetector
+from src.speech_recognition.recognition_orchestrator import RecognitionOrchestrator
+from src.speech_recognition.continuous_listener import ContinuousListener
+from src.speech_recognition.baidu_asr_client import BaiduASRClient
+from src.monitoring.tracing import traced
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -37,6 +43,14 @@ class SpeechRecognizer:
         self.wake_up_words = SpeechRecognitionConfig.WAKE_UP_WORDS
         self.wake_word_sensitivity = 0.5  # 唤醒词灵敏度 0.0-1.0
         
+        # 本地唤醒词检测器（加载到模板后才启用，否则回退到云端识别）
+        self.wake_word_detector = WakeWordDetector(
+            sample_rate=self.sample_rate,
+            threshold=SpeechRecognitionConfig.WAKE_WORD_DTW_THRESHOLD,
+            band=SpeechRecognitionConfig.WAKE_WORD_DTW_BAND
+        )
+        self.wake_word_detector.load_templates(SpeechRecognitionConfig.WAKE_WORD_TEMPLATE_DIR)
+        
         # 设置使用的引擎
         self.engine = SpeechRecognitionConfig.ENGINE
         
@@ -54,6 +68,27 @@ class SpeechRecognizer:
         self.on_voice_detected = None
         self.on_speech_recognized = None
         
+        # 百度语音识别密钥（只在初始化时读取一次）
+        self.baidu_api_key = os.environ.get("BAIDU_ASR_API_KEY") or SpeechRecognitionConfig.BAIDU_API_KEY
+        self.baidu_secret_key = os.environ.get("BAIDU_ASR_SECRET_KEY") or SpeechRecognitionConfig.BAIDU_SECRET_KEY
+        
+        self.baidu_client = None
+        
+        # 识别调度器：对冲调用多个引擎，取最先返回的结果
+        self.orchestrator = RecognitionOrchestrator(
+            hedge_delay=SpeechRecognitionConfig.RECOGNITION_HEDGE_DELAY,
+            timeout=SpeechRecognitionConfig.RECOGNITION_TIMEOUT
+        )
+        self._register_engines()
+        
+        # 持续监听引擎（采集与识别分离）
+        self.continuous_listener = ContinuousListener(
+            capture_fn=self._capture_segments,
+            recognize_fn=self.recognize_audio,
+            num_workers=SpeechRecognitionConfig.CONTINUOUS_RECOGNITION_WORKERS,
+            queue_size=SpeechRecognitionConfig.CONTINUOUS_QUEUE_SIZE
+        )
+        
         # 初始化麦克风
         self.microphone = None
         self._initialize_microphone()
@@ -74,6 +109,29 @@ class SpeechRecognizer:
             logger.error(f"麦克风初始化失败: {e}")
             raise
     
+    def _register_engines(self):
+        """向识别调度器注册可用的识别引擎"""
+        self.orchestrator.register_engine("google", self._recognize_google)
+        if self._baidu_configured():
+            # 客户端只创建一次，复用HTTP连接和访问令牌
+            self.baidu_client = BaiduASRClient(
+                self.baidu_api_key,
+                self.baidu_secret_key,
+                dev_pid=SpeechRecognitionConfig.BAIDU_DEV_PID,
+                token_url=SpeechRecognitionConfig.BAIDU_TOKEN_URL,
+                asr_url=SpeechRecognitionConfig.BAIDU_ASR_URL
+            )
+            self.orchestrator.register_engine("baidu", self._recognize_baidu)
+        else:
+            logger.info("百度语音识别API密钥未配置，仅使用Google语音识别")
+        self.orchestrator.set_preferred_engine(self.engine)
+    
+    def _baidu_configured(self):
+        """检查百度语音识别密钥是否已配置"""
+        keys = [self.baidu_api_key, self.baidu_secret_key]
+        return all(key and not key.startswith("your_") for key in keys)
+    
+    @traced("asr.recognize")
     def recognize(self, timeout=10, phrase_time_limit=None):
         """识别用户语音输入"""
         try:
@@ -96,49 +154,31 @@ class SpeechRecognizer:
             if self.on_voice_detected:
                 threading.Thread(target=self.on_voice_detected, args=(audio,)).start()
             
-            # 尝试使用多个识别引擎
-            text = None
-            engines_tried = []
-            
-            # 首先尝试配置的引擎
-            if self.engine == "baidu":
-                engines_tried.append("baidu")
-                text = self._recognize_baidu(audio)
-            else:  # 默认使用Google
-                engines_tried.append("google")
-                text = self._recognize_google(audio)
-            
-            # 如果当前引擎失败，尝试备用引擎
-            if not text:
-                if "google" not in engines_tried:
-                    engines_tried.append("google")
-                    logger.info("百度引擎识别失败，尝试Google语音识别")
-                    text = self._recognize_google(audio)
-                elif "baidu" not in engines_tried:
-                    engines_tried.append("baidu")
-                    logger.info("Google引擎识别失败，尝试百度语音识别")
-                    text = self._recognize_baidu(audio)
-            
-            # 调用识别完成回调
-            if text and self.on_speech_recognized:
-                self.on_speech_recognized(text)
-            
-            return text.strip() if text else None
+            return self.recognize_audio(audio)
             
         except sr.WaitTimeoutError:
             logger.info("语音输入超时")
             return None
-        except sr.UnknownValueError:
-            logger.info("无法识别语音")
-            return None
-        except sr.RequestError as e:
-            logger.error(f"语音识别服务请求失败: {e}")
-            # 网络连接问题，不尝试重新识别
-            return None
         except Exception as e:
             logger.error(f"语音识别过程中发生错误: {e}")
             return None
     
+    @traced("asr.transcribe")
+    def recognize_audio(self, audio):
+        """识别已采集的音频数据"""
+        text, engine = self.orchestrator.recognize(audio)
+        if not text:
+            logger.info("无法识别语音")
+            return None
+        
+        logger.info(f"识别完成，使用引擎: {engine}")
+        
+        # 调用识别完成回调
+        if self.on_speech_recognized:
+            self.on_speech_recognized(text)
+        
+        return text
+    
     def _recognize_google(self, audio):
         """使用Google语音识别引擎"""
         try:
@@ -146,58 +186,13 @@ class SpeechRecognizer:
                 audio, 
                 language=self.language
             )
-        except Exception as e:
-            logger.error(f"Google语音识别失败: {e}")
-            raise
+        except sr.UnknownValueError:
+            # 服务正常但没有识别出内容
+            return None
     
     def _recognize_baidu(self, audio):
-        """使用百度语音识别引擎"""
-        try:
-            # 从环境变量获取百度API密钥
-            api_key = os.environ.get("BAIDU_ASR_API_KEY") or SpeechRecognitionConfig.BAIDU_API_KEY
-            secret_key = os.environ.get("BAIDU_ASR_SECRET_KEY") or SpeechRecognitionConfig.BAIDU_SECRET_KEY
-            app_id = os.environ.get("BAIDU_ASR_APP_ID") or SpeechRecognitionConfig.BAIDU_APP_ID
-            
-            if not all([api_key, secret_key, app_id]):
-                logger.warning("百度语音识别API密钥未配置，回退到Google")
-                return self._recognize_google(audio)
-            
-            try:
-                # 尝试使用SpeechRecognition的百度识别方法
-                return self.recognizer.recognize_baidu(
-                    audio, 
-                    app_id=app_id,
-                    api_key=api_key,
-                    secret_key=secret_key,
-                    language=self.language
-                )
-            except AttributeError:
-                # 如果SpeechRecognition库没有baidu识别方法，使用直接调用方式
-                logger.info("使用直接调用方式访问百度语音识别API")
-                try:
-                    from aip import AipSpeech
-                    client = AipSpeech(app_id, api_key, secret_key)
-                    
-                    # 转换音频数据
-                    audio_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
-                    
-                    # 调用百度语音识别API
-                    result = client.asr(audio_data, 'pcm', 16000, {
-                        'dev_pid': 1537,  # 中文普通话
-                    })
-                    
-                    if result['err_no'] == 0:
-                        return result['result'][0]
-                    else:
-                        logger.error(f"百度语音识别API失败: {result['err_msg']}")
-                        return self._recognize_google(audio)
-                except ImportError:
-                    logger.error("百度语音识别依赖未安装，回退到Google")
-                    return self._recognize_google(audio)
-        except Exception as e:
-            logger.error(f"百度语音识别失败: {e}")
-            # 回退到Google语音识别
-            return self._recognize_google(audio)
+        """使用百度语音识别引擎（失败时抛出异常，由调度器负责切换引擎）"""
+        return self.baidu_client.recognize(audio)
     
     def check_wake_up_word(self, text):
         """检查文本中是否包含唤醒词"""
@@ -217,6 +212,11 @@ class SpeechRecognizer:
         logger.info(f"正在监听唤醒词: {', '.join(self.wake_up_words)}")
         logger.info(f"唤醒词灵敏度: {self.wake_word_sensitivity}")
         
+        if self.wake_word_detector.has_templates():
+            return self._listen_for_wake_up_local(timeout)
+        
+        # 没有本地模板时，回退到云端识别全部语音再匹配唤醒词
+        logger.info("未加载本地唤醒词模板，使用云端识别检测唤醒词")
         start_time = time.time()
         
         while time.time() - start_time < timeout:
@@ -233,6 +233,84 @@ class SpeechRecognizer:
         logger.info("唤醒词监听超时")
         return None
     
+    def _listen_for_wake_up_local(self, timeout):
+        """使用本地关键词检测监听唤醒词，命中后才调用云端识别"""
+        start_time = time.time()
+        window_seconds = SpeechRecognitionConfig.WAKE_WORD_WINDOW_SECONDS
+        
+        while time.time() - start_time < timeout:
+            try:
+                with self.microphone as source:
+                    self.recognizer.energy_threshold = self.energy_threshold
+                    self.recognizer.dynamic_energy_threshold = self.dynamic_energy_threshold
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=max(0.1, timeout - (time.time() - start_time)),
+                        phrase_time_limit=window_seconds
+                    )
+            except sr.WaitTimeoutError:
+                break
+            except Exception as e:
+                logger.error(f"唤醒词音频采集失败: {e}")
+                time.sleep(0.5)
+                continue
+            
+            # 麦克风已按配置采样率打开，直接取16位PCM
+            pcm = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+            wake_end = self.wake_word_detector.find(pcm)
+            if wake_end is not None:
+                logger.info("本地唤醒词检测成功，开始识别命令")
+                # 先识别同一句话中唤醒词之后的部分（如"小爱同学，明天天气"），没有时再重新监听
+                command = self._recognize_after_wake_word(pcm[wake_end * 2:])
+                if command is None:
+                    command = self.recognize()
+                return command or ""
+        
+        logger.info("唤醒词监听超时")
+        return None
+    
+    def _has_speech(self, pcm, seconds):
+        """PCM中是否有至少 seconds 秒能量超过阈值的语音"""
+        frame = self.sample_rate // 100  # 10ms
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % (frame * 2)], dtype=np.int16)
+        if samples.size == 0:
+            return False
+        rms = np.sqrt(np.mean(samples.astype(np.float32).reshape(-1, frame) ** 2, axis=1))
+        return np.count_nonzero(rms >= self.energy_threshold) * 0.01 >= seconds
+    
+    def _recognize_after_wake_word(self, remainder):
+        """识别唤醒词之后紧接着说的命令
+        Args:
+            remainder: 本地检测音频中唤醒词之后的16位PCM
+        Returns:
+            命令文本，唤醒词之后没有语音或无法识别时返回 None
+        """
+        min_seconds = SpeechRecognitionConfig.WAKE_WORD_MIN_COMMAND_SECONDS
+        if not self._has_speech(remainder, min_seconds):
+            return None
+        
+        # 检测音频在说话途中被截断（结尾仍有语音）时，继续采集这句话的剩余部分
+        tail = remainder[-int(self.sample_rate * 0.3) * 2:]
+        if self._has_speech(tail, 0.1):
+            try:
+                with self.microphone as source:
+                    continuation = self.recognizer.listen(
+                        source, timeout=1, phrase_time_limit=self.phrase_time_limit
+                    )
+                remainder += continuation.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+            except sr.WaitTimeoutError:
+                pass
+            except Exception as e:
+                logger.error(f"采集命令剩余部分失败: {e}")
+        
+        text = self.recognize_audio(sr.AudioData(remainder, self.sample_rate, 2))
+        if not text:
+            return None
+        # 云端也可能听到唤醒词的末尾，去掉后只保留命令
+        _, command = self.check_wake_up_word(text)
+        logger.info(f"唤醒词之后的命令: {command}")
+        return command or None
+    
     def calibrate_microphone(self, duration=2):
         """校准麦克风，适应环境噪音"""
         logger.info(f"正在校准麦克风，持续{duration}秒...")
@@ -247,31 +325,62 @@ class SpeechRecognizer:
             logger.error(f"麦克风校准失败: {e}")
             return False
     
-    def start_continuous_listening(self):
-        """开始持续监听模式"""
+    def start_continuous_listening(self, callback=None):
+        """开始持续监听模式
+        Args:
+            callback: 可选的识别结果回调 callback(text)，在识别线程中调用
+        """
         logger.info("开始持续监听模式...")
         
+        if callback:
+            self.continuous_listener.subscribe(callback)
         self.is_listening = True
-        
-        def listen_thread():
-            while self.is_listening:
-                try:
-                    text = self.recognize()
-                    if text:
-                        logger.info(f"持续监听识别到: {text}")
-                        if self.on_speech_recognized:
-                            self.on_speech_recognized(text)
-                except Exception as e:
-                    logger.error(f"持续监听错误: {e}")
-                    time.sleep(1)
-        
-        threading.Thread(target=listen_thread).daemon=True
-        threading.Thread(target=listen_thread).start()
+        self.continuous_listener.start()
     
     def stop_continuous_listening(self):
-        """停止持续监听模式"""
+        """停止持续监听模式（不阻塞，需要等待线程退出时调用 join_continuous_listening）"""
         logger.info("停止持续监听模式")
         self.is_listening = False
+        self.continuous_listener.stop()
+    
+    def join_continuous_listening(self, timeout=None):
+        """等待持续监听的线程退出
+        Args:
+            timeout: 最长等待时间（秒），0 表示只检查不等待
+        Returns:
+            线程是否已全部退出
+        """
+        return self.continuous_listener.join(timeout)
+    
+    def subscribe(self, callback):
+        """订阅持续监听的识别结果"""
+        self.continuous_listener.subscribe(callback)
+    
+    def unsubscribe(self, callback):
+        """取消订阅持续监听的识别结果"""
+        self.continuous_listener.unsubscribe(callback)
+    
+    def _capture_segments(self, stop_event):
+        """持续采集语音片段（在采集线程中运行，麦克风保持打开）"""
+        with self.microphone as source:
+            self.recognizer.energy_threshold = self.energy_threshold
+            self.recognizer.dynamic_energy_threshold = self.dynamic_energy_threshold
+            self.recognizer.pause_threshold = self.pause_threshold
+            
+            while not stop_event.is_set():
+                try:
+                    # 短超时以便及时响应停止请求
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=1,
+                        phrase_time_limit=self.phrase_time_limit
+                    )
+                except sr.WaitTimeoutError:
+                    continue
+                
+                if self.on_voice_detected:
+                    threading.Thread(target=self.on_voice_detected, args=(audio,), daemon=True).start()
+                yield audio
     
     def set_energy_threshold(self, threshold):
         """设置语音检测能量阈值"""
@@ -287,10 +396,15 @@ class SpeechRecognizer:
             self.wake_word_sensitivity = sensitivity
             # 根据灵敏度调整能量阈值
             self.energy_threshold = int(300 * (1 - sensitivity) + 50)
+            self.wake_word_detector.set_sensitivity(sensitivity, SpeechRecognitionConfig.WAKE_WORD_DTW_THRESHOLD)
             logger.info(f"唤醒词灵敏度已设置为: {sensitivity}, 能量阈值: {self.energy_threshold}")
         else:
             logger.warning("灵敏度必须在0.0-1.0之间")
     
+    def get_engine_stats(self):
+        """获取各识别引擎的延迟和错误统计"""
+        return self.orchestrator.get_stats()
+    
     def get_available_devices(self):
         """获取可用的音频输入设备列表"""
         devices = []
@@ -318,6 +432,7 @@ class SpeechRecognizer:
         valid_engines = ["google", "baidu"]
         if engine in valid_engines:
             self.engine = engine
+            self.orchestrator.set_preferred_engine(engine)
             logger.info(f"语音识别引擎已设置为: {engine}")
             return True
         else:
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地唤醒词检测模块
+基于MFCC特征和DTW模板匹配，在本地完成唤醒词检测，
+只有检测到唤醒词后才调用云端语音识别
+"""
+
+import os
+import sys
+import wave
+import logging
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+class MFCCExtractor:
+    """MFCC特征提取器（纯NumPy实现）"""
+
+    def __init__(self, sample_rate=16000, frame_ms=25, hop_ms=10, num_filters=26, num_ceps=13, pre_emphasis=0.97):
+        """初始化特征提取器
+        Args:
+            sample_rate: 采样率
+            frame_ms: 帧长（毫秒）
+            hop_ms: 帧移（毫秒）
+            num_filters: 梅尔滤波器数量
+            num_ceps: 保留的倒谱系数数量
+            pre_emphasis: 预加重系数
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.hop_length = int(sample_rate * hop_ms / 1000)
+        self.num_ceps = num_ceps
+        self.pre_emphasis = pre_emphasis
+
+        # FFT长度取不小于帧长的2的幂
+        self.n_fft = 1
+        while self.n_fft < self.frame_length:
+            self.n_fft *= 2
+
+        # 预先计算窗函数、梅尔滤波器组和DCT矩阵，避免每次调用重复计算
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.filterbank = self._build_filterbank(num_filters)
+        self.dct_matrix = self._build_dct_matrix(num_filters, num_ceps)
+
+    def _build_filterbank(self, num_filters):
+        """构建梅尔三角滤波器组"""
+        low_mel = _hz_to_mel(0.0)
+        high_mel = _hz_to_mel(self.sample_rate / 2.0)
+        mel_points = np.linspace(low_mel, high_mel, num_filters + 2)
+        bins = np.floor((self.n_fft + 1) * _mel_to_hz(mel_points) / self.sample_rate).astype(int)
+
+        filterbank = np.zeros((num_filters, self.n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, num_filters + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            for k in range(left, center):
+                filterbank[m - 1, k] = (k - left) / max(center - left, 1)
+            for k in range(center, right):
+                filterbank[m - 1, k] = (right - k) / max(right - center, 1)
+        return filterbank
+
+    def _build_dct_matrix(self, num_filters, num_ceps):
+        """构建DCT-II变换矩阵"""
+        n = np.arange(num_filters)
+        k = np.arange(num_ceps)[:, None]
+        dct = np.cos(np.pi / num_filters * (n + 0.5) * k)
+        dct *= np.sqrt(2.0 / num_filters)
+        dct[0] *= np.sqrt(0.5)
+        return dct.astype(np.float32)
+
+    def extract(self, samples):
+        """提取MFCC特征
+        Args:
+            samples: 一维音频采样（int16或float）
+        Returns:
+            形状为 (帧数, num_ceps) 的特征矩阵
+        """
+        signal = np.asarray(samples, dtype=np.float32)
+        if signal.size < self.frame_length:
+            return np.zeros((0, self.num_ceps), dtype=np.float32)
+
+        # 预加重
+        signal = np.append(signal[0], signal[1:] - self.pre_emphasis * signal[:-1])
+
+        # 分帧（使用stride视图，不复制数据）
+        num_frames = 1 + (signal.size - self.frame_length) // self.hop_length
+        frames = np.lib.stride_tricks.as_strided(
+            signal,
+            shape=(num_frames, self.frame_length),
+            strides=(signal.strides[0] * self.hop_length, signal.strides[0])
+        ) * self.window
+
+        # 功率谱 -> 梅尔能量 -> 对数 -> DCT
+        power = (np.abs(np.fft.rfft(frames, n=self.n_fft)) ** 2) / self.n_fft
+        mel_energy = np.maximum(power @ self.filterbank.T, 1e-10)
+        mfcc = np.log(mel_energy) @ self.dct_matrix.T
+
+        # 倒谱均值归一化，降低信道和音量差异的影响
+        mfcc -= mfcc.mean(axis=0, keepdims=True)
+        return mfcc.astype(np.float32)
+
+
+def _normalize(features):
+    """按帧归一化为单位向量（之后的点积即余弦相似度）"""
+    return features / (np.linalg.norm(features, axis=1, keepdims=True) + 1e-8)
+
+
+def _band_radius(n, m, band):
+    """Sakoe-Chiba 带宽（以帧为单位），band 为模板长度的比例，None 表示不限制
+    带宽至少为每行对角线的斜率，保证相邻行的可行区域相连、终点可达
+    """
+    if band is None:
+        return max(n, m)
+    return max(1, int(np.ceil(band * max(n, m))), int(np.ceil(m / n)))
+
+
+def _dtw_batch(cost, band=None):
+    """对一批代价矩阵同时计算DTW距离（按路径长度归一化）
+    Args:
+        cost: 形状为 (批大小, n, m) 的局部代价
+        band: Sakoe-Chiba 带宽比例，None 表示不限制
+    Returns:
+        形状为 (批大小,) 的距离
+    逐行递推，行内的转移 acc[i, j] = min(diag_up[j], acc[i, j-1] + cost[i, j]) 是
+    前缀最小值：acc[i, j] = S[j] + min_{k<=j}(diag_up[k] - S[k])，S 为行内代价的前缀和，
+    因此每一行只需一次 np.minimum.accumulate，没有Python层的列循环；整批窗口一起递推
+    """
+    batch, n, m = cost.shape
+    radius = _band_radius(n, m, band)
+    acc = np.full((batch, m + 1), np.inf, dtype=np.float64)
+    acc[:, 0] = 0.0
+    for i in range(1, n + 1):
+        # 只计算对角线附近的列 [lo, hi]（列号从1开始）
+        center = i * m / n
+        lo = max(1, int(np.ceil(center - radius)))
+        hi = min(m, int(np.floor(center + radius)))
+        row_cost = cost[:, i - 1, lo - 1:hi].astype(np.float64)
+        diag_up = np.minimum(acc[:, lo - 1:hi], acc[:, lo:hi + 1]) + row_cost
+        prefix = np.cumsum(row_cost, axis=1)
+        current = np.full((batch, m + 1), np.inf, dtype=np.float64)
+        current[:, lo:hi + 1] = np.minimum.accumulate(diag_up - prefix, axis=1) + prefix
+        acc = current
+    return acc[:, m] / (n + m)
+
+
+def dtw_distance(query, template, band=None):
+    """计算两个特征序列的DTW距离（按路径长度归一化）
+    局部代价使用余弦距离，取值范围与音量无关
+    Args:
+        band: Sakoe-Chiba 带宽（模板长度的比例），None 表示不限制
+    """
+    if len(query) == 0 or len(template) == 0:
+        return float("inf")
+    cost = 1.0 - _normalize(query) @ _normalize(template).T
+    return float(_dtw_batch(cost[None], band)[0])
+
+
+class WakeWordDetector:
+    """基于模板匹配的本地唤醒词检测器"""
+
+    def __init__(self, sample_rate=16000, threshold=0.35, energy_threshold=300, window_step_ms=100, band=0.2):
+        """初始化唤醒词检测器
+        Args:
+            sample_rate: 采样率
+            threshold: DTW距离阈值，越小越严格
+            energy_threshold: 能量门限（RMS），低于此值的音频直接跳过
+            window_step_ms: 滑动窗口步长（毫秒）
+            band: DTW的 Sakoe-Chiba 带宽（模板长度的比例），None 表示不限制
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.energy_threshold = energy_threshold
+        self.band = band
+        self.extractor = MFCCExtractor(sample_rate=sample_rate)
+        self.window_step = max(1, int(window_step_ms / 10))  # 以帧为单位（帧移10ms）
+
+        # 模板列表: [(名称, 按帧归一化的特征矩阵)]
+        self.templates = []
+
+    def has_templates(self):
+        """是否已加载唤醒词模板"""
+        return bool(self.templates)
+
+    def add_template(self, samples, name="template"):
+        """添加唤醒词模板
+        Args:
+            samples: int16音频采样（一维数组）或PCM字节
+            name: 模板名称
+        """
+        if isinstance(samples, (bytes, bytearray)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        features = self.extractor.extract(self._trim_silence(np.asarray(samples)))
+        if len(features) == 0:
+            logger.warning(f"唤醒词模板过短，已忽略: {name}")
+            return False
+        self.templates.append((name, _normalize(features)))
+        return True
+
+    def load_templates(self, template_dir):
+        """从目录加载WAV格式的唤醒词模板"""
+        if not template_dir or not os.path.isdir(template_dir):
+            logger.info(f"唤醒词模板目录不存在: {template_dir}")
+            return 0
+
+        count = 0
+        for file_name in sorted(os.listdir(template_dir)):
+            if not file_name.lower().endswith(".wav"):
+                continue
+            try:
+                samples = read_wav(os.path.join(template_dir, file_name), self.sample_rate)
+                if self.add_template(samples, name=file_name):
+                    count += 1
+            except Exception as e:
+                logger.error(f"加载唤醒词模板失败 {file_name}: {e}")
+
+        logger.info(f"已加载{count}个唤醒词模板")
+        return count
+
+    def _trim_silence(self, samples, frame=160):
+        """去除首尾静音段"""
+        if samples.size < frame:
+            return samples
+        usable = samples[:samples.size - samples.size % frame].astype(np.float32)
+        rms = np.sqrt(np.mean(usable.reshape(-1, frame) ** 2, axis=1))
+        voiced = np.nonzero(rms >= self.energy_threshold * 0.5)[0]
+        if voiced.size == 0:
+            return samples
+        return samples[voiced[0] * frame:(voiced[-1] + 1) * frame]
+
+    def match(self, samples):
+        """在音频中查找与模板最匹配的片段
+        Args:
+            samples: int16音频采样或PCM字节
+        Returns:
+            (最小DTW距离, 匹配片段结束位置的采样序号)，没有可比较内容时返回 (inf, None)
+        """
+        if isinstance(samples, (bytes, bytearray)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        samples = np.asarray(samples)
+        if samples.size == 0 or not self.templates:
+            return float("inf"), None
+
+        # 能量门限：安静时不做任何计算
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+        if rms < self.energy_threshold:
+            return float("inf"), None
+
+        features = self.extractor.extract(samples)
+        if len(features) == 0:
+            return float("inf"), None
+        features = _normalize(features)
+
+        best, best_end = float("inf"), None
+        for _, template in self.templates:
+            window = len(template)
+            # 整段输入与模板的代价矩阵只算一次，各滑动窗口取其中的行
+            cost = 1.0 - features @ template.T
+            if len(features) <= window:
+                starts = np.array([0])
+                windows = cost[None]
+            else:
+                # 以模板长度为窗口在输入特征上滑动，所有窗口一起计算
+                starts = np.arange(0, len(features) - window + 1, self.window_step)
+                windows = np.lib.stride_tricks.sliding_window_view(cost, window, axis=0)[starts]
+                windows = windows.transpose(0, 2, 1)
+            distances = _dtw_batch(windows, self.band)
+            index = int(np.argmin(distances))
+            if distances[index] < best:
+                best = float(distances[index])
+                last_frame = starts[index] + windows.shape[1] - 1
+                best_end = min(samples.size, int(last_frame * self.extractor.hop_length + self.extractor.frame_length))
+        return best, best_end
+
+    def score(self, samples):
+        """计算音频与模板的最佳匹配距离
+        Args:
+            samples: int16音频采样或PCM字节
+        Returns:
+            最小DTW距离（越小越相似），没有可比较内容时返回inf
+        """
+        return self.match(samples)[0]
+
+    def detect(self, samples):
+        """检测音频中是否包含唤醒词"""
+        return self.find(samples) is not None
+
+    def find(self, samples):
+        """检测唤醒词并返回其结束位置
+        Returns:
+            唤醒词结束位置的采样序号（之后的音频可能是紧接着说的命令），未检测到时返回 None
+        """
+        distance, end = self.match(samples)
+        if distance > self.threshold:
+            return None
+        logger.info(f"本地唤醒词检测命中，距离: {distance:.3f}")
+        return end
+
+    def set_sensitivity(self, sensitivity, base_threshold=0.35):
+        """根据灵敏度(0.0-1.0)调整检测阈值"""
+        self.threshold = base_threshold * (0.5 + sensitivity)
+
+
+def read_wav(file_path, sample_rate=16000):
+    """读取单声道16位WAV文件，返回int16采样数组"""
+    with wave.open(file_path, "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError("仅支持16位WAV文件")
+        frames = wav_file.readframes(wav_file.getnframes())
+        samples = np.frombuffer(frames, dtype=np.int16)
+        channels = wav_file.getnchannels()
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        if wav_file.getframerate() != sample_rate:
+            # 线性插值重采样
+            duration = samples.size / wav_file.getframerate()
+            target = np.linspace(0, samples.size - 1, int(duration * sample_rate))
+            samples = np.interp(target, np.arange(samples.size), samples).astype(np.int16)
+    return samples
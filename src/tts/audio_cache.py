@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成语音缓存模块
+以 (文本, 引擎, 语速, 音量, 语调, 发音人) 的哈希为键缓存合成结果，
+内存中按LRU淘汰；预热的固定文本（提示语、问候语等）同时持久化到磁盘，重启后仍可命中。
+天气、搜索结果等动态文本只进入内存缓存，否则磁盘目录会随对话轮数无限增长
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """内容寻址的合成语音缓存"""
+
+    FILE_SUFFIX = ".audio"
+
+    def __init__(self, cache_dir=None, max_memory_bytes=16 * 1024 * 1024):
+        """初始化缓存
+        Args:
+            cache_dir: 磁盘缓存目录，为None时只使用内存缓存
+            max_memory_bytes: 内存缓存的最大字节数
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                logger.error(f"创建语音缓存目录失败: {e}")
+                self.cache_dir = None
+
+    @staticmethod
+    def make_key(text, engine, rate, volume, pitch, voice_gender):
+        """根据文本和语音参数生成缓存键"""
+        raw = "\x1f".join([text, str(engine), str(rate), str(volume), str(pitch), str(voice_gender)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        # 按前两位分目录，避免单个目录文件过多
+        return os.path.join(self.cache_dir, key[:2], key + self.FILE_SUFFIX)
+
+    def get(self, key):
+        """读取缓存，未命中时返回None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store_memory(key, data)
+        return data
+
+    def put(self, key, data, persistent=False):
+        """写入缓存
+        Args:
+            persistent: 是否同时写入磁盘（只用于固定文本，磁盘缓存没有容量上限）
+        """
+        if not data:
+            return
+        with self._lock:
+            self._store_memory(key, data)
+        if persistent:
+            self._write_disk(key, data)
+
+    def contains(self, key, persistent=False):
+        """检查缓存中是否存在（不影响LRU顺序）
+        Args:
+            persistent: 为True时只检查磁盘缓存
+        """
+        if not persistent:
+            with self._lock:
+                if key in self._entries:
+                    return True
+        return bool(self.cache_dir) and os.path.exists(self._path(key))
+
+    def _store_memory(self, key, data):
+        """放入内存LRU（调用方持有锁）"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(data) > self.max_memory_bytes:
+            return
+        self._entries[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"读取语音缓存失败: {e}")
+            return None
+
+    def _write_disk(self, key, data):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再替换，避免并发读取到不完整的数据
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"写入语音缓存失败: {e}")
+
+    def clear_memory(self):
+        """清空内存缓存（磁盘缓存保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self):
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频输出模块
+直接从内存播放合成的音频：先解码为PCM，再写入常驻的输出流，
+不再经过临时文件，也不必每次播放都重新打开音频设备。
+另提供空输出和WAV文件输出，便于在没有声卡的环境中运行
+"""
+
+import io
+import os
+import abc
+import array
+import sys
+import wave
+import logging
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class PCMAudio:
+    """解码后的PCM音频"""
+
+    __slots__ = ("frames", "sample_rate", "channels", "sample_width")
+
+    def __init__(self, frames, sample_rate, channels=1, sample_width=2):
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+    @property
+    def format_key(self):
+        return (self.sample_rate, self.channels, self.sample_width)
+
+    @property
+    def duration(self):
+        """时长（秒）"""
+        frame_size = self.channels * self.sample_width
+        return len(self.frames) / float(frame_size * self.sample_rate) if frame_size and self.sample_rate else 0.0
+
+
+def guess_audio_format(audio_data):
+    """根据文件头判断音频格式"""
+    if audio_data[:4] == b"RIFF":
+        return "wav"
+    if audio_data[:4] == b"FORM":
+        return "aiff"
+    return "mp3"
+
+
+def _byteswap(frames, sample_width):
+    """交换每个采样的字节序"""
+    typecode = {2: "h", 4: "i"}.get(sample_width)
+    if typecode is None:
+        swapped = bytearray(len(frames))
+        for i in range(0, len(frames), sample_width):
+            swapped[i:i + sample_width] = frames[i:i + sample_width][::-1]
+        return bytes(swapped)
+    samples = array.array(typecode)
+    samples.frombytes(frames)
+    samples.byteswap()
+    return samples.tobytes()
+
+
+def decode_audio(audio_data):
+    """把内存中的音频数据解码为PCM
+    Args:
+        audio_data: WAV、AIFF或MP3格式的字节数据
+    Returns:
+        PCMAudio 对象
+    """
+    if isinstance(audio_data, PCMAudio):
+        return audio_data
+
+    audio_format = guess_audio_format(audio_data)
+    if audio_format == "wav":
+        with wave.open(io.BytesIO(audio_data), "rb") as wav_file:
+            return PCMAudio(
+                wav_file.readframes(wav_file.getnframes()),
+                wav_file.getframerate(),
+                wav_file.getnchannels(),
+                wav_file.getsampwidth()
+            )
+
+    if audio_format == "aiff":
+        try:
+            import aifc
+        except ImportError:
+            aifc = None
+        if aifc:
+            with aifc.open(io.BytesIO(audio_data), "rb") as aiff_file:
+                frames = aiff_file.readframes(aiff_file.getnframes())
+                sample_width = aiff_file.getsampwidth()
+                # AIFF为大端字节序，转换为PCM输出需要的小端字节序
+                if sample_width > 1:
+                    frames = _byteswap(frames, sample_width)
+                return PCMAudio(frames, aiff_file.getframerate(), aiff_file.getnchannels(), sample_width)
+
+    # MP3等压缩格式需要pydub（依赖ffmpeg）解码
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        raise ImportError(f"解码{audio_format}音频需要pydub库: pip install pydub")
+    segment = AudioSegment.from_file(io.BytesIO(audio_data), format=audio_format)
+    return PCMAudio(segment.raw_data, segment.frame_rate, segment.channels, segment.sample_width)
+
+
+def encode_wav(pcm):
+    """把PCM音频编码为WAV字节数据"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(pcm.channels)
+        wav_file.setsampwidth(pcm.sample_width)
+        wav_file.setframerate(pcm.sample_rate)
+        wav_file.writeframes(pcm.frames)
+    return buffer.getvalue()
+
+
+def convert_audio(audio_data, audio_format):
+    """把音频数据转换为指定格式，格式相同时原样返回
+    Args:
+        audio_data: WAV、AIFF或MP3格式的字节数据
+        audio_format: "wav" 或 "mp3"
+    Returns:
+        转换后的字节数据
+    """
+    if guess_audio_format(audio_data) == audio_format:
+        return audio_data
+    pcm = decode_audio(audio_data)
+    if audio_format == "wav":
+        return encode_wav(pcm)
+
+    # MP3编码需要pydub（依赖ffmpeg）
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        raise ImportError(f"编码{audio_format}音频需要pydub库: pip install pydub")
+    segment = AudioSegment(data=pcm.frames, sample_width=pcm.sample_width,
+                           frame_rate=pcm.sample_rate, channels=pcm.channels)
+    buffer = io.BytesIO()
+    segment.export(buffer, format=audio_format)
+    return buffer.getvalue()
+
+
+class AudioOutput(abc.ABC):
+    """音频输出基类，子类实现 _play_pcm"""
+
+    # 每次写入的时长（秒），决定打断播放的响应速度
+    CHUNK_SECONDS = 0.05
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def play(self, audio_data, stop_event=None):
+        """阻塞播放音频，直到播放完成或被停止
+        Args:
+            audio_data: 编码后的音频字节数据或 PCMAudio 对象
+            stop_event: 可选的外部停止标志
+        Returns:
+            是否完整播放
+        """
+        pcm = decode_audio(audio_data)
+        with self._lock:
+            # 拿到锁后再清除停止标志：排队等待的播放不能抹掉针对当前片段的 stop()
+            self._stop_event.clear()
+            return self._play_pcm(pcm, stop_event)
+
+    def stop(self):
+        """停止当前播放（可从其他线程调用）"""
+        self._stop_event.set()
+
+    def close(self):
+        """释放音频设备"""
+        self.stop()
+
+    def _should_stop(self, stop_event):
+        return self._stop_event.is_set() or (stop_event is not None and stop_event.is_set())
+
+    def _chunks(self, pcm):
+        """按固定时长切分PCM数据"""
+        frame_size = pcm.channels * pcm.sample_width
+        chunk_bytes = max(frame_size, int(pcm.sample_rate * self.CHUNK_SECONDS) * frame_size)
+        view = memoryview(pcm.frames)
+        for offset in range(0, len(view), chunk_bytes):
+            yield view[offset:offset + chunk_bytes]
+
+    @abc.abstractmethod
+    def _play_pcm(self, pcm, stop_event):
+        """播放PCM音频（调用时已持有播放锁）
+        Returns:
+            是否完整播放
+        """
+
+
+class PyAudioOutput(AudioOutput):
+    """基于PyAudio的常驻输出流，格式不变时复用同一个流"""
+
+    def __init__(self):
+        super().__init__()
+        import pyaudio
+        self._pyaudio_module = pyaudio
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = None
+        self._stream_format = None
+
+    def _get_stream(self, pcm):
+        if self._stream is not None and self._stream_format == pcm.format_key:
+            return self._stream
+
+        self._close_stream()
+        self._stream = self._pyaudio.open(
+            format=self._pyaudio.get_format_from_width(pcm.sample_width),
+            channels=pcm.channels,
+            rate=pcm.sample_rate,
+            output=True
+        )
+        self._stream_format = pcm.format_key
+        logger.info(f"已打开音频输出流: {pcm.sample_rate}Hz, {pcm.channels}声道, {pcm.sample_width * 8}位")
+        return self._stream
+
+    def _play_pcm(self, pcm, stop_event):
+        stream = self._get_stream(pcm)
+        for chunk in self._chunks(pcm):
+            if self._should_stop(stop_event):
+                return False
+            stream.write(chunk.tobytes())
+        return True
+
+    def _close_stream(self):
+        if self._stream is None:
+            return
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        except Exception as e:
+            logger.error(f"关闭音频输出流失败: {e}")
+        self._stream = None
+        self._stream_format = None
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._close_stream()
+            if self._pyaudio is not None:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+
+class PygameOutput(AudioOutput):
+    """基于pygame的输出（没有PyAudio时使用）"""
+
+    def __init__(self):
+        super().__init__()
+        import pygame
+        self._pygame = pygame
+        self._mixer_format = None
+
+    def _play_pcm(self, pcm, stop_event):
+        pygame = self._pygame
+        # 只在格式变化时重新初始化混音器
+        if self._mixer_format != pcm.format_key or not pygame.mixer.get_init():
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            pygame.mixer.init(frequency=pcm.sample_rate, size=8 if pcm.sample_width == 1 else -8 * pcm.sample_width, channels=pcm.channels)
+            self._mixer_format = pcm.format_key
+
+        channel = pygame.mixer.Sound(buffer=pcm.frames).play()
+        while channel is not None and channel.get_busy():
+            if self._should_stop(stop_event):
+                channel.stop()
+                return False
+            pygame.time.wait(int(self.CHUNK_SECONDS * 1000))
+        return True
+
+    def stop(self):
+        super().stop()
+        if self._pygame.mixer.get_init():
+            self._pygame.mixer.stop()
+
+
+class NullOutput(AudioOutput):
+    """空输出：只解码不发声，用于无声卡环境和测试"""
+
+    def __init__(self):
+        super().__init__()
+        self.played_count = 0
+        self.played_seconds = 0.0
+
+    def _play_pcm(self, pcm, stop_event):
+        if self._should_stop(stop_event):
+            return False
+        self.played_count += 1
+        self.played_seconds += pcm.duration
+        return True
+
+
+class WavSinkOutput(AudioOutput):
+    """WAV文件输出：把所有播放的音频顺序写入同一个WAV文件，用于无声卡环境和测试"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._writer = None
+        self._writer_format = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _play_pcm(self, pcm, stop_event):
+        if self._writer is not None and self._writer_format != pcm.format_key:
+            # WAV文件只能有一种格式，格式变化时从头重新写入
+            logger.info("音频格式变化，重新创建WAV输出文件")
+            self._close_writer()
+        if self._writer is None:
+            self._writer = wave.open(self.path, "wb")
+            self._writer.setnchannels(pcm.channels)
+            self._writer.setsampwidth(pcm.sample_width)
+            self._writer.setframerate(pcm.sample_rate)
+            self._writer_format = pcm.format_key
+
+        for chunk in self._chunks(pcm):
+            if self._should_stop(stop_event):
+                return False
+            self._writer.writeframes(chunk)
+        return True
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writer_format = None
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._close_writer()
+
+
+def create_audio_output(backend="auto", sink_path=None):
+    """创建音频输出
+    Args:
+        backend: "auto"、"pyaudio"、"pygame"、"wav" 或 "null"
+        sink_path: WAV输出文件路径（backend为"wav"时使用）
+    Returns:
+        AudioOutput 对象
+    """
+    if backend == "null":
+        return NullOutput()
+    if backend == "wav":
+        return WavSinkOutput(sink_path or "data/tts_output.wav")
+
+    candidates = [backend] if backend in ("pyaudio", "pygame") else ["pyaudio", "pygame"]
+    for name in candidates:
+        try:
+            output = PyAudioOutput() if name == "pyaudio" else PygameOutput()
+            logger.info(f"使用{name}音频输出")
+            return output
+        except Exception as e:
+            logger.warning(f"{name}音频输出不可用: {e}")
+
+    logger.warning("没有可用的音频输出设备，使用空输出")
+    return NullOutput()
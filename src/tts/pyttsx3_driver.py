@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pyttsx3驱动线程模块
+由一个常驻线程持有pyttsx3引擎并驱动其事件循环（startLoop(False)/iterate），
+其他线程的播报、保存和属性设置都通过命令队列交给该线程执行，
+避免每次播报重新启动事件循环，也避免多线程调用导致的 "run loop already started" 错误
+"""
+
+import os
+import sys
+import queue
+import logging
+import itertools
+import threading
+from concurrent.futures import Future
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceInfo:
+    """语音信息（从pyttsx3的Voice对象复制，可在任意线程读取）"""
+
+    __slots__ = ("id", "name", "languages", "gender")
+
+    def __init__(self, voice):
+        self.id = voice.id
+        self.name = voice.name or ""
+        self.languages = list(voice.languages or [])
+        self.gender = voice.gender
+
+
+class Pyttsx3Driver:
+    """pyttsx3常驻驱动线程"""
+
+    # 事件循环空闲和播报时的轮询间隔（秒）
+    IDLE_POLL_INTERVAL = 0.1
+    BUSY_POLL_INTERVAL = 0.01
+
+    def __init__(self, driver_name=None, init_timeout=10):
+        """初始化驱动
+        Args:
+            driver_name: pyttsx3驱动名称，None表示使用平台默认驱动
+            init_timeout: 等待引擎初始化的超时时间（秒）
+        """
+        self.driver_name = driver_name
+        self.init_timeout = init_timeout
+
+        self._commands = queue.Queue()
+        self._counter = itertools.count()
+        self._pending = {}  # 语句名称 -> Future
+        self._stop_requested = threading.Event()
+        self._ready = threading.Event()
+        self._init_error = None
+        self._thread = None
+        self._running = False
+
+        self._engine = None
+        self._voices = []
+        self._properties = {}  # 已设置的属性，重建引擎时恢复
+
+    def start(self):
+        """启动驱动线程，等待引擎初始化完成"""
+        if self._running:
+            return
+        self._running = True
+        self._ready.clear()
+        self._init_error = None
+        self._thread = threading.Thread(target=self._run, name="pyttsx3-driver", daemon=True)
+        self._thread.start()
+
+        if not self._ready.wait(self.init_timeout):
+            self._running = False
+            raise RuntimeError("pyttsx3引擎初始化超时")
+        if self._init_error is not None:
+            self._running = False
+            raise self._init_error
+        logger.info("pyttsx3驱动线程已启动")
+
+    def shutdown(self, timeout=5):
+        """停止驱动线程"""
+        if not self._running:
+            return
+        self._running = False
+        self._stop_requested.set()
+        self._commands.put(("shutdown",))
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        logger.info("pyttsx3驱动线程已停止")
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def say(self, text, timeout=None):
+        """播报文本，阻塞直到播报结束
+        Returns:
+            是否完整播报（被stop打断时为False）
+        """
+        return self._submit_utterance("say", text, None).result(timeout)
+
+    def save_to_file(self, text, file_path, timeout=None):
+        """把文本合成到音频文件，阻塞直到写入完成"""
+        return self._submit_utterance("save", text, file_path).result(timeout)
+
+    def set_property(self, name, value):
+        """设置引擎属性（在下一条语句前生效，不阻塞）"""
+        self._commands.put(("set", name, value))
+
+    def stop(self):
+        """打断当前播报并放弃尚未开始的语句（可从任意线程调用）"""
+        self._stop_requested.set()
+
+    def get_voices(self):
+        """获取缓存的语音列表"""
+        return list(self._voices)
+
+    def select_voice(self, gender=None, voice_index=0):
+        """根据性别或序号选择语音
+        Returns:
+            选中的 VoiceInfo，没有匹配时返回None
+        """
+        voice = None
+        if gender:
+            for candidate in self._voices:
+                if gender in candidate.name.lower():
+                    voice = candidate
+                    break
+        if voice is None and 0 <= voice_index < len(self._voices):
+            voice = self._voices[voice_index]
+        if voice is not None:
+            self.set_property("voice", voice.id)
+        return voice
+
+    def _submit_utterance(self, kind, text, file_path):
+        if not self._running:
+            raise RuntimeError("pyttsx3驱动线程未启动")
+        future = Future()
+        name = f"utt-{next(self._counter)}"
+        self._commands.put((kind, name, text, file_path, future))
+        return future
+
+    def _run(self):
+        """驱动线程主循环"""
+        try:
+            self._start_engine()
+        except Exception as e:
+            logger.error(f"pyttsx3引擎初始化失败: {e}")
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            if self._stop_requested.is_set():
+                self._handle_stop()
+
+            timeout = self.BUSY_POLL_INTERVAL if self._pending else self.IDLE_POLL_INTERVAL
+            try:
+                command = self._commands.get(timeout=timeout)
+            except queue.Empty:
+                command = None
+
+            if command is not None:
+                if command[0] == "shutdown":
+                    break
+                self._execute(command)
+
+            try:
+                self._engine.iterate()
+            except Exception as e:
+                logger.error(f"pyttsx3事件循环出错，重新初始化引擎: {e}")
+                if not self._restart_engine(e):
+                    break
+
+        self._fail_pending(RuntimeError("pyttsx3驱动线程已停止"))
+        self._stop_engine()
+
+    def _start_engine(self):
+        import pyttsx3
+        self._engine = pyttsx3.init(self.driver_name)
+        self._engine.connect("finished-utterance", self._on_finished)
+        self._voices = [VoiceInfo(voice) for voice in self._engine.getProperty("voices") or []]
+        self._engine.startLoop(False)
+
+    def _stop_engine(self):
+        if self._engine is None:
+            return
+        try:
+            self._engine.endLoop()
+        except Exception as e:
+            logger.error(f"结束pyttsx3事件循环失败: {e}")
+        self._engine = None
+
+    def _restart_engine(self, error):
+        """事件循环出错时只重建驱动线程内的引擎，并恢复已设置的属性"""
+        self._fail_pending(error)
+        self._stop_engine()
+        try:
+            self._start_engine()
+            for name, value in self._properties.items():
+                self._engine.setProperty(name, value)
+            return True
+        except Exception as e:
+            logger.error(f"重新初始化pyttsx3引擎失败: {e}")
+            self._running = False
+            return False
+
+    def _execute(self, command):
+        kind = command[0]
+        if kind == "set":
+            _, name, value = command
+            self._properties[name] = value
+            self._engine.setProperty(name, value)
+            return
+
+        _, name, text, file_path, future = command
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            if kind == "save":
+                self._engine.save_to_file(text, file_path, name)
+            else:
+                self._engine.say(text, name)
+            self._pending[name] = future
+        except Exception as e:
+            future.set_exception(e)
+
+    def _on_finished(self, name, completed):
+        future = self._pending.pop(name, None)
+        if future is not None and not future.done():
+            future.set_result(bool(completed))
+
+    def _handle_stop(self):
+        """执行打断：停止引擎并结束所有等待中的语句"""
+        self._stop_requested.clear()
+        if self._pending:
+            try:
+                self._engine.stop()
+            except Exception as e:
+                logger.error(f"停止pyttsx3播报失败: {e}")
+
+        # 尚未下发给引擎的语句直接放弃（属性设置照常执行）
+        skipped = []
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                break
+            if command[0] in ("say", "save"):
+                future = command[-1]
+                if future.set_running_or_notify_cancel():
+                    future.set_result(False)
+            else:
+                skipped.append(command)
+        for command in skipped:
+            if command[0] == "shutdown":
+                self._commands.put(command)
+            else:
+                self._execute(command)
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(False)
+        self._pending.clear()
+
+    def _fail_pending(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
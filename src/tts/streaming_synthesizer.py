@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式语音合成模块
+按中文标点和换行把文本切分成片段，有限并发地合成，
+按顺序播放已完成的片段，第一句合成完即可开始播放
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# 句末标点和换行：在其后切分
+_SENTENCE_END = re.compile(r"(?<=[。！？!?；;…\n])")
+# 句中停顿：片段过长时在其后再次切分
+_CLAUSE_BREAK = re.compile(r"(?<=[，,、：:])")
+
+
+def split_sentences(text, max_chars=50, min_chars=4):
+    """把文本切分为适合逐段合成的片段
+    Args:
+        text: 原始文本
+        max_chars: 片段最大长度，超过时在逗号等位置继续切分
+        min_chars: 片段最小长度，过短的片段并入下一个片段（第一个片段除外，越短首句越快）
+    Returns:
+        片段列表
+    """
+    if not text:
+        return []
+
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+
+        # 长句按逗号切分，仍然过长则按长度硬切
+        buffer = ""
+        for clause in _CLAUSE_BREAK.split(sentence):
+            if buffer and len(buffer) + len(clause) > max_chars:
+                pieces.append(buffer)
+                buffer = ""
+            buffer += clause
+            while len(buffer) > max_chars:
+                pieces.append(buffer[:max_chars])
+                buffer = buffer[max_chars:]
+        if buffer:
+            pieces.append(buffer)
+
+    # 合并过短的片段，减少请求次数
+    segments = []
+    for piece in pieces:
+        if len(segments) > 1 and len(segments[-1]) < min_chars and len(segments[-1]) + len(piece) <= max_chars:
+            segments[-1] += piece
+        else:
+            segments.append(piece)
+    if len(segments) > 2 and len(segments[-1]) < min_chars and len(segments[-2]) + len(segments[-1]) <= max_chars:
+        segments[-2] += segments.pop()
+    return segments
+
+
+class StreamingSynthesisError(Exception):
+    """流式播报中途失败，记录已经播放的片段，调用方只需补播剩余部分"""
+
+    def __init__(self, played, remaining, cause):
+        """初始化异常
+        Args:
+            played: 已经完整播放的片段数量
+            remaining: 尚未播放的片段列表（包括失败的片段）
+            cause: 原始异常
+        """
+        super().__init__(f"第{played + 1}段语音合成或播放失败: {cause}")
+        self.played = played
+        self.remaining = remaining
+        self.cause = cause
+
+    @property
+    def remaining_text(self):
+        """尚未播放的文本"""
+        return " ".join(self.remaining)
+
+
+class StreamingSynthesizer:
+    """流式合成播放器"""
+
+    def __init__(self, synthesize_fn, play_fn, max_parallel=3, max_chars=50):
+        """初始化流式合成器
+        Args:
+            synthesize_fn: 合成函数 synthesize_fn(text)，返回内存中的音频数据
+            play_fn: 播放函数 play_fn(audio)，阻塞直到播放完成
+            max_parallel: 同时进行的合成请求数量上限
+            max_chars: 单个片段的最大长度
+        """
+        self.synthesize_fn = synthesize_fn
+        self.play_fn = play_fn
+        self.max_parallel = max(1, max_parallel)
+        self.max_chars = max_chars
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="tts-synth")
+
+        # 最近一次播报的首段出声时间（秒），用于性能观测
+        self.last_time_to_first_audio = None
+
+    def speak(self, text, should_stop=None):
+        """合成并按顺序播放文本
+        Args:
+            text: 播报文本
+            should_stop: 可选的回调，返回True时停止后续播放
+        Returns:
+            实际播放的片段数量
+        Raises:
+            StreamingSynthesisError: 某一段合成或播放失败，异常中带有已播放的片段数量和剩余片段
+        """
+        segments = split_sentences(text, max_chars=self.max_chars)
+        if not segments:
+            return 0
+
+        start = time.time()
+        futures = []
+        played = 0
+
+        def submit_until(index):
+            # 滑动窗口：最多提前合成 max_parallel 个片段
+            while len(futures) < len(segments) and len(futures) <= index:
+                futures.append(self._executor.submit(self.synthesize_fn, segments[len(futures)]))
+
+        try:
+            for i in range(len(segments)):
+                submit_until(i + self.max_parallel - 1)
+                audio = futures[i].result()
+                if should_stop and should_stop():
+                    break
+
+                if i == 0:
+                    self.last_time_to_first_audio = time.time() - start
+                    logger.info(f"首段语音就绪，耗时: {self.last_time_to_first_audio:.3f}秒，共{len(segments)}段")
+
+                self.play_fn(audio)
+                played += 1
+                if should_stop and should_stop():
+                    break
+        except Exception as e:
+            raise StreamingSynthesisError(played, segments[played:], e) from e
+        finally:
+            # 取消尚未开始的合成请求
+            for future in futures[played:]:
+                future.cancel()
+
+        return played
+
+    def shutdown(self):
+        """关闭合成线程池"""
+        self._executor.shutdown(wait=False)
@@ -7,15 +7,25 @@
 import os
 import sys
 import logging
-import pyttsx3
+import threading
 import tempfile
 from config.config import TTSConfig
+from src.tts.pyttsx3_driver import Pyttsx3Driver
+from src.tts.streaming_synthesizer import StreamingSynthesizer, StreamingSynthesisError, split_sentences
+from src.tts.audio_cache import AudioCache
+from src.tts.audio_output import create_audio_output, convert_audio
+from src.monitoring.tracing import traced
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 logger = logging.getLogger(__name__)
 
+# save_to_file 支持的文件扩展名 -> 音频格式
+SAVE_FORMATS = {".wav": "wav", ".mp3": "mp3"}
+# 百度语音合成的音频格式参数（aue）
+BAIDU_AUDIO_FORMATS = {"mp3": 3, "wav": 6}
+
 class TTSEngine:
     """语音合成引擎类"""
     
@@ -33,8 +43,30 @@ class TTSEngine:
         self.pitch = 5  # 语调 0-9
         self.voice_gender = "female"  # 语音性别
         
-        # 初始化引擎
-        self.tts_engine = None
+        # 停止标志，由 stop() 设置，用于中断流式播报
+        self._stop_event = threading.Event()
+        
+        # 合成语音缓存：固定文本只需合成一次
+        self.audio_cache = None
+        if TTSConfig.AUDIO_CACHE_ENABLED:
+            self.audio_cache = AudioCache(
+                cache_dir=TTSConfig.AUDIO_CACHE_DIR,
+                max_memory_bytes=TTSConfig.AUDIO_CACHE_MEMORY_MB * 1024 * 1024
+            )
+        
+        # 音频输出：从内存解码后写入常驻输出流
+        self.audio_output = create_audio_output(TTSConfig.AUDIO_BACKEND, TTSConfig.AUDIO_SINK_PATH)
+        
+        # 流式合成：逐句合成并按顺序播放，缩短首句出声时间
+        self.streaming_synthesizer = StreamingSynthesizer(
+            synthesize_fn=self._synthesize_baidu_cached,
+            play_fn=self._play_audio_bytes,
+            max_parallel=TTSConfig.STREAMING_MAX_PARALLEL,
+            max_chars=TTSConfig.STREAMING_MAX_SEGMENT_CHARS
+        )
+        
+        # 初始化引擎（pyttsx3由常驻驱动线程持有）
+        self.pyttsx3_driver = None
         self._initialize_engine()
     
     def _initialize_engine(self):
@@ -45,46 +77,36 @@ class TTSEngine:
                 self._initialize_baidu_engine()
             else:  # 默认使用pyttsx3
                 # 初始化pyttsx3引擎
-                self.tts_engine = pyttsx3.init()
-                self._configure_pyttsx3_engine()
+                self._get_pyttsx3_driver()
                 logger.info("pyttsx3语音合成引擎初始化成功")
         except Exception as e:
             logger.error(f"语音合成引擎初始化失败: {e}")
             # 回退到pyttsx3
             self.engine = "pyttsx3"
-            self.tts_engine = pyttsx3.init()
-            self._configure_pyttsx3_engine()
+            self._get_pyttsx3_driver()
             logger.info("已回退到pyttsx3语音合成引擎")
     
+    def _get_pyttsx3_driver(self):
+        """获取pyttsx3驱动线程，尚未启动时启动并配置"""
+        if self.pyttsx3_driver is None or not self.pyttsx3_driver.is_running:
+            self.pyttsx3_driver = Pyttsx3Driver()
+            self.pyttsx3_driver.start()
+            self._configure_pyttsx3_engine()
+        return self.pyttsx3_driver
+    
     def _configure_pyttsx3_engine(self):
         """配置pyttsx3引擎参数"""
         # 设置语速
-        self.tts_engine.setProperty('rate', self.rate)
+        self.pyttsx3_driver.set_property('rate', self.rate)
         
         # 设置音量
-        self.tts_engine.setProperty('volume', self.volume)
-        
-        # 设置语音（如果有多个语音可用）
-        voices = self.tts_engine.getProperty('voices')
-        voice_found = False
-        
-        # 优先根据性别选择语音
-        if self.voice_gender:
-            logger.info(f"尝试选择{self.voice_gender}性别的语音")
-            for i, voice in enumerate(voices):
-                if self.voice_gender in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
-                    logger.info(f"已设置语音: {voice.name}")
-                    voice_found = True
-                    break
+        self.pyttsx3_driver.set_property('volume', self.volume)
         
-        # 如果根据性别未找到，使用指定的voice_id
-        if not voice_found and len(voices) > self.voice_id:
-            self.tts_engine.setProperty('voice', voices[self.voice_id].id)
-            logger.info(f"已设置语音: {voices[self.voice_id].name}")
-            voice_found = True
-        
-        if not voice_found:
+        # 设置语音：优先根据性别选择，未找到时使用指定的voice_id（语音列表已缓存）
+        voice = self.pyttsx3_driver.select_voice(self.voice_gender, self.voice_id)
+        if voice:
+            logger.info(f"已设置语音: {voice.name}")
+        else:
             logger.warning("未找到匹配的语音，使用默认语音")
     
     def _initialize_baidu_engine(self):
@@ -112,162 +134,255 @@ class TTSEngine:
             logger.error(f"百度语音合成引擎初始化失败: {e}")
             raise
     
+    @traced("tts.speak")
     def speak(self, text):
         """将文本转换为语音并播放"""
         if not text:
             return
         
-        logger.info(f"正在合成语音: {text[:20]}...")
+        logger.info("正在合成语音: %s...", text[:20])
+        self._stop_event.clear()
         
         try:
             if self.engine == "baidu":
                 self._speak_baidu(text)
-            else:
+            elif not self._speak_cached(text):
                 self._speak_pyttsx3(text)
         except Exception as e:
             logger.error(f"语音合成失败: {e}")
-            # 回退到pyttsx3
-            if self.engine != "pyttsx3":
-                logger.info("回退到pyttsx3语音合成引擎")
+            # 回退到pyttsx3（已被打断时不再补播）
+            if self.engine != "pyttsx3" and not self._stop_event.is_set():
+                if isinstance(e, StreamingSynthesisError):
+                    # 只补播尚未播放的部分，已经播放的句子不重复
+                    text = e.remaining_text
+                    logger.info("回退到pyttsx3语音合成引擎，补播剩余%d段", len(e.remaining))
+                else:
+                    logger.info("回退到pyttsx3语音合成引擎")
                 self._speak_pyttsx3(text)
     
-    def _speak_pyttsx3(self, text):
-        """使用pyttsx3合成语音"""
+    def stop(self):
+        """停止当前正在进行的播报（可从其他线程调用）"""
+        self._stop_event.set()
         try:
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-            logger.info("pyttsx3语音合成完成")
+            # 停止内存音频播放（百度合成或缓存命中）
+            self.audio_output.stop()
+            if self.pyttsx3_driver:
+                self.pyttsx3_driver.stop()
         except Exception as e:
-            logger.error(f"pyttsx3语音合成失败: {e}")
-            # 尝试重新初始化引擎
-            logger.info("尝试重新初始化pyttsx3引擎")
-            self._initialize_engine()
-            # 再次尝试合成
+            logger.error(f"停止语音播报失败: {e}")
+    
+    def _cache_key(self, text, audio_format="wav"):
+        """根据当前语音参数生成缓存键"""
+        # 百度引擎的音频格式写入键中，WAV和MP3分别缓存
+        engine = f"baidu-{audio_format}" if self.engine == "baidu" else self.engine
+        return AudioCache.make_key(text, engine, self.rate, self.volume, self.pitch, self.voice_gender)
+    
+    def _speak_cached(self, text):
+        """命中缓存时直接播放缓存的音频，返回是否已播放"""
+        if not self.audio_cache:
+            return False
+        audio_data = self.audio_cache.get(self._cache_key(text))
+        if audio_data is None:
+            return False
+        try:
+            self._play_audio_bytes(audio_data)
+            logger.info("使用缓存语音播放完成")
+            return True
+        except Exception as e:
+            logger.error(f"播放缓存语音失败，改为实时合成: {e}")
+            return False
+    
+    def _speak_pyttsx3(self, text):
+        """使用pyttsx3合成语音（由驱动线程执行，出错时驱动线程会自行重建引擎）"""
+        if self._get_pyttsx3_driver().say(text):
+            logger.info("pyttsx3语音合成完成")
+        else:
+            logger.info("pyttsx3语音播报被打断")
+    
+    def _baidu_synthesis_options(self, audio_format="wav"):
+        """百度语音合成参数
+        Args:
+            audio_format: 返回的音频格式，"wav"（播放时无需解码）或 "mp3"
+        """
+        # 根据性别选择发音人
+        per_map = {
+            "female": 0,  # 女声
+            "male": 1,    # 男声
+            "emotional_male": 3,  # 情感男声
+            "emotional_female": 4  # 情感女声
+        }
+        return {
+            'vol': int(self.volume * 15),  # 音量 0-15
+            'spd': max(0, min(9, int(self.rate / 10))),  # 语速 0-9
+            'pit': max(0, min(9, self.pitch)),  # 语调 0-9
+            'per': per_map.get(self.voice_gender, 0),  # 发音人选择
+            'aue': BAIDU_AUDIO_FORMATS[audio_format],
+        }
+    
+    def _synthesize_baidu(self, text, audio_format="wav"):
+        """调用百度语音合成API，返回内存中的音频数据"""
+        result = self.aip_speech.synthesis(
+            text,
+            'zh',  # 语言
+            1,  # 客户端类型
+            self._baidu_synthesis_options(audio_format)
+        )
+        
+        # 合成失败时返回错误信息字典
+        if isinstance(result, dict):
+            error_msg = result.get('err_msg', '未知错误')
+            raise Exception(f"百度语音合成失败: {error_msg}")
+        if not result:
+            raise Exception("百度语音合成返回了空音频")
+        return result
+    
+    def _synthesize_baidu_cached(self, text, audio_format="wav"):
+        """百度语音合成（优先读取缓存）"""
+        if not self.audio_cache:
+            return self._synthesize_baidu(text, audio_format)
+        key = self._cache_key(text, audio_format)
+        audio_data = self.audio_cache.get(key)
+        if audio_data is None:
+            audio_data = self._synthesize_baidu(text, audio_format)
+            self.audio_cache.put(key, audio_data)
+        return audio_data
+    
+    def _render_pyttsx3(self, text):
+        """使用pyttsx3把文本渲染为音频数据（优先读取缓存）
+        Raises:
+            RuntimeError: 渲染被打断（stop()会丢弃进行中的命令）或没有生成音频
+        """
+        key = self._cache_key(text)
+        if self.audio_cache:
+            audio_data = self.audio_cache.get(key)
+            if audio_data is not None:
+                return audio_data
+        
+        # pyttsx3只能输出到文件，渲染完成后读回内存
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_path = temp_file.name
+        try:
+            # 被stop()打断时驱动返回False，此时文件可能为空或只写了一部分
+            if not self._get_pyttsx3_driver().save_to_file(text, temp_path):
+                raise RuntimeError("pyttsx3语音渲染被打断")
+            with open(temp_path, "rb") as f:
+                audio_data = f.read()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        if not audio_data:
+            raise RuntimeError("pyttsx3没有生成音频数据")
+        if self.audio_cache:
+            self.audio_cache.put(key, audio_data)
+        return audio_data
+    
+    def prewarm_cache(self, texts):
+        """预先合成固定文本并写入缓存（只有预热的文本会持久化到磁盘）
+        Args:
+            texts: 文本列表
+        Returns:
+            新写入磁盘缓存的片段数量
+        """
+        if not self.audio_cache:
+            return 0
+        
+        synthesized = 0
+        for text in dict.fromkeys(t for t in texts if t):
             try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
-                logger.info("重新初始化后pyttsx3语音合成完成")
-            except Exception as re:
-                logger.error(f"重新初始化后pyttsx3语音合成仍失败: {re}")
-                raise
+                if self.engine == "baidu":
+                    # 按播报时的分段方式预热，使流式播放也能命中
+                    for segment in split_sentences(text, max_chars=TTSConfig.STREAMING_MAX_SEGMENT_CHARS):
+                        key = self._cache_key(segment)
+                        if not self.audio_cache.contains(key, persistent=True):
+                            self.audio_cache.put(key, self._synthesize_baidu_cached(segment), persistent=True)
+                            synthesized += 1
+                else:
+                    key = self._cache_key(text)
+                    if not self.audio_cache.contains(key, persistent=True):
+                        self.audio_cache.put(key, self._render_pyttsx3(text), persistent=True)
+                        synthesized += 1
+            except Exception as e:
+                logger.error(f"预热语音缓存失败: {e}")
+        logger.info(f"语音缓存预热完成，新写入{synthesized}条")
+        return synthesized
+    
+    def prewarm_cache_async(self, texts):
+        """在后台线程中预热语音缓存"""
+        thread = threading.Thread(target=self.prewarm_cache, args=(list(texts),), daemon=True)
+        thread.start()
+        return thread
     
     def _speak_baidu(self, text):
-        """使用百度语音合成API"""
+        """使用百度语音合成API（逐句流式合成播放）"""
         try:
-            # 根据性别选择发音人
-            per_map = {
-                "female": 0,  # 女声
-                "male": 1,    # 男声
-                "emotional_male": 3,  # 情感男声
-                "emotional_female": 4  # 情感女声
-            }
-            per = per_map.get(self.voice_gender, 0)
-            
-            # 调用百度语音合成API
-            result = self.aip_speech.synthesis(
-                text,
-                'zh',  # 语言
-                1,  # 客户端类型
-                {
-                    'vol': int(self.volume * 15),  # 音量 0-15
-                    'spd': max(0, min(9, int(self.rate / 10))),  # 语速 0-9
-                    'pit': max(0, min(9, self.pitch)),  # 语调 0-9
-                    'per': per,  # 发音人选择
-                }
-            )
-            
-            # 检查是否合成成功
-            if not isinstance(result, dict):
-                # 使用系统临时文件
-                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-                    temp_file.write(result)
-                    temp_audio_file = temp_file.name
-                
-                try:
-                    # 播放音频文件
-                    import playsound
-                    playsound.playsound(temp_audio_file)
-                    logger.info("百度语音合成完成")
-                finally:
-                    # 删除临时文件
-                    if os.path.exists(temp_audio_file):
-                        os.remove(temp_audio_file)
-            else:
-                error_msg = result.get('err_msg', '未知错误')
-                logger.error(f"百度语音合成失败: {error_msg}")
-                raise Exception(f"百度语音合成失败: {error_msg}")
-                
-        except ImportError:
-            logger.error("playsound库未安装")
-            # 尝试使用另一种播放方式
-            try:
-                import pygame
-                pygame.mixer.init()
-                pygame.mixer.music.load(result)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-                logger.info("使用pygame播放百度语音完成")
-            except Exception:
-                raise ImportError("请安装playsound库: pip install playsound")
+            played = self.streaming_synthesizer.speak(text, should_stop=self._stop_event.is_set)
+            logger.info(f"百度语音合成完成，播放{played}段")
         except Exception as e:
             logger.error(f"百度语音合成失败: {e}")
             raise
     
+    def _play_audio_bytes(self, audio_data):
+        """直接从内存播放音频数据"""
+        self.audio_output.play(audio_data, self._stop_event)
+    
+    def close(self):
+        """释放音频输出设备和合成线程"""
+        self.stop()
+        self.streaming_synthesizer.shutdown()
+        self.audio_output.close()
+        if self.pyttsx3_driver:
+            self.pyttsx3_driver.shutdown()
+    
     def save_to_file(self, text, file_path):
-        """将文本转换为语音并保存到文件"""
+        """将文本转换为语音并保存到文件
+        文件格式由扩展名决定：.wav 或 .mp3（百度引擎直接请求MP3，pyttsx3的输出需要pydub转换）
+        Returns:
+            是否保存成功；扩展名不受支持时返回False
+        """
         if not text or not file_path:
             return False
         
+        audio_format = SAVE_FORMATS.get(os.path.splitext(file_path)[1].lower())
+        if audio_format is None:
+            logger.error(f"不支持的音频文件格式: {file_path}（支持: {', '.join(SAVE_FORMATS)}）")
+            return False
+        
         logger.info(f"正在将文本合成语音并保存到文件: {file_path}")
         
         try:
             if self.engine == "baidu":
-                return self._save_to_file_baidu(text, file_path)
+                return self._save_to_file_baidu(text, file_path, audio_format)
             else:
-                return self._save_to_file_pyttsx3(text, file_path)
+                return self._save_to_file_pyttsx3(text, file_path, audio_format)
         except Exception as e:
             logger.error(f"语音保存失败: {e}")
             return False
     
-    def _save_to_file_pyttsx3(self, text, file_path):
-        """使用pyttsx3将语音保存到文件"""
+    def _save_to_file_pyttsx3(self, text, file_path, audio_format="wav"):
+        """使用pyttsx3将语音保存到文件（经过缓存）"""
         try:
-            self.tts_engine.save_to_file(text, file_path)
-            self.tts_engine.runAndWait()
+            # pyttsx3的输出格式取决于平台（Windows/Linux为WAV，macOS为AIFF），按扩展名转换
+            audio_data = convert_audio(self._render_pyttsx3(text), audio_format)
+            with open(file_path, "wb") as f:
+                f.write(audio_data)
             logger.info(f"语音已保存到文件: {file_path}")
             return True
         except Exception as e:
             logger.error(f"pyttsx3语音保存失败: {e}")
             return False
     
-    def _save_to_file_baidu(self, text, file_path):
-        """使用百度语音合成API将语音保存到文件"""
+    def _save_to_file_baidu(self, text, file_path, audio_format="wav"):
+        """使用百度语音合成API将语音保存到文件（经过缓存）"""
         try:
-            # 调用百度语音合成API
-            result = self.aip_speech.synthesis(
-                text,
-                'zh',  # 语言
-                1,  # 客户端类型
-                {
-                    'vol': int(self.volume * 15),  # 音量 0-15
-                    'spd': int(self.rate / 10),  # 语速 0-9
-                    'pit': 5,  # 语调 0-9
-                    'per': 0,  # 发音人选择 0:女声 1:男声 3:情感男声 4:情感女声
-                }
-            )
+            audio_data = self._synthesize_baidu_cached(text, audio_format)
             
-            # 检查是否合成成功
-            if not isinstance(result, dict):
-                # 保存音频文件
-                with open(file_path, "wb") as f:
-                    f.write(result)
-                
-                logger.info(f"语音已保存到文件: {file_path}")
-                return True
-            else:
-                logger.error(f"百度语音合成失败: {result}")
-                return False
+            # 保存音频文件
+            with open(file_path, "wb") as f:
+                f.write(audio_data)
+            
+            logger.info(f"语音已保存到文件: {file_path}")
+            return True
                 
         except Exception as e:
             logger.error(f"百度语音保存失败: {e}")
@@ -281,8 +396,8 @@ class TTSEngine:
         """设置语速"""
         if 50 <= rate <= 300:
             self.rate = rate
-            if self.tts_engine:
-                self.tts_engine.setProperty('rate', rate)
+            if self.pyttsx3_driver:
+                self.pyttsx3_driver.set_property('rate', rate)
             logger.info(f"语速已设置为: {rate}")
         else:
             logger.warning("语速必须在50-300之间")
@@ -291,8 +406,8 @@ class TTSEngine:
         """设置音量"""
         if 0.0 <= volume <= 1.0:
             self.volume = volume
-            if self.tts_engine:
-                self.tts_engine.setProperty('volume', volume)
+            if self.pyttsx3_driver:
+                self.pyttsx3_driver.set_property('volume', volume)
             logger.info(f"音量已设置为: {volume}")
         else:
             logger.warning("音量必须在0.0-1.0之间")
@@ -310,18 +425,24 @@ class TTSEngine:
         valid_genders = ["female", "male", "emotional_male", "emotional_female"]
         if gender in valid_genders:
             self.voice_gender = gender
-            # 重新配置语音
-            if self.tts_engine:
-                self._configure_pyttsx3_engine()
+            # 重新选择语音（使用缓存的语音列表）
+            if self.pyttsx3_driver:
+                voice = self.pyttsx3_driver.select_voice(gender, self.voice_id)
+                if voice:
+                    logger.info(f"已设置语音: {voice.name}")
             logger.info(f"语音性别已设置为: {gender}")
         else:
             logger.warning(f"无效的语音性别，必须是: {', '.join(valid_genders)}")
     
+    def get_cache_stats(self):
+        """获取语音缓存统计"""
+        return self.audio_cache.get_stats() if self.audio_cache else {}
+    
     def get_available_voices(self):
         """获取可用的语音列表"""
         try:
-            if self.tts_engine:
-                voices = self.tts_engine.getProperty('voices')
+            if self.pyttsx3_driver:
+                voices = self.pyttsx3_driver.get_voices()
                 voice_list = []
                 for i, voice in enumerate(voices):
                     voice_list.append({
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步语音播报模块
+由单独的工作线程持有语音合成引擎，按优先级顺序播报，
+支持打断当前播报（barge-in）和清空待播报队列
+"""
+
+import os
+import sys
+import queue
+import logging
+import itertools
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+
+class TTSWorker:
+    """语音播报工作线程"""
+
+    # 优先级：数值越小越先播报
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 5
+    PRIORITY_LOW = 9
+
+    # 队列中通知工作线程退出的优先级（排在所有播报之后）
+    _STOP_PRIORITY = 100
+
+    def __init__(self, tts_engine):
+        """初始化播报线程
+        Args:
+            tts_engine: TTSEngine 实例，之后只能由工作线程调用其 speak 方法
+        """
+        self.tts_engine = tts_engine
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._thread = None
+        self._running = False
+
+        # 当前播报状态
+        self._current = None
+        self._interrupted = False
+        self._state_lock = threading.Lock()
+        self._outstanding = 0  # 已入队但尚未完成的播报数量
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def start(self):
+        """启动工作线程"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+        logger.info("语音播报线程已启动")
+
+    def stop(self, timeout=5):
+        """停止工作线程（放弃尚未播报的内容）"""
+        if not self._running:
+            return
+        self._running = False
+        self.flush()
+        self.interrupt()
+        self._queue.put((self._STOP_PRIORITY, next(self._counter), None, None))
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        logger.info("语音播报线程已停止")
+
+    def speak_async(self, text, priority=PRIORITY_NORMAL, on_complete=None):
+        """加入播报队列，立即返回
+        Args:
+            text: 播报文本
+            priority: 优先级，数值越小越先播报
+            on_complete: 完成回调 on_complete(text, completed)，被打断或清空时 completed 为False
+        """
+        if not text:
+            return
+        if not self._running:
+            self.start()
+        with self._state_lock:
+            self._outstanding += 1
+            self._idle.clear()
+        self._queue.put((priority, next(self._counter), text, on_complete))
+
+    def interrupt(self):
+        """打断当前正在播报的内容"""
+        with self._state_lock:
+            if self._current is None:
+                return False
+            self._interrupted = True
+        logger.info("打断当前语音播报")
+        try:
+            self.tts_engine.stop()
+        except Exception as e:
+            logger.error(f"打断语音播报失败: {e}")
+        return True
+
+    def flush(self):
+        """清空待播报队列"""
+        flushed = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] is None:
+                # 保留退出通知
+                self._queue.put(item)
+                break
+            flushed.append(item)
+
+        for _, _, text, on_complete in flushed:
+            self._notify(on_complete, text, False)
+            self._mark_done()
+        if flushed:
+            logger.info(f"已清空{len(flushed)}条待播报内容")
+        return len(flushed)
+
+    def barge_in(self, *args):
+        """用户开始说话时调用：打断当前播报并清空队列
+        可直接作为语音识别器的 on_voice_detected 回调
+        """
+        self.flush()
+        self.interrupt()
+
+    @property
+    def is_speaking(self):
+        return self._current is not None
+
+    def wait_until_idle(self, timeout=None):
+        """等待所有播报完成"""
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        """工作线程主循环"""
+        while True:
+            priority, _, text, on_complete = self._queue.get()
+            if text is None:
+                break
+
+            with self._state_lock:
+                self._current = text
+                self._interrupted = False
+
+            completed = False
+            try:
+                self.tts_engine.speak(text)
+                completed = True
+            except Exception as e:
+                logger.error(f"语音播报失败: {e}")
+            finally:
+                with self._state_lock:
+                    completed = completed and not self._interrupted
+                    self._current = None
+                    self._interrupted = False
+
+            self._notify(on_complete, text, completed)
+            self._mark_done()
+
+    def _mark_done(self):
+        """一条播报完成或被丢弃"""
+        with self._state_lock:
+            self._outstanding = max(0, self._outstanding - 1)
+            if self._outstanding == 0:
+                self._idle.set()
+
+    @staticmethod
+    def _notify(on_complete, text, completed):
+        if not on_complete:
+            return
+        try:
+            on_complete(text, completed)
+        except Exception as e:
+            logger.error(f"播报完成回调出错: {e}")
@@ -10,17 +10,16 @@ from tkinter import ttk, scrolledtext, messagebox
 import os
 import sys
 import logging
+import time
 from datetime import datetime
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("voice_assistant_gui.log"),
-        logging.StreamHandler()
-    ]
-)
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring.log_pipeline import setup_logging
+
+# 配置日志（异步写入）
+setup_logging(log_file="voice_assistant_gui.log", level="INFO")
 logger = logging.getLogger(__name__)
 
 class VoiceAssistantGUI:
@@ -260,6 +259,7 @@ class VoiceAssistantGUI:
             # 尝试初始化语音识别器
             self.speech_recognizer = None
             self.tts_engine = None
+            self.tts_worker = None
             voice_available = False
             
             try:
@@ -274,7 +274,12 @@ class VoiceAssistantGUI:
             # 尝试初始化语音合成
             try:
                 from src.tts.tts_engine import TTSEngine
+                from src.tts.tts_worker import TTSWorker
                 self.tts_engine = TTSEngine()
+                self.tts_worker = TTSWorker(self.tts_engine)
+                self.tts_worker.start()
+                # 后台预先合成固定回复
+                self.tts_engine.prewarm_cache_async(self.dialogue_manager.get_static_responses())
                 self.log_message("✅ 语音合成器初始化成功")
             except Exception as e:
                 self.log_message(f"⚠️ 语音合成器初始化失败: {e}")
@@ -442,28 +447,26 @@ class VoiceAssistantGUI:
                     self.root.after(0, self._stop_voice)
                     return
             
-            # 持续监听
-            while self.is_running:
-                try:
-                    self.root.after(0, lambda: self.status_label.config(text="🎤 正在监听...", foreground="blue"))
-                    
-                    # 识别语音
-                    text = self.speech_recognizer.recognize(timeout=5, phrase_time_limit=10)
-                    
-                    if text and self.is_running:
-                        # 在主线程中更新UI
-                        self.root.after(0, lambda t=text: self._process_voice_input(t))
-                        
-                except Exception as e:
-                    if self.is_running:
-                        logger.error(f"语音识别错误: {e}")
-                    import time
-                    time.sleep(0.5)
+            # 检测到用户说话时打断当前播报
+            from config.config import TTSConfig
+            if TTSConfig.BARGE_IN_ENABLED and self.tts_worker:
+                self.speech_recognizer.on_voice_detected = self.tts_worker.barge_in
+            
+            # 订阅持续监听结果：采集与识别在后台流水线中进行，识别期间不会漏掉新的语音
+            if self.is_running:
+                self.speech_recognizer.start_continuous_listening(callback=self._on_voice_recognized)
+                self.root.after(0, lambda: self.status_label.config(text="🎤 正在监听...", foreground="blue"))
                     
         except Exception as e:
             self.root.after(0, lambda: self.log_message(f"语音识别出错: {e}"))
             self.root.after(0, self._stop_voice)
     
+    def _on_voice_recognized(self, text):
+        """持续监听识别结果回调（在识别线程中调用）"""
+        if self.is_running:
+            # 在主线程中更新UI
+            self.root.after(0, lambda t=text: self._process_voice_input(t))
+    
     def _process_voice_input(self, text):
         """处理语音输入"""
         self.log_message(f"用户(语音): {text}")
@@ -490,31 +493,27 @@ class VoiceAssistantGUI:
     def _speak_response(self, text):
         """语音播报响应"""
         try:
-            if not hasattr(self, 'tts_engine') or self.tts_engine is None:
+            if not hasattr(self, 'tts_worker') or self.tts_worker is None:
                 try:
                     from src.tts.tts_engine import TTSEngine
+                    from src.tts.tts_worker import TTSWorker
                     self.tts_engine = TTSEngine()
+                    self.tts_worker = TTSWorker(self.tts_engine)
+                    self.tts_worker.start()
                 except Exception:
                     # TTS不可用，静默处理
                     return
             
-            # 在后台线程中播报
-            import threading
-            def speak():
-                try:
-                    self.tts_engine.speak(text)
-                except Exception:
-                    pass
-            
-            thread = threading.Thread(target=speak)
-            thread.daemon = True
-            thread.start()
+            # 交给播报线程排队播报，避免多个线程同时调用语音引擎
+            self.tts_worker.speak_async(text)
         except Exception:
             pass
     
     def _stop_voice(self):
         """停止语音交互"""
         self.is_running = False
+        if hasattr(self, 'speech_recognizer') and self.speech_recognizer:
+            self.speech_recognizer.stop_continuous_listening()
         self.start_btn.config(text="🎤 开始语音交互")
         self.status_label.config(text="语音交互已停止", foreground="orange")
     
@@ -527,9 +526,25 @@ class VoiceAssistantGUI:
     def on_exit(self):
         """处理退出"""
         self.is_running = False
+        if hasattr(self, 'speech_recognizer') and self.speech_recognizer:
+            self.speech_recognizer.stop_continuous_listening()
+        if hasattr(self, 'tts_worker') and self.tts_worker:
+            self.tts_worker.stop()
+        if hasattr(self, 'tts_engine') and self.tts_engine:
+            self.tts_engine.close()
         self.log_message("程序即将退出，感谢使用！")
-        # 延迟关闭，让用户看到最后一条消息
-        self.root.after(1000, self.root.destroy)
+        # 延迟关闭，让用户看到最后一条消息；监听线程在后台退出，界面轮询等待而不阻塞
+        self._exit_deadline = time.monotonic() + 5
+        self.root.after(1000, self._destroy_when_stopped)
+    
+    def _destroy_when_stopped(self):
+        """监听线程退出（或等待超时）后关闭窗口"""
+        recognizer = getattr(self, 'speech_recognizer', None)
+        if (recognizer and not recognizer.join_continuous_listening(timeout=0)
+                and time.monotonic() < self._exit_deadline):
+            self.root.after(100, self._destroy_when_stopped)
+            return
+        self.root.destroy()
     
     def update_time(self):
         """更新时间显示"""
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试公共配置：把项目根目录加入Python路径（与各模块的做法一致），以及对话管理器的公共夹具
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubNLPProcessor:
+    """按预设表返回意图和实体的NLP处理器，记录调用次数"""
+
+    def __init__(self, results=None):
+        # {文本: (意图, [(实体类型, 值), ...])}
+        self.results = dict(results or {})
+        self.detect_calls = []
+        self.process_calls = []
+
+    def detect_intent(self, text):
+        self.detect_calls.append(text)
+        return self.results.get(text, (None, []))[0]
+
+    def process_text(self, text):
+        self.process_calls.append(text)
+        intent, entities = self.results.get(text, (None, []))
+        return {"text": text, "intent": intent, "entities": list(entities), "sentiment": "neutral"}
+
+
+@pytest.fixture
+def stub_nlp():
+    return StubNLPProcessor()
+
+
+@pytest.fixture
+def dialogue_manager(tmp_path, monkeypatch, stub_nlp):
+    """使用临时数据库和桩NLP处理器的对话管理器（不做后台预取）"""
+    from config.config import DialogueManagerConfig
+    from src.dialogue_manager.dialogue_manager import DialogueManager
+
+    monkeypatch.setattr(DialogueManagerConfig, "HISTORY_PATH", str(tmp_path / "dialogue_history.db"))
+    monkeypatch.setattr(DialogueManagerConfig, "CONTEXT_STORE_PATH", str(tmp_path / "dialogue_context.db"))
+    monkeypatch.setattr(DialogueManagerConfig, "PREFETCH_ENABLED", False)
+    manager = DialogueManager(nlp_processor=stub_nlp)
+    yield manager
+    if manager._executor is not None:
+        manager._executor.shutdown(wait=True)
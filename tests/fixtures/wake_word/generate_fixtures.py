@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成唤醒词检测测试用的WAV音频（16kHz单声道16位）
+音频为合成的元音序列：每个音节是带基频滑动的谐波音，按元音的共振峰加权，
+MFCC特征与真实语音相近，并且可以重复生成。
+    template.wav          唤醒词模板（三个音节 a-i-u）
+    positive_slow.wav     同一唤醒词，语速慢10%、音高和音量不同，前后有静音
+    positive_command.wav  唤醒词之后紧接着说命令（音节 o-e），用于检查命令部分的起点
+    negative_other.wav    其他音节序列（e-o-a）
+    negative_noise.wav    只有背景噪声
+重新生成：
+    python tests/fixtures/wake_word/generate_fixtures.py
+"""
+
+import os
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 元音的前三个共振峰（Hz）
+FORMANTS = {
+    "a": (800, 1200, 2500),
+    "i": (300, 2300, 3000),
+    "u": (350, 800, 2300),
+    "o": (500, 900, 2400),
+    "e": (450, 1900, 2600),
+}
+
+WAKE_WORD = ("a", "i", "u")
+COMMAND = ("o", "e")
+OTHER = ("e", "o", "a")
+
+
+def syllable(vowel, duration, f0, rng):
+    """合成一个音节：基频从 f0 滑到 0.85*f0，谐波幅度按共振峰加权，首尾渐入渐出"""
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = f0 * (1.0 - 0.15 * t / duration)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = np.zeros_like(t)
+    for harmonic in range(1, 30):
+        frequency = f0 * harmonic
+        if frequency > SAMPLE_RATE / 2 - 500:
+            break
+        gain = sum(np.exp(-((frequency - formant) / 120.0) ** 2) for formant in FORMANTS[vowel])
+        signal += (gain + 0.02) / harmonic ** 0.5 * np.sin(harmonic * phase + rng.uniform(0, 2 * np.pi))
+    envelope = np.minimum(1.0, np.minimum(t, duration - t) / 0.03)
+    return signal * envelope
+
+
+def utterance(vowels, syllable_seconds, f0, rng):
+    parts = []
+    for vowel in vowels:
+        parts.append(syllable(vowel, syllable_seconds, f0, rng))
+        parts.append(np.zeros(int(0.04 * SAMPLE_RATE)))
+    return np.concatenate(parts)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE))
+
+
+def write_wav(name, signal, peak, rng, noise=60.0):
+    signal = signal / np.max(np.abs(signal)) * peak if np.any(signal) else signal
+    signal = signal + rng.normal(0, noise, signal.size)
+    samples = np.clip(signal, -32768, 32767).astype(np.int16)
+    with wave.open(os.path.join(FIXTURE_DIR, name), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(samples.tobytes())
+
+
+def main():
+    rng = np.random.default_rng(2024)
+    write_wav("template.wav", np.concatenate([silence(0.2), utterance(WAKE_WORD, 0.22, 150, rng), silence(0.2)]),
+              9000, rng)
+    write_wav("positive_slow.wav",
+              np.concatenate([silence(0.4), utterance(WAKE_WORD, 0.245, 140, rng), silence(0.4)]), 6000, rng)
+    write_wav("positive_command.wav",
+              np.concatenate([silence(0.3), utterance(WAKE_WORD, 0.22, 155, rng), silence(0.15),
+                              utterance(COMMAND, 0.3, 155, rng), silence(0.3)]), 8000, rng)
+    write_wav("negative_other.wav",
+              np.concatenate([silence(0.3), utterance(OTHER, 0.22, 150, rng), silence(0.3)]), 9000, rng)
+    write_wav("negative_noise.wav", silence(1.5), 0, rng, noise=1500.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成语音缓存测试：只有预热的固定文本写入磁盘
+"""
+
+import os
+
+from src.tts.audio_cache import AudioCache
+from src.tts.tts_engine import TTSEngine
+
+
+def disk_files(cache_dir):
+    return [name for _, _, names in os.walk(cache_dir) for name in names]
+
+
+def test_put_is_memory_only_by_default(tmp_path):
+    cache = AudioCache(cache_dir=str(tmp_path))
+    cache.put("dynamic", b"audio")
+    assert cache.get("dynamic") == b"audio"
+    assert disk_files(tmp_path) == []
+    assert not cache.contains("dynamic", persistent=True)
+
+
+def test_persistent_put_survives_restart(tmp_path):
+    AudioCache(cache_dir=str(tmp_path)).put("static", b"audio", persistent=True)
+    cache = AudioCache(cache_dir=str(tmp_path))
+    assert cache.contains("static", persistent=True)
+    assert cache.get("static") == b"audio"
+
+
+def test_memory_lru_is_bounded(tmp_path):
+    cache = AudioCache(cache_dir=str(tmp_path), max_memory_bytes=10)
+    for key in "abc":
+        cache.put(key, b"12345")
+    assert cache.get("a") is None
+    assert cache.get("c") == b"12345"
+    assert cache.get_stats()["memory_bytes"] <= 10
+
+
+class FakeAipSpeech:
+    def __init__(self):
+        self.texts = []
+
+    def synthesis(self, text, lang, ctp, options):
+        self.texts.append(text)
+        return f"audio:{text}".encode("utf-8")
+
+
+def make_engine(cache):
+    engine = TTSEngine.__new__(TTSEngine)
+    engine.engine = "baidu"
+    engine.rate, engine.volume, engine.pitch, engine.voice_gender = 200, 1.0, 5, "female"
+    engine.audio_cache = cache
+    engine.aip_speech = FakeAipSpeech()
+    return engine
+
+
+def test_only_prewarmed_text_is_written_to_disk(tmp_path):
+    engine = make_engine(AudioCache(cache_dir=str(tmp_path)))
+    engine._synthesize_baidu_cached("北京今天晴，气温二十度。")
+    assert disk_files(tmp_path) == []
+
+    assert engine.prewarm_cache(["你好。"]) == 1
+    assert len(disk_files(tmp_path)) == 1
+    # 已经在磁盘上的文本不再合成
+    assert engine.prewarm_cache(["你好。"]) == 0
+    assert engine.aip_speech.texts == ["北京今天晴，气温二十度。", "你好。"]
+
+
+def test_prewarm_persists_text_already_in_memory(tmp_path):
+    engine = make_engine(AudioCache(cache_dir=str(tmp_path)))
+    engine._synthesize_baidu_cached("你好。")
+    assert engine.prewarm_cache(["你好。"]) == 1
+    assert len(disk_files(tmp_path)) == 1
+    assert engine.aip_speech.texts == ["你好。"]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频输出测试：通过WavSinkOutput播放并检查写入的音频帧，以及save_to_file的格式处理
+"""
+
+import threading
+import time
+import wave
+
+import pytest
+
+from src.tts.audio_cache import AudioCache
+from src.tts.audio_output import AudioOutput, NullOutput, WavSinkOutput, convert_audio, decode_audio, encode_wav, PCMAudio
+from src.tts.streaming_synthesizer import StreamingSynthesizer
+from src.tts.tts_engine import TTSEngine
+
+
+def make_wav(frames, sample_rate=16000):
+    return encode_wav(PCMAudio(frames, sample_rate))
+
+
+def read_frames(path):
+    with wave.open(str(path), "rb") as wav_file:
+        return wav_file.getframerate(), wav_file.readframes(wav_file.getnframes())
+
+
+def tone(value, samples=4000):
+    return value.to_bytes(2, "little", signed=True) * samples
+
+
+def test_wav_sink_writes_played_frames(tmp_path):
+    path = tmp_path / "out.wav"
+    output = WavSinkOutput(str(path))
+    assert output.play(make_wav(tone(100)))
+    assert output.play(make_wav(tone(-200)))
+    output.close()
+    rate, frames = read_frames(path)
+    assert rate == 16000
+    assert frames == tone(100) + tone(-200)
+
+
+def test_wav_sink_stop_event_skips_audio(tmp_path):
+    path = tmp_path / "out.wav"
+    output = WavSinkOutput(str(path))
+    stop_event = threading.Event()
+    stop_event.set()
+    assert output.play(make_wav(tone(100)), stop_event) is False
+    output.close()
+    assert read_frames(path)[1] == b""
+
+
+def test_null_output_counts():
+    output = NullOutput()
+    output.play(make_wav(tone(1, samples=8000)))
+    output.play(make_wav(tone(1, samples=8000)))
+    assert output.played_count == 2
+    assert output.played_seconds == pytest.approx(1.0)
+
+
+class BlockingOutput(AudioOutput):
+    """第一段音频一直播放到被停止（最多等待2秒），之后的音频立即播放完"""
+
+    def __init__(self):
+        super().__init__()
+        self.playing = threading.Event()
+        self.results = []
+
+    def _play_pcm(self, pcm, stop_event):
+        if self.results:
+            self.results.append(True)
+            return True
+        self.playing.set()
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            if self._should_stop(stop_event):
+                self.results.append(False)
+                return False
+            time.sleep(0.01)
+        self.results.append(True)
+        return True
+
+
+def test_queued_play_does_not_discard_stop():
+    output = BlockingOutput()
+    first = threading.Thread(target=output.play, args=(make_wav(tone(1)),))
+    first.start()
+    assert output.playing.wait(2.0)
+
+    # 当前片段播放时停止，随后排队的下一段不能清除这次停止
+    output.stop()
+    second = threading.Thread(target=output.play, args=(make_wav(tone(2)),))
+    second.start()
+    first.join(3.0)
+    second.join(3.0)
+    assert output.results == [False, True]
+
+
+def test_audio_output_requires_play_pcm():
+    with pytest.raises(TypeError):
+        AudioOutput()
+
+
+def test_streaming_synthesizer_plays_segments_in_order(tmp_path):
+    path = tmp_path / "out.wav"
+    output = WavSinkOutput(str(path))
+    values = {"第一句。": 1, "第二句。": 2, "第三句。": 3}
+    synthesizer = StreamingSynthesizer(lambda text: make_wav(tone(values[text])), output.play, max_parallel=3)
+    try:
+        assert synthesizer.speak("第一句。第二句。第三句。") == 3
+    finally:
+        synthesizer.shutdown()
+        output.close()
+    assert read_frames(path)[1] == tone(1) + tone(2) + tone(3)
+
+
+def test_convert_audio_keeps_matching_format():
+    data = make_wav(tone(5))
+    assert convert_audio(data, "wav") is data
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_convert_audio_aiff_to_wav(tmp_path):
+    # macOS下pyttsx3输出AIFF（大端PCM），保存为.wav时需要转换
+    aifc = pytest.importorskip("aifc")
+    path = tmp_path / "speech.aiff"
+    with aifc.open(str(path), "wb") as aiff_file:
+        aiff_file.setnchannels(1)
+        aiff_file.setsampwidth(2)
+        aiff_file.setframerate(22050)
+        aiff_file.writeframes((300).to_bytes(2, "big", signed=True) * 4000)
+    pcm = decode_audio(convert_audio(path.read_bytes(), "wav"))
+    assert pcm.sample_rate == 22050
+    assert pcm.frames == tone(300)
+
+
+class FakeAipSpeech:
+    """记录合成参数，按aue返回对应格式的音频"""
+
+    def __init__(self):
+        self.options = []
+
+    def synthesis(self, text, lang, ctp, options):
+        self.options.append(options)
+        return make_wav(tone(7)) if options["aue"] == 6 else b"ID3fake-mp3"
+
+
+@pytest.fixture
+def baidu_engine():
+    engine = TTSEngine.__new__(TTSEngine)
+    engine.engine = "baidu"
+    engine.rate, engine.volume, engine.pitch, engine.voice_gender = 200, 1.0, 5, "female"
+    engine.audio_cache = None
+    engine.aip_speech = FakeAipSpeech()
+    return engine
+
+
+def test_baidu_save_to_file_uses_extension_format(baidu_engine, tmp_path):
+    wav_path, mp3_path = tmp_path / "a.wav", tmp_path / "a.mp3"
+    assert baidu_engine.save_to_file("你好", str(wav_path))
+    assert baidu_engine.save_to_file("你好", str(mp3_path))
+    assert [o["aue"] for o in baidu_engine.aip_speech.options] == [6, 3]
+    assert read_frames(wav_path)[1] == tone(7)
+    assert mp3_path.read_bytes() == b"ID3fake-mp3"
+
+
+def test_save_to_file_rejects_unknown_extension(baidu_engine, tmp_path):
+    path = tmp_path / "a.ogg"
+    assert baidu_engine.save_to_file("你好", str(path)) is False
+    assert not path.exists()
+    assert baidu_engine.aip_speech.options == []
+
+
+class FakePyttsx3Driver:
+    """模拟pyttsx3驱动：completed为False时相当于命令被stop()丢弃"""
+
+    is_running = True
+
+    def __init__(self, completed=True, audio=None):
+        self.completed = completed
+        self.audio = make_wav(tone(9)) if audio is None else audio
+
+    def save_to_file(self, text, file_path, timeout=None):
+        with open(file_path, "wb") as f:
+            f.write(self.audio if self.completed else b"")
+        return self.completed
+
+
+@pytest.fixture
+def pyttsx3_engine(tmp_path):
+    engine = TTSEngine.__new__(TTSEngine)
+    engine.engine = "pyttsx3"
+    engine.rate, engine.volume, engine.pitch, engine.voice_gender = 200, 1.0, 5, "female"
+    engine.audio_cache = AudioCache(cache_dir=str(tmp_path / "cache"))
+    engine.pyttsx3_driver = FakePyttsx3Driver()
+    return engine
+
+
+def test_pyttsx3_save_to_file(pyttsx3_engine, tmp_path):
+    path = tmp_path / "a.wav"
+    assert pyttsx3_engine.save_to_file("你好", str(path))
+    assert read_frames(path)[1] == tone(9)
+
+
+@pytest.mark.parametrize("driver", [FakePyttsx3Driver(completed=False), FakePyttsx3Driver(audio=b"")])
+def test_pyttsx3_interrupted_or_empty_output_fails(pyttsx3_engine, tmp_path, driver):
+    pyttsx3_engine.pyttsx3_driver = driver
+    path = tmp_path / "a.wav"
+    assert pyttsx3_engine.save_to_file("你好", str(path)) is False
+    assert not path.exists()
+    # 失败的渲染既不计入预热数量，也不写入缓存
+    assert pyttsx3_engine.prewarm_cache(["你好"]) == 0
+    assert not pyttsx3_engine.audio_cache.contains(pyttsx3_engine._cache_key("你好"))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+百度语音识别客户端测试：客户端指向本地模拟的令牌接口和识别接口（真实HTTP请求）
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import speech_recognition as sr
+
+from src.speech_recognition.baidu_asr_client import BaiduASRClient, audio_to_pcm
+
+
+class MockBaiduServer:
+    """模拟百度接口，记录收到的请求"""
+
+    def __init__(self):
+        self.token_requests = []
+        self.asr_requests = []
+        self.expires_in = 30 * 24 * 3600
+        # 识别接口依次返回的结果，用完后重复最后一个
+        self.asr_responses = [{"err_no": 0, "result": ["明天天气怎么样"]}]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if parsed.path == "/oauth/2.0/token":
+                    mock.token_requests.append(query)
+                    payload = {"access_token": f"token-{len(mock.token_requests)}", "expires_in": mock.expires_in}
+                else:
+                    mock.asr_requests.append({"query": query, "headers": dict(self.headers), "body": body})
+                    index = min(len(mock.asr_requests), len(mock.asr_responses)) - 1
+                    payload = mock.asr_responses[index]
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def server():
+    server = MockBaiduServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    return BaiduASRClient("test-key", "test-secret", dev_pid=1537,
+                          token_url=f"{server.url}/oauth/2.0/token", asr_url=f"{server.url}/server_api")
+
+
+PCM = bytes(range(256)) * 25  # 6400字节，0.2秒的16kHz 16位音频
+
+
+def test_token_is_cached(server, client):
+    assert client.recognize_pcm(PCM) == "明天天气怎么样"
+    assert client.recognize_pcm(PCM) == "明天天气怎么样"
+    assert len(server.token_requests) == 1
+    assert server.token_requests[0] == {
+        "grant_type": "client_credentials", "client_id": "test-key", "client_secret": "test-secret"
+    }
+    assert [r["query"]["token"] for r in server.asr_requests] == ["token-1", "token-1"]
+
+
+def test_token_refreshed_when_expired(server, client):
+    # 有效期不超过提前刷新的余量：取得后立即视为过期
+    server.expires_in = BaiduASRClient.TOKEN_REFRESH_MARGIN
+    client.recognize_pcm(PCM)
+    client.recognize_pcm(PCM)
+    assert len(server.token_requests) == 2
+    assert [r["query"]["token"] for r in server.asr_requests] == ["token-1", "token-2"]
+
+
+def test_token_refreshed_on_token_error(server, client):
+    server.asr_responses = [{"err_no": 110, "err_msg": "Access token invalid"},
+                            {"err_no": 0, "result": ["你好"]}]
+    assert client.recognize_pcm(PCM) == "你好"
+    assert len(server.token_requests) == 2
+    assert [r["query"]["token"] for r in server.asr_requests] == ["token-1", "token-2"]
+
+
+def test_raw_pcm_upload_parameters(server, client):
+    client.recognize_pcm(PCM, sample_rate=16000)
+    request = server.asr_requests[0]
+    # 原始音频上传：格式和采样率在 Content-Type 中，长度即 Content-Length，音频不做base64编码
+    assert request["headers"]["Content-Type"] == "audio/pcm;rate=16000"
+    assert int(request["headers"]["Content-Length"]) == len(PCM)
+    assert request["body"] == PCM
+    assert request["query"]["dev_pid"] == "1537"
+    assert request["query"]["cuid"] == client.cuid
+
+
+def test_recognize_audio_data_uses_raw_frames(server, client):
+    audio = sr.AudioData(PCM, 16000, 2)
+    assert audio_to_pcm(audio) is audio.frame_data
+    client.recognize(audio)
+    assert server.asr_requests[0]["body"] == PCM
+
+
+def test_audio_converted_to_16k(server, client):
+    audio = sr.AudioData(PCM, 8000, 2)
+    pcm = audio_to_pcm(audio)
+    assert abs(len(pcm) - 2 * len(PCM)) <= 4  # 重采样边界处可能少几个采样
+    assert audio_to_pcm(audio) is pcm  # 同一段音频只转换一次
+    client.recognize(audio)
+    assert server.asr_requests[0]["headers"]["Content-Type"] == "audio/pcm;rate=16000"
+    assert int(server.asr_requests[0]["headers"]["Content-Length"]) == len(pcm)
+
+
+def test_no_speech_returns_none(server, client):
+    server.asr_responses = [{"err_no": 3301, "err_msg": "speech quality error"}]
+    assert client.recognize_pcm(PCM) is None
+
+
+def test_api_error_raises(server, client):
+    server.asr_responses = [{"err_no": 3307, "err_msg": "recognition error"}]
+    with pytest.raises(RuntimeError):
+        client.recognize_pcm(PCM)
+
+
+def test_unsupported_sample_rate_rejected(server, client):
+    with pytest.raises(ValueError):
+        client.recognize_pcm(PCM, sample_rate=44100)
+    assert server.asr_requests == []
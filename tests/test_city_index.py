@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+城市索引测试：由 data/rules 中的城市代码表和非地名词表生成临时索引
+"""
+
+import json
+import os
+import shutil
+
+import jieba
+import pytest
+
+from src.nlp.city_index import CityIndex, build_index
+from src.nlp.rule_store import RuleStore
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rules")
+
+
+def load_non_city_words(rules_dir=RULES_DIR):
+    with open(os.path.join(rules_dir, "non_city_words.json"), "r", encoding="utf-8") as f:
+        return [word for words in json.load(f).values() for word in words]
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    index_path = str(tmp_path_factory.mktemp("city_index") / "city_index.bin")
+    build_index(os.path.join(RULES_DIR, "cities.tsv"), index_path)
+    city_index = CityIndex(index_path, load_non_city_words())
+    yield city_index
+    city_index.close()
+
+
+def find(index, text):
+    return index.find_in_text(text, jieba.lcut(text))
+
+
+@pytest.mark.parametrize("text, cities", [
+    ("北京天气怎么样", ["北京"]),
+    ("我在北京工作", ["北京"]),
+    ("明天去上海", ["上海"]),
+    ("上海明天下雨吗", ["上海"]),
+    ("宁德明天天气", ["宁德"]),
+    ("泉州市天气", ["泉州"]),
+    ("从广州到深圳", ["广州", "深圳"]),
+    # "长沙发"没有与分词对齐（长沙/发布会），不排除
+    ("长沙发布会几点开始", ["长沙"]),
+])
+def test_find_in_text(index, text, cities):
+    assert find(index, text) == cities
+
+
+@pytest.mark.parametrize("text", [
+    "中山大学在哪",          # 城市名在词的内部
+    "北京大学怎么走",
+    "宁德时代股票怎么样",    # jieba拆成"宁德/时代"，由非地名词表排除
+    "客厅的长沙发很舒服",
+    "来一瓶青岛啤酒",
+])
+def test_find_in_text_ignores_city_inside_words(index, text):
+    assert find(index, text) == []
+
+
+def test_resolve(index):
+    assert index.resolve("苏州工业园区")[0] == "苏州"
+    assert index.resolve("suzhou")[0] == "苏州"
+    assert index.resolve("火星") is None
+
+
+def test_non_city_words_reload_with_rules(tmp_path):
+    rules_dir = tmp_path / "rules"
+    shutil.copytree(RULES_DIR, rules_dir, ignore=shutil.ignore_patterns("city_index-*.bin"))
+    store = RuleStore(str(rules_dir), reload_interval=1)
+    assert find(store.snapshot.city_index, "宁德时代") == []
+
+    (rules_dir / "non_city_words.json").write_text(json.dumps({"公司和品牌": []}), encoding="utf-8")
+    assert store.reload(force=True)
+    assert store.snapshot.non_city_words == {"公司和品牌": []}
+    assert find(store.snapshot.city_index, "宁德时代") == ["宁德"]
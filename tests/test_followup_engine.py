@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追问推断引擎测试：固定原 _handle_contextual_conversation 的行为
+（意图推断顺序、城市的沿用优先级、时间/日期和搜索的追问）
+"""
+
+import itertools
+
+import pytest
+
+from src.dialogue_manager.dialogue_context import DialogueContext, EntityList
+from src.dialogue_manager.followup_engine import FollowupEngine
+
+# 与 DialogueManager.contextual_intents 保持一致
+CONTEXTUAL_INTENTS = {
+    "weather": ["温度", "天气", "下雨", "晴天", "多云", "预报", "温度", "风力", "湿度", "气候", "天气怎么样", "冷", "热"],
+    "time": ["几点", "时间", "现在", "几时", "何时", "几点了"],
+    "date": ["日期", "几号", "今天", "明天", "后天", "星期几", "几号了"],
+    "search_internet": ["搜索", "查找", "查询", "了解", "更多", "详细", "信息", "资料"],
+    "calculator": ["计算", "加", "减", "乘", "除", "等于", "结果", "多少"],
+    "joke": ["笑话", "搞笑", "幽默", "哈哈", "开心"],
+    "music": ["音乐", "歌曲", "播放", "听歌", "唱歌", "旋律"],
+    "open_application": ["打开", "启动", "运行", "开启"],
+    "open_folder": ["打开", "查看", "浏览", "文件夹"]
+}
+
+
+def legacy_resolve(user_input, intent, entities, context):
+    """改写为规则表之前的 _handle_contextual_conversation（作为对照）"""
+    if (intent is None or intent == "unknown") and context.last_intent:
+        last_intent = context.last_intent
+        for ctx_intent, keywords in CONTEXTUAL_INTENTS.items():
+            if last_intent == ctx_intent:
+                for keyword in keywords:
+                    if keyword in user_input:
+                        intent = last_intent
+                        break
+        if (intent is None or intent == "unknown") and context.conversation_topic:
+            topic = context.conversation_topic
+            if topic in CONTEXTUAL_INTENTS:
+                for keyword in CONTEXTUAL_INTENTS[topic]:
+                    if keyword in user_input:
+                        intent = topic
+                        break
+        if intent is None or intent == "unknown":
+            question_words = ["呢", "？", "怎么", "为什么", "哪里", "什么", "如何", "多少"]
+            if any(word in user_input for word in question_words):
+                intent = last_intent
+
+    if intent == "weather" or ((intent is None or intent == "unknown") and context.last_intent == "weather"):
+        if not entities.has("city"):
+            if context.memory.preferred_city:
+                entities.append(("city", context.memory.preferred_city))
+            elif context.last_intent == "weather" and context.last_entities and context.last_entities.has("city"):
+                entities.append(("city", context.last_entities.first("city")))
+        if intent is None or intent == "unknown":
+            time_keywords = ["今天", "明天", "后天", "大后天", "周一", "周二", "周三", "周四", "周五", "周六", "周日",
+                             "早上", "下午", "晚上", "上午", "夜间", "凌晨"]
+            if any(keyword in user_input for keyword in time_keywords) or "呢" in user_input:
+                intent = "weather"
+
+    if (intent == "time" or intent == "date") or ((intent is None or intent == "unknown") and
+                                                 (context.last_intent in ["time", "date"])):
+        if intent is None or intent == "unknown":
+            time_date_keywords = ["几点", "时间", "日期", "几号", "今天", "明天", "现在", "几时", "何时", "星期几"]
+            if any(keyword in user_input for keyword in time_date_keywords) or "呢" in user_input:
+                intent = context.last_intent
+
+    if intent == "search_internet" or ((intent is None or intent == "unknown") and
+                                       context.last_intent == "search_internet"):
+        if intent is None or intent == "unknown":
+            search_keywords = ["更多", "详细", "信息", "资料", "了解", "然后呢"]
+            if any(keyword in user_input for keyword in search_keywords) or "呢" in user_input:
+                intent = "search_internet"
+                if context.last_entities and context.last_entities.has("query") and not entities.has("query"):
+                    entities.append(("query", context.last_entities.first("query")))
+
+    return intent, entities
+
+
+def make_context(last_intent=None, last_entities=(), preferred_city=None, topic=None):
+    context = DialogueContext(session_id="test")
+    context.last_intent = last_intent
+    context.last_entities = EntityList(last_entities) if last_entities else None
+    context.memory.preferred_city = preferred_city
+    context.conversation_topic = topic
+    return context
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return FollowupEngine(CONTEXTUAL_INTENTS)
+
+
+def test_tomorrow_followup_after_weather_carries_city(engine):
+    context = make_context("weather", [("city", "北京"), ("time_word", "今天")])
+    intent, entities = engine.resolve("明天呢", None, EntityList(), context)
+    assert intent == "weather"
+    assert entities.first("city") == "北京"
+
+
+def test_weather_followup_carries_time_word_only_when_missing(engine):
+    context = make_context("weather", [("city", "北京"), ("time_word", "今天")])
+    _, entities = engine.resolve("上海呢", "unknown", EntityList([("city", "上海")]), context)
+    assert entities == [("city", "上海"), ("time_word", "今天")]
+
+    _, entities = engine.resolve("后天呢", "unknown", EntityList([("time_word", "后天")]), context)
+    assert entities.all("time_word") == ["后天"]
+
+
+def test_preferred_city_takes_precedence_over_last_city(engine):
+    context = make_context("weather", [("city", "北京")], preferred_city="杭州")
+    intent, entities = engine.resolve("明天呢", None, EntityList(), context)
+    assert intent == "weather"
+    assert entities.all("city") == ["杭州"]
+
+
+def test_explicit_city_is_not_overridden(engine):
+    context = make_context("weather", [("city", "北京")], preferred_city="杭州")
+    intent, entities = engine.resolve("广州明天天气", "weather", EntityList([("city", "广州")]), context)
+    assert intent == "weather"
+    assert entities.all("city") == ["广州"]
+
+
+def test_weather_intent_uses_preferred_city_without_prior_turn(engine):
+    context = make_context(preferred_city="杭州")
+    intent, entities = engine.resolve("天气怎么样", "weather", EntityList(), context)
+    assert intent == "weather"
+    assert entities.first("city") == "杭州"
+
+
+def test_last_city_is_only_carried_from_weather_turn(engine):
+    context = make_context("search_map", [("city", "北京")])
+    intent, entities = engine.resolve("天气怎么样", "weather", EntityList(), context)
+    assert intent == "weather"
+    assert not entities.has("city")
+
+
+@pytest.mark.parametrize("last_intent", ["time", "date"])
+def test_time_date_question_followup_keeps_last_intent(engine, last_intent):
+    context = make_context(last_intent)
+    intent, entities = engine.resolve("那纽约呢", None, EntityList(), context)
+    assert intent == last_intent
+    assert entities == []
+
+
+def test_search_followup_carries_query(engine):
+    context = make_context("search_internet", [("query", "量子计算")])
+    intent, entities = engine.resolve("详细一点", "unknown", EntityList(), context)
+    assert intent == "search_internet"
+    assert entities.first("query") == "量子计算"
+
+
+def test_unrelated_input_stays_unknown(engine):
+    context = make_context("joke")
+    intent, entities = engine.resolve("好的谢谢", "unknown", EntityList(), context)
+    assert intent == "unknown"
+    assert entities == []
+
+
+def test_conversation_topic_keyword_switches_intent(engine):
+    context = make_context("joke", topic="music")
+    intent, _ = engine.resolve("换一首歌曲", None, EntityList(), context)
+    assert intent == "music"
+
+
+# 对照表：上一轮意图 × 本轮输入 × 本轮意图 × 偏好城市 × 本轮是否带城市
+LAST_INTENTS = [None, "weather", "time", "date", "search_internet", "music", "joke", "calculator"]
+INPUTS = ["明天呢", "后天天气", "上海呢", "冷不冷", "几点了", "今天几号", "然后呢", "详细资料", "多少钱",
+          "为什么？", "播放音乐", "打开文件夹", "好的谢谢", "晚上下雨吗", "什么时间"]
+CURRENT_INTENTS = [None, "unknown", "weather", "time", "search_internet", "music"]
+
+
+def test_matches_legacy_behaviour(engine):
+    mismatches = []
+    for last_intent, text, intent, preferred_city, with_city, topic in itertools.product(
+            LAST_INTENTS, INPUTS, CURRENT_INTENTS, [None, "杭州"], [False, True], [None, "weather", "music"]):
+        last_entities = [("city", "北京"), ("query", "量子计算")]
+        current = [("city", "上海")] if with_city else []
+        expected = legacy_resolve(text, intent, EntityList(current),
+                                  make_context(last_intent, last_entities, preferred_city, topic))
+        actual_intent, actual_entities = engine.resolve(text, intent, EntityList(current),
+                                                        make_context(last_intent, last_entities, preferred_city, topic))
+        # 追问时沿用时间词和搜索内容是改写后新增的（原实现中搜索内容的沿用被前面的疑问词分支挡住，
+        # 实际不会执行），对照时不计入
+        carried = [e for e in actual_entities[len(current):] if e[0] not in ("time_word", "query")]
+        actual = (actual_intent, current + carried)
+        if actual != (expected[0], list(expected[1])):
+            mismatches.append((last_intent, text, intent, preferred_city, with_city, topic, expected, actual))
+    assert mismatches == []
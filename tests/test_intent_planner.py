@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多意图规划测试：子句切分、规划，以及对话管理器按子句顺序合并回复
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.dialogue_manager.intent_planner import IntentPlanner, split_utterance
+
+
+@pytest.mark.parametrize("text, clauses", [
+    ("北京天气怎么样，顺便讲个笑话，再看看新闻", ["北京天气怎么样", "讲个笑话", "看看新闻"]),
+    ("现在几点然后讲个笑话", ["现在几点", "讲个笑话"]),
+    ("打开微信；另外放首歌！", ["打开微信", "放首歌"]),
+    ("今天天气怎么样？", ["今天天气怎么样"]),
+    ("，，还有。", []),
+    ("同时再也还播放音乐", ["播放音乐"]),
+])
+def test_split_utterance(text, clauses):
+    assert split_utterance(text) == clauses
+
+
+def test_plan_returns_steps_in_order(stub_nlp):
+    stub_nlp.results.update({
+        "北京天气怎么样": ("weather", [("city", "北京")]),
+        "讲个笑话": ("joke", []),
+    })
+    steps = IntentPlanner(stub_nlp).plan("北京天气怎么样，顺便讲个笑话")
+    assert steps == [("北京天气怎么样", "weather", [("city", "北京")]), ("讲个笑话", "joke", [])]
+
+
+@pytest.mark.parametrize("text", ["讲个笑话", "讲个笑话，上海呢", "一，二，三，四，五"])
+def test_plan_declines_without_full_nlp(stub_nlp, text):
+    stub_nlp.results["讲个笑话"] = ("joke", [])
+    stub_nlp.results["上海呢"] = ("unknown", [])
+    assert IntentPlanner(stub_nlp, max_clauses=4).plan(text) is None
+    # 放弃多意图时只做过意图匹配，整句的完整处理由调用方做一次
+    assert stub_nlp.process_calls == []
+
+
+def test_multi_response_merged_in_clause_order(dialogue_manager, stub_nlp):
+    stub_nlp.results.update({"慢的查询": ("news", []), "快的查询": ("joke", []), "打开记事本": ("open_application", [])})
+    threads = {}
+
+    def make_handler(name, delay):
+        def handler(user_input, intent, entities, api_integrator, slots=None):
+            time.sleep(delay)
+            threads[name] = threading.current_thread().name
+            return f"{name}的回复"
+        return handler
+
+    dialogue_manager.intent_handlers["news"] = make_handler("新闻", 0.2)
+    dialogue_manager.intent_handlers["joke"] = make_handler("笑话", 0.0)
+    dialogue_manager.intent_handlers["open_application"] = make_handler("打开", 0.0)
+
+    response = dialogue_manager.generate_response("慢的查询，快的查询，打开记事本", api_integrator=object())
+    assert response == "新闻的回复\n笑话的回复\n打开的回复"
+    # 独立查询在线程池中执行，有副作用的操作在当前线程执行
+    assert threads["新闻"] != threading.current_thread().name
+    assert threads["打开"] == threading.current_thread().name
+    assert dialogue_manager.current_context.last_intent == "open_application"
+    # 每个子句保存一条对话历史
+    assert sorted(user_input for _, user_input, _ in dialogue_manager.get_dialogue_history()) == sorted(
+        ["慢的查询", "快的查询", "打开记事本"])
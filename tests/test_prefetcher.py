@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追问预取测试：意图转移统计的持久化
+"""
+
+import sqlite3
+
+import pytest
+
+from src.dialogue_manager.prefetcher import TransitionStats
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+def test_counts_survive_restart(db_path):
+    stats = TransitionStats(db_path=db_path)
+    # 远多于对话历史表保留的记录数
+    for _ in range(30):
+        stats.record("weather", "weather")
+    for _ in range(10):
+        stats.record("weather", "news")
+
+    restarted = TransitionStats(db_path=db_path)
+    assert restarted.predict("weather") == [("weather", 0.75), ("news", 0.25)]
+
+
+def test_priors_are_not_persisted(db_path):
+    stats = TransitionStats({"weather": {"weather": 3}}, db_path=db_path)
+    stats.record("weather", "news")
+    assert TransitionStats(db_path=db_path).predict("weather") == [("news", 1.0)]
+
+
+def test_seeded_from_existing_history(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE dialogue_history (id INTEGER PRIMARY KEY AUTOINCREMENT, intent TEXT, session_id TEXT)")
+    conn.executemany("INSERT INTO dialogue_history (intent, session_id) VALUES (?, ?)", [
+        ("weather", "a"), ("music", "b"), ("weather", "a"), ("unknown", "a"), ("news", "b")
+    ])
+    conn.commit()
+    conn.close()
+
+    stats = TransitionStats(db_path=db_path)
+    assert stats.predict("weather") == [("weather", 1.0)]
+    assert stats.predict("music") == [("news", 1.0)]
+    # 已经写入转移表，之后不再从对话历史重复统计
+    assert TransitionStats(db_path=db_path).predict("weather") == [("weather", 1.0)]
+
+
+def test_invalid_intents_ignored(db_path):
+    stats = TransitionStats(db_path=db_path)
+    stats.record("unknown", "weather")
+    stats.record("weather", None)
+    assert TransitionStats(db_path=db_path).predict("weather") == []
+
+
+def test_clear_resets_to_priors(db_path):
+    stats = TransitionStats({"weather": {"weather": 3}}, db_path=db_path)
+    stats.record("weather", "news")
+    stats.clear()
+    assert stats.predict("weather") == [("weather", 1.0)]
+    assert TransitionStats(db_path=db_path).predict("weather") == []
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音识别调度测试：用本地桩引擎（慢引擎、失败引擎）检查对冲、结果选择和引擎排序
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.speech_recognition.recognition_orchestrator import RecognitionOrchestrator
+
+
+class FakeEngine:
+    """桩引擎：等待 delay 秒后返回 text，或抛出 error"""
+
+    def __init__(self, text=None, delay=0.0, error=None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.started = []
+        self.finished = threading.Event()
+
+    def __call__(self, audio):
+        self.started.append(time.monotonic())
+        try:
+            time.sleep(self.delay)
+            if self.error:
+                raise self.error
+            return self.text
+        finally:
+            self.finished.set()
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = RecognitionOrchestrator(hedge_delay=0.1, timeout=2)
+    yield orchestrator
+    orchestrator.shutdown()
+
+
+def test_hedge_fires_after_delay(orchestrator):
+    slow = FakeEngine("慢引擎的结果", delay=0.6)
+    fast = FakeEngine("快引擎的结果", delay=0.01)
+    orchestrator.register_engine("slow", slow)
+    orchestrator.register_engine("fast", fast)
+    orchestrator.set_preferred_engine("slow")
+
+    start = time.monotonic()
+    text, engine = orchestrator.recognize(b"audio")
+    elapsed = time.monotonic() - start
+
+    assert (text, engine) == ("快引擎的结果", "fast")
+    # 备用引擎在对冲延迟之后才启动，整体不必等待慢引擎
+    hedge_at = fast.started[0] - slow.started[0]
+    assert 0.09 <= hedge_at < 0.3
+    assert elapsed < 0.4
+
+
+def test_no_hedge_when_primary_answers_in_time(orchestrator):
+    primary = FakeEngine("主引擎的结果", delay=0.01)
+    backup = FakeEngine("备用引擎的结果")
+    orchestrator.register_engine("primary", primary)
+    orchestrator.register_engine("backup", backup)
+    orchestrator.set_preferred_engine("primary")
+
+    assert orchestrator.recognize(b"audio") == ("主引擎的结果", "primary")
+    assert backup.started == []
+
+
+def test_failure_launches_next_engine_without_waiting(orchestrator):
+    orchestrator.hedge_delay = 5
+    failing = FakeEngine(error=RuntimeError("服务不可用"))
+    backup = FakeEngine("备用引擎的结果")
+    orchestrator.register_engine("failing", failing)
+    orchestrator.register_engine("backup", backup)
+    orchestrator.set_preferred_engine("failing")
+
+    start = time.monotonic()
+    assert orchestrator.recognize(b"audio") == ("备用引擎的结果", "backup")
+    assert time.monotonic() - start < 1
+
+
+def test_first_successful_result_wins(orchestrator):
+    # 同时启动：最先返回的是失败，不能被当作结果
+    orchestrator.hedge_delay = 0
+    failing = FakeEngine(error=RuntimeError("服务不可用"), delay=0.01)
+    empty = FakeEngine(None, delay=0.02)
+    slower = FakeEngine("正确结果", delay=0.1)
+    orchestrator.register_engine("failing", failing)
+    orchestrator.register_engine("empty", empty)
+    orchestrator.register_engine("slower", slower)
+
+    assert orchestrator.recognize(b"audio") == ("正确结果", "slower")
+
+
+def test_all_engines_fail(orchestrator):
+    orchestrator.register_engine("a", FakeEngine(error=RuntimeError("a")))
+    orchestrator.register_engine("b", FakeEngine(error=RuntimeError("b")))
+    assert orchestrator.recognize(b"audio") == (None, None)
+    assert orchestrator.stats["a"].failures == 1
+    assert orchestrator.stats["b"].failures == 1
+
+
+def test_rank_engines_reorders_after_failures(orchestrator):
+    flaky = FakeEngine(error=RuntimeError("超时"))
+    stable = FakeEngine("结果", delay=0.01)
+    orchestrator.register_engine("flaky", flaky)
+    orchestrator.register_engine("stable", stable)
+    orchestrator.set_preferred_engine("flaky")
+    assert orchestrator.rank_engines() == ["flaky", "stable"]
+
+    assert orchestrator.recognize(b"audio") == ("结果", "stable")
+    # 失败抬高了首选引擎的EWMA错误率，下一次先调用稳定的引擎
+    assert orchestrator.stats["flaky"].ewma_error_rate > 0
+    assert orchestrator.rank_engines() == ["stable", "flaky"]
+
+    calls = len(flaky.started)
+    orchestrator.recognize(b"audio")
+    assert len(flaky.started) == calls
+
+
+def test_losing_engine_keeps_running_and_is_recorded(orchestrator):
+    slow = FakeEngine("慢引擎的结果", delay=0.3)
+    fast = FakeEngine("快引擎的结果")
+    orchestrator.register_engine("slow", slow)
+    orchestrator.register_engine("fast", fast)
+    orchestrator.set_preferred_engine("slow")
+
+    assert orchestrator.recognize(b"audio") == ("快引擎的结果", "fast")
+    # 已经开始的调用无法取消：结果被丢弃，但运行结束后仍计入统计
+    assert orchestrator.stats["slow"].abandoned == 1
+    assert orchestrator.stats["slow"].calls == 0
+    assert slow.finished.wait(1)
+    deadline = time.monotonic() + 1
+    while orchestrator.stats["slow"].calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert orchestrator.stats["slow"].calls == 1
+    assert orchestrator.stats["slow"].ewma_latency >= 0.3
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+槽位提取测试：预编译的提取规则与原处理函数中的内联正则结果一致
+（期望值按改写前的 handle_music / handle_open_folder / handle_open_application 得出）
+"""
+
+import pytest
+
+from src.dialogue_manager.dialogue_context import DialogueContext, EntityList
+from src.dialogue_manager.slot_extractor import SlotExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return SlotExtractor()
+
+
+def make_context(last_intent=None):
+    context = DialogueContext(session_id="test")
+    context.last_intent = last_intent
+    return context
+
+
+@pytest.mark.parametrize("user_input, expected", [
+    ("播放周杰伦的歌", "周杰伦"),
+    ("听稻香吧", "稻香"),
+    ("来首七里香", "七里香"),
+    ("我想听青花瓷的音乐", "青花瓷"),
+    ("想听夜曲", "夜曲"),
+    ("播放 周杰伦 的音乐啊", "周杰伦"),
+    ("随便放点歌吧", "点歌"),
+    ("放一首晴天", "一首晴天"),
+    # 按规则顺序，前面的"播放"规则先命中
+    ("播放的音乐是告白气球", "的音乐是告白气球"),
+    # 只说了泛指词，不算音乐名
+    ("播放音乐", None),
+    ("听歌", None),
+    ("来首歌", None),
+])
+def test_music_name(extractor, user_input, expected):
+    slots = extractor.extract("music", user_input, EntityList(), make_context())
+    assert slots == {"music_name": expected}
+
+
+@pytest.mark.parametrize("user_input, expected", [
+    ("稻香", "稻香"),
+    ("晴天吧", "晴天"),
+    ("什么", None),
+    ("听歌曲", None),
+])
+def test_music_followup_uses_input(extractor, user_input, expected):
+    slots = extractor.extract("music", user_input, EntityList(), make_context("music"))
+    assert slots["music_name"] == expected
+
+
+def test_music_followup_needs_music_context(extractor):
+    assert extractor.extract("music", "稻香", EntityList(), make_context("weather"))["music_name"] is None
+    assert extractor.extract("music", "稻香", EntityList())["music_name"] is None
+
+
+def test_music_entity_takes_precedence(extractor):
+    slots = extractor.extract("music", "播放晴天", EntityList([("music_name", "稻香")]))
+    assert slots["music_name"] == "稻香"
+
+
+@pytest.mark.parametrize("user_input, expected", [
+    ("打开桌面", "桌面"),
+    ("打开我的文档", "文档"),
+    ("打开下载文件夹", "下载"),
+    ("查看图片文件夹", "图片"),
+    ("打开音乐", "音乐"),
+    ("浏览视频", "视频"),
+    ("打开项目目录", "项目目录"),
+    ("打开D盘的资料目录吧", "D盘的资料目录"),
+    # 非贪婪匹配把"文件夹"吃掉，剩下的名称不含文件夹提示词
+    ("打开工作文件夹", None),
+    ("查看报告", None),
+])
+def test_folder_path(extractor, user_input, expected):
+    assert extractor.extract("open_folder", user_input, EntityList()) == {"folder_path": expected}
+
+
+def test_folder_entity_takes_precedence(extractor):
+    slots = extractor.extract("open_folder", "打开桌面", EntityList([("file_path", "D:/work")]))
+    assert slots["folder_path"] == "D:/work"
+
+
+@pytest.mark.parametrize("user_input, expected", [
+    ("打开微信", "微信"),
+    ("启动QQ音乐吧", "QQ音乐"),
+    ("运行记事本了", "记事本"),
+    ("开启蓝牙", "蓝牙"),
+    ("帮我打开浏览器", "浏览器"),
+    ("请打开计算器哦", "计算器"),
+    # 没有"打开"类动词时按常见应用名匹配（不区分大小写，返回标准写法）
+    ("我要用chrome", "Chrome"),
+    ("powershell", "PowerShell"),
+    ("qq", "QQ"),
+    ("用一下网易云音乐", "网易云音乐"),
+    ("来点音乐", None),
+])
+def test_app_name(extractor, user_input, expected):
+    assert extractor.extract("open_application", user_input, EntityList()) == {"app_name": expected}
+
+
+@pytest.mark.parametrize("app_name, expected", [
+    ("cmd", True),
+    ("CMD", True),
+    ("PowerShell", True),
+    ("命令提示符", True),
+    ("Regedit", True),
+    ("终端", True),
+    ("微信", False),
+    ("powershell ise", False),
+])
+def test_is_sensitive_app(extractor, app_name, expected):
+    assert extractor.is_sensitive_app(app_name) is expected
+
+
+def test_query_and_unknown_intent(extractor):
+    assert extractor.extract("search_internet", "帮我搜索量子计算", EntityList()) == {"query": "量子计算"}
+    assert extractor.extract("joke", "讲个笑话", EntityList()) == {}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地唤醒词检测测试
+音频夹具由 tests/fixtures/wake_word/generate_fixtures.py 合成（元音序列），
+合成音频之间的距离比真实录音更集中，因此使用比默认配置更严格的阈值
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from src.speech_recognition.wake_word_detector import WakeWordDetector, _normalize, dtw_distance, read_wav
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "wake_word")
+SAMPLE_RATE = 16000
+
+# 合成夹具：唤醒词的距离约0.1，其他音节约0.25以上
+FIXTURE_THRESHOLD = 0.15
+
+
+def fixture(name):
+    return read_wav(os.path.join(FIXTURE_DIR, name), SAMPLE_RATE)
+
+
+def reference_dtw(query, template):
+    """逐格计算的DTW（不限带宽），用于核对向量化实现"""
+    cost = 1.0 - _normalize(query) @ _normalize(template).T
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            acc[i, j] = cost[i - 1, j - 1] + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+    return acc[n, m] / (n + m)
+
+
+@pytest.fixture(scope="module")
+def detector(tmp_path_factory):
+    template_dir = tmp_path_factory.mktemp("templates")
+    shutil.copy(os.path.join(FIXTURE_DIR, "template.wav"), template_dir)
+    detector = WakeWordDetector(sample_rate=SAMPLE_RATE, threshold=FIXTURE_THRESHOLD)
+    assert detector.load_templates(str(template_dir)) == 1
+    return detector
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (5, 5), (30, 40), (80, 60), (1, 7), (7, 1)])
+def test_dtw_matches_reference(n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    query, template = rng.normal(size=(n, 13)), rng.normal(size=(m, 13))
+    assert dtw_distance(query, template) == pytest.approx(reference_dtw(query, template), abs=1e-9)
+
+
+def test_dtw_band_only_restricts_paths():
+    rng = np.random.default_rng(7)
+    query, template = rng.normal(size=(60, 13)), rng.normal(size=(50, 13))
+    full = dtw_distance(query, template)
+    banded = dtw_distance(query, template, band=0.1)
+    assert np.isfinite(banded)
+    assert banded >= full - 1e-12
+
+
+@pytest.mark.parametrize("name", ["positive_slow.wav", "positive_command.wav"])
+def test_detect_positive_clips(detector, name):
+    assert detector.detect(fixture(name))
+
+
+@pytest.mark.parametrize("name", ["negative_other.wav", "negative_noise.wav"])
+def test_reject_negative_clips(detector, name):
+    assert not detector.detect(fixture(name))
+
+
+def test_silence_is_skipped_by_energy_gate(detector):
+    assert detector.score(np.zeros(SAMPLE_RATE, dtype=np.int16)) == float("inf")
+    assert detector.find(np.zeros(SAMPLE_RATE, dtype=np.int16)) is None
+
+
+def test_find_returns_end_of_wake_word(detector):
+    # positive_command.wav：0.3s静音 + 唤醒词（约0.78s）+ 0.15s停顿 + 命令
+    end = detector.find(fixture("positive_command.wav"))
+    assert end is not None
+    assert 0.95 * SAMPLE_RATE <= end <= 1.23 * SAMPLE_RATE
+
+
+def test_accepts_pcm_bytes(detector):
+    assert detector.detect(fixture("positive_slow.wav").tobytes())
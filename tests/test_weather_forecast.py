@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+天气预报测试：时间描述解析（固定日期），以及保存的中国天气网7天预报页的解析
+"""
+
+import os
+from datetime import date, timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.api_integration.weather_forecast import parse_forecast, resolve_dates
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "weather", "101010100_7d.html")
+
+MONDAY = date(2026, 10, 19)
+WEDNESDAY = date(2026, 10, 14)
+SATURDAY = date(2026, 10, 17)
+SUNDAY = date(2026, 10, 18)
+
+
+def d(day, month=10):
+    return date(2026, month, day)
+
+
+def span(start, count):
+    return [start + timedelta(days=i) for i in range(count)]
+
+
+@pytest.mark.parametrize("today, time, dates, is_range", [
+    # 今天和相对日期
+    (WEDNESDAY, None, [d(14)], False),
+    (WEDNESDAY, "", [d(14)], False),
+    (WEDNESDAY, "明天", [d(15)], False),
+    (WEDNESDAY, "后天", [d(16)], False),
+    (WEDNESDAY, "大后天", [d(17)], False),
+    (WEDNESDAY, "昨天", [d(13)], False),
+    (WEDNESDAY, "前天", [d(12)], False),
+    (WEDNESDAY, "天气", [d(14)], False),
+    # 只说星期几：今天或之后最近的一天
+    (WEDNESDAY, "周五", [d(16)], False),
+    (WEDNESDAY, "周三", [d(14)], False),
+    (WEDNESDAY, "周一", [d(19)], False),
+    (WEDNESDAY, "星期天", [d(18)], False),
+    (WEDNESDAY, "礼拜日", [d(18)], False),
+    (SATURDAY, "周五", [d(23)], False),
+    # 带前缀：按自然周计算
+    (WEDNESDAY, "这周五", [d(16)], False),
+    (WEDNESDAY, "本周一", [d(12)], False),
+    (SATURDAY, "这周五", [d(16)], False),
+    (WEDNESDAY, "下周三", [d(21)], False),
+    (WEDNESDAY, "下个星期一", [d(19)], False),
+    (WEDNESDAY, "下下周一", [d(26)], False),
+    (WEDNESDAY, "上周五", [d(9)], False),
+    (SUNDAY, "下周一", [d(19)], False),
+    # 周末
+    (WEDNESDAY, "周末", [d(17), d(18)], True),
+    (SATURDAY, "周末", [d(17), d(18)], True),
+    (SUNDAY, "这周末", [d(17), d(18)], True),
+    (WEDNESDAY, "下周末", [d(24), d(25)], True),
+    (SUNDAY, "下周末", [d(24), d(25)], True),
+    (WEDNESDAY, "上周末", [d(10), d(11)], True),
+    # 这周、下周、上周
+    (WEDNESDAY, "这周天气", span(d(14), 5), True),
+    (SUNDAY, "本周", [d(18)], True),
+    (WEDNESDAY, "下周", span(d(19), 7), True),
+    (SUNDAY, "下星期", span(d(19), 7), True),
+    (WEDNESDAY, "上周", span(d(5), 7), True),
+    # 未来N天
+    (WEDNESDAY, "未来三天", span(d(14), 3), True),
+    (WEDNESDAY, "接下来5天", span(d(14), 5), True),
+    (WEDNESDAY, "最近两天", span(d(14), 2), True),
+    (WEDNESDAY, "这几天", span(d(14), 3), True),
+    (WEDNESDAY, "一周", span(d(14), 7), True),
+])
+def test_resolve_dates(today, time, dates, is_range):
+    assert resolve_dates(time, today) == (dates, is_range)
+
+
+def load_page():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return BeautifulSoup(f.read(), "html.parser")
+
+
+@pytest.fixture
+def forecast():
+    return parse_forecast(load_page(), "北京", today=MONDAY)
+
+
+def test_parse_forecast(forecast):
+    assert len(forecast) == 7
+    assert [day.date for day in forecast.days] == span(MONDAY, 7)
+    tomorrow = forecast.days[1]
+    assert tomorrow.to_dict() == {
+        "date": "2026-10-20", "label": "20日（明天）", "weather": "小雨", "night_weather": "小雨",
+        "high": 22, "low": 16, "wind": "3-4级"
+    }
+    # 傍晚以后的页面当天只有夜间温度
+    assert (forecast.days[0].high, forecast.days[0].low) == (18, 18)
+
+
+def test_parse_forecast_stops_at_incomplete_day():
+    soup = load_page()
+    soup.find_all("li")[3].find(class_="tem").decompose()
+    assert len(parse_forecast(soup, "北京", today=MONDAY)) == 3
+
+
+def test_parse_forecast_without_forecast():
+    assert parse_forecast(BeautifulSoup("<html><body></body></html>", "html.parser"), "北京") is None
+
+
+def test_describe_single_day(forecast):
+    assert forecast.describe(today=MONDAY) == "北京今日19日（今天）天气：多云转阴，温度：18℃，风力：<3级"
+    assert forecast.describe("周五", today=MONDAY) == "北京周五23日（周五）天气：多云，温度：24/15℃，风力：<3级"
+
+
+def test_describe_range(forecast):
+    lines = forecast.describe("周末", today=MONDAY).split("\n")
+    assert lines[0] == "北京周末天气："
+    assert lines[1].startswith("24日（周六） 周六：晴")
+    assert lines[2].startswith("25日（周日） 周日：晴转多云")
+
+
+def test_describe_past_day(forecast):
+    # 周六问"这周五"：日期已经过去，不应回答超出预报范围
+    saturday_forecast = parse_forecast(load_page(), "北京", today=d(24))
+    assert saturday_forecast.describe("这周五", today=d(24)) == \
+        "抱歉，这周五（10月23日）已经过去了，只能查询北京今天起7天内的天气预报"
+    assert "已经过去了" in forecast.describe("昨天", today=MONDAY)
+    assert forecast.describe("下下周三", today=MONDAY) == "抱歉，只能查询北京未来7天内的天气"